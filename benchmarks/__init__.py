@@ -0,0 +1,6 @@
+"""
+Benchmarks of happyly's hot paths.
+
+Run them with ``python -m benchmarks run`` from the repository root
+and compare two runs with ``python -m benchmarks compare``.
+"""
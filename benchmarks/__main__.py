@@ -0,0 +1,115 @@
+"""
+Usage::
+
+    python -m benchmarks run [-o results.json] [-k SUBSTRING] [--repeat N]
+    python -m benchmarks compare BASELINE.json RESULTS.json [--threshold PERCENT]
+
+`compare` exits with status 1 if any case became slower
+by more than `threshold` percent.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import platform
+import sys
+import timeit
+from typing import Any, Dict, Optional
+
+import happyly
+from .cases import CASES
+
+
+def measure(setup, repeat: int) -> Dict[str, Any]:
+    func = setup()
+    timer = timeit.Timer(func)
+    # enough calls to take at least 0.2 seconds
+    number, _ = timer.autorange()
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'best_us': min(timings) * 1e6,
+        'mean_us': sum(timings) / len(timings) * 1e6,
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def run(select: Optional[str], repeat: int) -> Dict[str, Any]:
+    logging.getLogger('happyly').setLevel(logging.WARNING)
+    results = {}
+    for name, setup in CASES.items():
+        if select and select not in name:
+            continue
+        results[name] = measure(setup, repeat)
+        print(f'{name:<45} {results[name]["best_us"]:>12.2f} us', file=sys.stderr)
+    return {
+        'meta': {
+            'happyly': happyly.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float):
+    regressions = 0
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f'{name:<45} {result["best_us"]:>12.2f} us  (new)')
+            continue
+        change = (result['best_us'] / base['best_us'] - 1) * 100
+        mark = ''
+        if change > threshold:
+            mark = '  REGRESSION'
+            regressions += 1
+        print(
+            f'{name:<45} {base["best_us"]:>12.2f} -> {result["best_us"]:>10.2f} us'
+            f'  {change:+7.1f}%{mark}'
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run_parser = commands.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('-o', '--output', help='write JSON results to the file')
+    run_parser.add_argument('-k', '--select', help='run cases containing SUBSTRING')
+    run_parser.add_argument('--repeat', type=int, default=5)
+
+    compare_parser = commands.add_parser('compare', help='compare two results')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=10.0,
+        help='max allowed slowdown, percent (default: 10)',
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = run(args.select, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        else:
+            json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    return 1 if compare(baseline, current, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Benchmark cases. Each case is a function which prepares everything it needs
+and returns a callable measured by the runner.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Mapping
+
+import json
+import marshmallow
+
+from happyly import Executor, Handler, DUMMY_HANDLER
+from happyly.handling import MemoizedHandler
+from happyly.google_pubsub.deserializers import JSONDeserializerWithRequestIdRequired
+from happyly.google_pubsub.high_level.base import GooglePubSubExecutorWithRequestId
+from happyly.listening import EarlyAckListener, LateAckListener
+from happyly.pubsub import SubscriberWithAck
+from happyly.serialization import (
+    CachingDeserializer,
+    DummyValidator,
+    ValidationPolicy,
+)
+from happyly.serialization.json import (
+    JSONSchemalessSerde,
+    JSONSerializerForSchema,
+    BinaryJSONSerializerForSchema,
+    BinaryJSONDeserialierForSchema,
+)
+from happyly.serialization.json_backends import StdlibJSONBackend
+
+CASES: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def case(name: str):
+    def decorator(func: Callable[[], Callable[[], Any]]):
+        CASES[name] = func
+        return func
+
+    return decorator
+
+
+class PayloadSchema(marshmallow.Schema):
+    request_id = marshmallow.fields.Str(required=True)
+    values = marshmallow.fields.List(marshmallow.fields.Int())
+    text = marshmallow.fields.Str()
+
+
+PAYLOADS: Dict[str, Mapping[str, Any]] = {
+    'small': {'request_id': '42', 'values': [1, 2, 3], 'text': 'spam'},
+    'large': {'request_id': '42', 'values': list(range(10000)), 'text': 'x' * 100000},
+}
+
+
+def _function_handler(message):
+    return message
+
+
+def _generator_handler(message):
+    yield message
+    yield message
+
+
+class _ClassHandler(Handler):
+    def handle(self, message):
+        return message
+
+    def on_handling_failed(self, message, error):
+        raise error
+
+
+class _FakeSubscriber(SubscriberWithAck):
+    def subscribe(self, callback):
+        pass
+
+    def ack(self, message):
+        pass
+
+
+_HANDLERS = {
+    'dummy': DUMMY_HANDLER,
+    'function': _function_handler,
+    'class': _ClassHandler(),
+    'generator': _generator_handler,
+}
+
+
+def _executor_run(handler, **kwargs):
+    def setup():
+        executor = Executor(handler=handler, **kwargs)
+        message = PAYLOADS['small']
+        return lambda: executor.run(message)
+
+    return setup
+
+
+def _executor_run_for_result(handler):
+    def setup():
+        executor = Executor(handler=handler)
+        message = PAYLOADS['small']
+        if handler is _generator_handler:
+            return lambda: list(executor.run_for_result(message))
+        return lambda: executor.run_for_result(message)
+
+    return setup
+
+
+for _name, _handler in _HANDLERS.items():
+    case(f'executor.run.{_name}')(_executor_run(_handler))
+    case(f'executor.run_for_result.{_name}')(_executor_run_for_result(_handler))
+case('executor.run.function.publisher')(
+    _executor_run(_function_handler, publisher=lambda m: None)
+)
+case('executor.run.generator.publisher')(
+    _executor_run(_generator_handler, publisher=lambda m: None)
+)
+case('executor.run.memoized')(
+    _executor_run(MemoizedHandler(_ClassHandler(), key=['request_id']))
+)
+
+
+def _listener_run(listener_cls):
+    def setup():
+        executor = listener_cls(
+            subscriber=_FakeSubscriber(),
+            handler=_function_handler,
+            deserializer=lambda m: m,
+            publisher=lambda m: None,
+        )
+        message = PAYLOADS['small']
+        return lambda: executor.run(message)
+
+    return setup
+
+
+case('listener.early_ack.run')(_listener_run(EarlyAckListener))
+case('listener.late_ack.run')(_listener_run(LateAckListener))
+
+
+def _pubsub_message(payload: Mapping[str, Any]):
+    return SimpleNamespace(data=json.dumps(payload).encode('utf-8'), attributes={})
+
+
+class _GoogleEarlyAck(EarlyAckListener, GooglePubSubExecutorWithRequestId):
+    pass
+
+
+class _GoogleLateAck(LateAckListener, GooglePubSubExecutorWithRequestId):
+    pass
+
+
+def _google_run(executor_cls):
+    def setup():
+        executor = executor_cls(
+            subscriber=_FakeSubscriber(),
+            handler=_function_handler,
+            deserializer=JSONDeserializerWithRequestIdRequired(schema=PayloadSchema()),
+            from_topic='topic',
+        )
+        message = _pubsub_message(PAYLOADS['small'])
+        return lambda: executor.run(message)
+
+    return setup
+
+
+case('google.early_ack.run')(_google_run(_GoogleEarlyAck))
+case('google.late_ack.run')(_google_run(_GoogleLateAck))
+
+
+for _size, _payload in PAYLOADS.items():
+
+    def _schemaless_serialize(payload=_payload):
+        serde = JSONSchemalessSerde()
+        return lambda: serde.serialize(payload)
+
+    def _schemaless_deserialize(payload=_payload):
+        serde = JSONSchemalessSerde()
+        message = json.dumps(payload)
+        return lambda: serde.deserialize(message)
+
+    def _schema_serialize(payload=_payload):
+        serializer = JSONSerializerForSchema(schema=PayloadSchema())
+        return lambda: serializer.serialize(payload)
+
+    def _binary_schema_deserialize(payload=_payload):
+        deserializer = BinaryJSONDeserialierForSchema(schema=PayloadSchema())
+        message = _pubsub_message(payload)
+        return lambda: deserializer.deserialize(message)
+
+    def _dummy_validator(payload=_payload):
+        validator = DummyValidator(schema=PayloadSchema())
+        return lambda: validator.deserialize(payload)
+
+    def _sampled_dummy_validator(payload=_payload):
+        validator = DummyValidator(
+            schema=PayloadSchema(), validation=ValidationPolicy.sampled(every=100)
+        )
+        return lambda: validator.deserialize(payload)
+
+    def _binary_schema_serialize(payload=_payload):
+        serializer = BinaryJSONSerializerForSchema(schema=PayloadSchema())
+        return lambda: serializer.serialize(payload)
+
+    def _request_id_deserialize(payload=_payload):
+        deserializer = JSONDeserializerWithRequestIdRequired(schema=PayloadSchema())
+        message = _pubsub_message(payload)
+        return lambda: deserializer.deserialize(message)
+
+    def _request_id_deserialize_cached(payload=_payload):
+        deserializer = CachingDeserializer(
+            JSONDeserializerWithRequestIdRequired(schema=PayloadSchema())
+        )
+        message = _pubsub_message(payload)
+        return lambda: deserializer.deserialize(message)
+
+    def _request_id_deserialize_stdlib(payload=_payload):
+        deserializer = JSONDeserializerWithRequestIdRequired(
+            schema=PayloadSchema(), json_backend=StdlibJSONBackend()
+        )
+        message = _pubsub_message(payload)
+        return lambda: deserializer.deserialize(message)
+
+    case(f'serde.schemaless.serialize.{_size}')(_schemaless_serialize)
+    case(f'serde.schemaless.deserialize.{_size}')(_schemaless_deserialize)
+    case(f'serde.schema.serialize.{_size}')(_schema_serialize)
+    case(f'serde.binary_schema.deserialize.{_size}')(_binary_schema_deserialize)
+    case(f'serde.dummy_validator.deserialize.{_size}')(_dummy_validator)
+    case(f'serde.dummy_validator.deserialize.{_size}.sampled')(_sampled_dummy_validator)
+    case(f'serde.binary_schema.serialize.{_size}')(_binary_schema_serialize)
+    case(f'serde.request_id.deserialize.{_size}')(_request_id_deserialize)
+    case(f'serde.request_id.deserialize.{_size}.stdlib')(_request_id_deserialize_stdlib)
+    case(f'serde.request_id.deserialize.{_size}.cached')(_request_id_deserialize_cached)
@@ -0,0 +1,301 @@
+"""
+Load generator for executors and listeners.
+
+Feeds synthetic or recorded messages into an executor
+from several threads and reports throughput, end-to-end latency,
+CPU time and peak memory::
+
+    python -m happyly.bench myapp.listeners:make_executor \\
+        --messages 100000 --concurrency 8 --message-size 1024 \\
+        --latency exp:0.002
+
+The factory is called with the keyword arguments it declares out of:
+
+* `handler` - synthetic handler which sleeps (or spins with `--cpu`)
+  according to `--latency` and returns the message as the result
+* `subscriber` - subscriber whose `ack` acks the message in memory
+
+Without a factory, :class:`~happyly.Executor` with the synthetic handler
+and a deserializer which loads JSON from `data` is used.
+
+Synthetic messages are shaped like Pub/Sub messages:
+`data` is JSON with `request_id` and `payload` fields encoded with utf-8,
+so they suit :class:`~happyly.google_pubsub.GooglePubSubExecutorWithRequestId`.
+Recorded messages are read from a file with one JSON object per line,
+either `{"data": ..., "attributes": {...}}` or any object used as `data`.
+"""
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from happyly.listening import Executor
+from happyly.pubsub import SubscriberWithAck
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore
+
+
+class BenchMessage:
+    """
+    Pub/Sub-shaped message used by the load generator.
+    """
+
+    __slots__ = ('data', 'attributes', 'acked')
+
+    def __init__(self, data: bytes, attributes: Optional[Mapping[str, str]] = None):
+        self.data = data
+        self.attributes = attributes or {}
+        self.acked = False
+
+    def ack(self):
+        self.acked = True
+
+
+class BenchSubscriber(SubscriberWithAck):
+    """
+    Subscriber passed to executor factories.
+    Messages are fed by the load generator, so :meth:`subscribe` does nothing.
+    """
+
+    def subscribe(self, callback: Callable[[Any], Any]):
+        pass
+
+    def ack(self, message):
+        message.ack()
+
+
+def latency_distribution(spec: str) -> Callable[[], float]:
+    """
+    Parses handler latency distribution (in seconds):
+    `fixed:S`, `uniform:LOW,HIGH`, `exp:MEAN` or `normal:MEAN,STDDEV`.
+    """
+    kind, _, params = spec.partition(':')
+    try:
+        values = [float(v) for v in params.split(',')] if params else []
+        if kind == 'fixed' and len(values) == 1:
+            return lambda: values[0]
+        if kind == 'uniform' and len(values) == 2:
+            return lambda: random.uniform(values[0], values[1])
+        if kind == 'exp' and len(values) == 1:
+            return lambda: random.expovariate(1 / values[0]) if values[0] else 0.0
+        if kind == 'normal' and len(values) == 2:
+            return lambda: max(random.gauss(values[0], values[1]), 0.0)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f'Invalid latency distribution: {spec}')
+
+
+def synthetic_handler(latency: Callable[[], float], cpu: bool = False):
+    def handler(message: Mapping[str, Any]):
+        delay = latency()
+        if cpu:
+            deadline = time.perf_counter() + delay
+            while time.perf_counter() < deadline:
+                pass
+        elif delay > 0:
+            time.sleep(delay)
+        return message
+
+    return handler
+
+
+def synthetic_messages(count: int, size: int) -> Iterator[BenchMessage]:
+    payload = 'x' * size
+    for i in range(count):
+        data = json.dumps({'request_id': str(i), 'payload': payload})
+        yield BenchMessage(data.encode('utf-8'))
+
+
+def recorded_messages(path: str, count: Optional[int]) -> Iterator[BenchMessage]:
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+    if not lines:
+        return
+    if count is None:
+        count = len(lines)
+    # replay the file as many times as needed
+    for line in itertools.islice(itertools.cycle(lines), count):
+        record = json.loads(line)
+        if isinstance(record, dict) and 'data' in record:
+            data = record['data']
+            attributes = record.get('attributes')
+        else:
+            data, attributes = record, None
+        if not isinstance(data, str):
+            data = json.dumps(data)
+        yield BenchMessage(data.encode('utf-8'), attributes)
+
+
+def load_factory(path: str) -> Callable[..., Executor]:
+    module_name, _, attr = path.partition(':')
+    if not attr:
+        raise argparse.ArgumentTypeError(
+            f'Factory should be given as module:callable, got {path}'
+        )
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _load_data(message: BenchMessage) -> Mapping[str, Any]:
+    return json.loads(message.data)
+
+
+def build_executor(factory: Optional[Callable[..., Executor]], handler) -> Executor:
+    if factory is None:
+        return Executor(handler=handler, deserializer=_load_data)
+    available = {'handler': handler, 'subscriber': BenchSubscriber()}
+    parameters = inspect.signature(factory).parameters
+    return factory(**{k: v for k, v in available.items() if k in parameters})
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * q / 100), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_load(
+    executor: Executor, messages: Iterable[BenchMessage], concurrency: int
+) -> Dict[str, Any]:
+    """
+    Runs the executor for each message from `concurrency` threads.
+
+    :return: Report with throughput, latency percentiles (in seconds),
+        CPU time and peak RSS
+    """
+    lock = threading.Lock()
+    latencies: List[float] = []
+    pending = iter(messages)
+
+    def worker():
+        local: List[float] = []
+        while True:
+            with lock:
+                message = next(pending, None)
+            if message is None:
+                break
+            started = time.perf_counter()
+            executor.run(message)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    threads = [
+        threading.Thread(target=worker, name=f'happyly-bench-{i}')
+        for i in range(concurrency)
+    ]
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    latencies.sort()
+    return {
+        'messages': len(latencies),
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_p99': percentile(latencies, 99),
+        'latency_max': latencies[-1] if latencies else 0.0,
+        'cpu_seconds': cpu,
+        'peak_rss_bytes': _peak_rss_bytes(),
+    }
+
+
+def format_report(report: Mapping[str, Any]) -> str:
+    latency = ', '.join(
+        f"{name} {report[f'latency_{name}'] * 1e3:.3f} ms"
+        for name in ('p50', 'p95', 'p99', 'max')
+    )
+    rss = report['peak_rss_bytes']
+    rss_text = 'unknown' if rss is None else f'{rss / 1024 / 1024:.1f} MiB'
+    lines = [
+        f"messages:    {report['messages']} in {report['seconds']:.2f} s",
+        f"throughput:  {report['throughput']:.1f} messages/s",
+        f'latency:     {latency}',
+        f"cpu time:    {report['cpu_seconds']:.2f} s",
+        f'peak rss:    {rss_text}',
+    ]
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m happyly.bench', description='Load generator for executors.'
+    )
+    parser.add_argument(
+        'factory',
+        nargs='?',
+        help='module:callable which returns an executor '
+        '(Executor with a synthetic handler by default)',
+    )
+    parser.add_argument('-n', '--messages', type=int, default=10000)
+    parser.add_argument('-c', '--concurrency', type=int, default=1)
+    parser.add_argument(
+        '-s', '--message-size', type=int, default=100, help='payload size, bytes'
+    )
+    parser.add_argument('--recorded', help='file with recorded messages (JSON lines)')
+    parser.add_argument(
+        '--latency',
+        type=latency_distribution,
+        default='fixed:0',
+        help='handler latency: fixed:S, uniform:LOW,HIGH, exp:MEAN, normal:MEAN,SD',
+    )
+    parser.add_argument(
+        '--cpu', action='store_true', help='synthetic handler spins instead of sleeping'
+    )
+    parser.add_argument('--warmup', type=int, default=0, help='messages not measured')
+    parser.add_argument('--json', action='store_true', help='print report as JSON')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('happyly').setLevel(args.log_level)
+    factory = load_factory(args.factory) if args.factory else None
+    executor = build_executor(factory, synthetic_handler(args.latency, args.cpu))
+
+    def messages(count: int) -> List[BenchMessage]:
+        # prepared in advance so that it doesn't affect measurements
+        if args.recorded:
+            return list(recorded_messages(args.recorded, count))
+        return list(synthetic_messages(count, args.message_size))
+
+    try:
+        if args.warmup:
+            run_load(executor, messages(args.warmup), args.concurrency)
+        report = run_load(executor, messages(args.messages), args.concurrency)
+    finally:
+        executor.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,3 +2,9 @@ from .cacher import Cacher  # noqa: F401
 
 # this is a deprecated module
 # it will be removed in v0.11
+from .dedup import (  # noqa: F401
+    ProcessedIds,
+    InMemoryProcessedIds,
+    RedisProcessedIds,
+)
+from .write_behind import WriteBehindCacher  # noqa: F401
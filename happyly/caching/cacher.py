@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Iterable, Mapping
 
 _no_default_impl = NotImplementedError('No default implementation for class Cacher')
 
@@ -34,3 +34,22 @@ class Cacher(ABC):
         by the provided key.
         """
         raise _no_default_impl
+
+    def add_many(self, items: Mapping[str, Any]):
+        """
+        Add several pieces of data at once, each by its key.
+
+        Default implementation calls :meth:`add` for each of them.
+        Override it if the cache is able to store them cheaper.
+        """
+        for key, data in items.items():
+            self.add(data, key=key)
+
+    def remove_many(self, keys: Iterable[str]):
+        """
+        Remove data stored by each of the provided keys.
+
+        Default implementation calls :meth:`remove` for each key.
+        """
+        for key in keys:
+            self.remove(key)
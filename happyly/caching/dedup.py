@@ -0,0 +1,98 @@
+"""
+Stores of ids of messages which have already been processed,
+used by :class:`~happyly.listening.ExecutorWithAck`
+to skip messages redelivered by a broker.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from happyly.utils.lru import LRUCache, MISSING
+
+_LOGGER = logging.getLogger(__name__)
+
+_no_default_impl = NotImplementedError(
+    'No default implementation for class ProcessedIds'
+)
+
+
+class ProcessedIds(ABC):
+    """
+    Abstract base class
+    which defines interface of a store of processed message ids.
+    """
+
+    @abstractmethod
+    def contains(self, key: str) -> bool:
+        """
+        Whether a message with the provided id has been processed.
+        """
+        raise _no_default_impl
+
+    @abstractmethod
+    def add(self, key: str):
+        """
+        Remember that a message with the provided id has been processed.
+        """
+        raise _no_default_impl
+
+
+class InMemoryProcessedIds(ProcessedIds):
+    """
+    Store which lives in the current process,
+    so it catches redeliveries to the same process only.
+    """
+
+    def __init__(self, max_size: int = 100000, ttl: Optional[float] = 3600):
+        """
+        :param max_size: Max number of remembered ids,
+            the least recently seen ones are forgotten first
+        :param ttl: Seconds an id is remembered for, None means forever
+        """
+        self._ids = LRUCache(max_size, ttl)
+
+    def contains(self, key: str) -> bool:
+        return self._ids.get(key) is not MISSING
+
+    def add(self, key: str):
+        self._ids.put(key, True)
+
+
+class RedisProcessedIds(ProcessedIds):
+    """
+    Store shared by all processes connected to the same Redis.
+    Each id is kept as a separate key which expires after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 6379,
+        prefix: str = 'happyly:processed:',
+        ttl: Optional[int] = 24 * 3600,
+        client: Optional[Any] = None,
+    ):
+        """
+        :param prefix: Prefix of Redis keys
+        :param ttl: Seconds an id is remembered for, None means forever
+        :param client: Redis client to use instead of connecting to `host`:`port`
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError(
+                    'Please install redis>=3.0 to use this feature.'
+                ) from e
+            client = redis.StrictRedis(host=host, port=port)
+            _LOGGER.info(f'Processed ids are stored in Redis ({host}:{port})')
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def contains(self, key: str) -> bool:
+        return bool(self.client.exists(self.prefix + key))
+
+    def add(self, key: str):
+        self.client.set(self.prefix + key, 1, ex=self.ttl)
@@ -21,7 +21,8 @@ class CacheByRequestIdMixin:
 
     def __init__(self, cacher: Cacher):
         warnings.warn(
-            'CacheByRequestIdMixin will be removed in happyly v0.11.0',
+            'CacheByRequestIdMixin will be removed in happyly v0.11.0, '
+            'use processed_ids of ExecutorWithAck to skip redelivered messages',
             DeprecationWarning,
         )
         self.cacher = cacher
@@ -42,7 +43,9 @@ class CacheByRequestIdMixin:
     def _get_req_id(self, message: Any) -> str:
         assert self.deserializer is not None
 
-        attribtues = self.deserializer.deserialize(message)
+        # reuses attributes parsed by the executor if it keeps them
+        parse = getattr(self, '_parse', self.deserializer.deserialize)
+        attribtues = parse(message)
         return attribtues[self.deserializer.request_id_field]
 
     def _rm(self, parsed_message: Mapping[str, Any]):
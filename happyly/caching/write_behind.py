@@ -0,0 +1,158 @@
+"""
+:class:`WriteBehindCacher` takes cache writes off the message's critical path.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from .cacher import Cacher
+
+_LOGGER = logging.getLogger(__name__)
+
+_REMOVE = object()
+_MISSING = object()
+
+
+class WriteBehindCacher(Cacher):
+    """
+    Wraps any cacher and applies adds and removes in the background,
+    in batches (via :meth:`~Cacher.add_many` and :meth:`~Cacher.remove_many`)
+    once the oldest pending change has been waiting for `max_latency` seconds.
+
+    Only the latest change of each key is written.
+    Data which is added and then removed before it's written
+    (e.g. a message which is finished quickly)
+    never reaches the wrapped cacher at all,
+    so keys are expected to be unique, like request ids.
+
+    Pending changes are written on :meth:`close`,
+    which is also called when the interpreter exits.
+    Failed writes are logged and dropped.
+    """
+
+    def __init__(
+        self, cacher: Cacher, max_latency: float = 0.5, max_pending: int = 10000
+    ):
+        """
+        :param cacher: Cacher which stores the data
+        :param max_latency: Max time in seconds a change waits to be written
+        :param max_pending: Max number of keys with pending changes.
+            When reached, the changes are written in the calling thread.
+        """
+        if max_pending < 1:
+            raise ValueError('max_pending should be positive.')
+        self.cacher = cacher
+        self.max_latency = max_latency
+        self.max_pending = max_pending
+        self._pending: Dict[str, Any] = {}
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        # held while changes are being written, so that they keep their order
+        self._flush_lock = threading.Lock()
+        self._linger_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def add(self, data: Any, key: str):
+        self._write(key, data)
+
+    def remove(self, key: str):
+        self._write(key, _REMOVE)
+
+    def add_many(self, items: Mapping[str, Any]):
+        for key, data in items.items():
+            self._write(key, data)
+
+    def remove_many(self, keys: Iterable[str]):
+        for key in keys:
+            self._write(key, _REMOVE)
+
+    def get(self, key: str):
+        """
+        Returns data by the key, taking pending changes into account.
+        """
+        with self._lock:
+            value = self._pending.get(key, _MISSING)
+        if value is _REMOVE:
+            return None
+        if value is not _MISSING:
+            return value
+        return self.cacher.get(key)
+
+    def _write(self, key: str, value: Any):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('Cannot write via a closed WriteBehindCacher.')
+            if self._linger_thread is None:
+                self._start_linger_thread()
+            pending = self._pending
+            if value is _REMOVE and pending.get(key, _REMOVE) is not _REMOVE:
+                # added and removed within the same window
+                del pending[key]
+                return
+            if not pending:
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            pending[key] = value
+            full = len(pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def _start_linger_thread(self):
+        self._linger_thread = threading.Thread(
+            target=self._linger, name='happyly-write-behind-cacher', daemon=True
+        )
+        self._linger_thread.start()
+        atexit.register(self.close)
+
+    def _linger(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                delay = self._oldest + self.max_latency - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all pending changes right away
+        and blocks until they are written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                changes = self._pending
+                self._pending = {}
+            if changes:
+                self._send(changes)
+
+    def _send(self, changes: Dict[str, Any]):
+        added = {key: data for key, data in changes.items() if data is not _REMOVE}
+        removed = [key for key, data in changes.items() if data is _REMOVE]
+        try:
+            if added:
+                self.cacher.add_many(added)
+            if removed:
+                self.cacher.remove_many(removed)
+        except Exception:
+            _LOGGER.exception(f'Failed to write {len(changes)} changes to cache.')
+
+    def close(self):
+        """
+        Writes pending changes and stops the background thread.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._linger_thread
+        if thread is not None:
+            thread.join()
+            atexit.unregister(self.close)
+        self.flush()
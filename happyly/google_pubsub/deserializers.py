@@ -1,10 +1,11 @@
-from typing import Mapping, Any
-import json
+from typing import Mapping, Any, Optional
 
 from attr import attrs
 import marshmallow
 
 from happyly.serialization import Deserializer
+from happyly.serialization.json import _schema_loads
+from happyly.serialization.json_backends import JSONBackend, default_backend
 
 
 @attrs(auto_attribs=True, frozen=True)
@@ -23,6 +24,9 @@ class JSONDeserializerWithRequestIdRequired(Deserializer):
     fails to deserialize some message,
     you can use `build_error_result`
     to fetch request id and provide error message.
+
+    `message.data` is parsed as is, without decoding it into `str`,
+    by `json_backend` (see :mod:`happyly.serialization.json_backends`).
     """
 
     schema: marshmallow.Schema
@@ -30,6 +34,7 @@ class JSONDeserializerWithRequestIdRequired(Deserializer):
     status_field: str = 'status'
     error_field: str = 'error'
     _status_error: str = 'ERROR'
+    json_backend: Optional[JSONBackend] = None
 
     def deserialize(self, message: Any) -> Mapping[str, Any]:
         """
@@ -37,9 +42,8 @@ class JSONDeserializerWithRequestIdRequired(Deserializer):
         expects it to be a JSON which corresponds
         `self.schema` encoded with utf-8.
         """
-        data = message.data.decode('utf-8')
-        deserialized, _ = self.schema.loads(data)
-        return deserialized
+        backend = self.json_backend or default_backend()
+        return _schema_loads(self.schema, message.data, backend)
 
     def build_error_result(self, message: Any, error: Exception) -> Mapping[str, Any]:
         """
@@ -51,7 +55,7 @@ class JSONDeserializerWithRequestIdRequired(Deserializer):
         Field names can be specified in constructor.
         If request id cannot be fetched, it is set to an empty string.
         """
-        attributes = json.loads(message.data)
+        attributes = (self.json_backend or default_backend()).loads(message.data)
         try:
             return {
                 self.request_id_field: attributes[self.request_id_field],
@@ -1,9 +1,10 @@
 import logging
-from typing import Optional, Union, Any, Mapping
+from typing import Optional, Union, Any, Mapping, Callable
 
 import marshmallow
 from happyly._deprecations.utils import will_be_removed
 
+from happyly.logs.lazy import Payload, logs_only, DEFAULT_PAYLOAD_LIMIT
 from happyly.logs.request_id import RequestIdLogger
 from happyly.serialization import DUMMY_SERDE
 from happyly.serialization.json import BinaryJSONSerializerForSchema
@@ -17,8 +18,20 @@ from happyly.listening.listener import ExecutorWithAck
 _LOGGER = logging.getLogger(__name__)
 
 
-def _format_message(message):
-    return f'data: {message.data}, attributes: {message.attributes}'
+class _FormattedMessage:
+    """
+    Pub/Sub message representation which is built only when it's logged.
+    """
+
+    __slots__ = ('message', 'limit')
+
+    def __init__(self, message, limit: Optional[int] = DEFAULT_PAYLOAD_LIMIT):
+        self.message = message
+        self.limit = limit
+
+    def __str__(self):
+        data = Payload(self.message.data, self.limit)
+        return f'data: {data}, attributes: {self.message.attributes}'
 
 
 class GooglePubSubExecutorWithRequestId(
@@ -30,6 +43,11 @@ class GooglePubSubExecutorWithRequestId(
 ):
     """
     ExecutorWithAck subtype which adds advanced logging based on topic and request id.
+
+    Each message is deserialized once: attributes parsed by the pipeline
+    (or by an earlier callback, e.g. on early ack) are kept
+    in the message's :attr:`context` and reused
+    by every later callback which needs the request id.
     """
 
     def __init__(
@@ -40,6 +58,7 @@ class GooglePubSubExecutorWithRequestId(
         serializer: BinaryJSONSerializerForSchema = None,
         publisher: Optional[GooglePubSubPublisher] = None,
         from_topic: str = '',
+        **kwargs,
     ):
         self.from_topic = from_topic
         super().__init__(
@@ -48,12 +67,54 @@ class GooglePubSubExecutorWithRequestId(
             handler=handler,
             deserializer=deserializer,
             serializer=serializer if serializer is not None else DUMMY_SERDE,
+            **kwargs,
         )
 
+    def _deserialize_function(self) -> Callable[[Any], Mapping[str, Any]]:
+        deserialize = super()._deserialize_function()
+        current = self._current
+
+        def parse(message: Any) -> Mapping[str, Any]:
+            # attributes live as long as the message's context
+            context = current.get()
+            if context is None or context.message is not message:
+                return deserialize(message)
+            if context.deserialized is None:
+                context.deserialized = deserialize(message)
+            return context.deserialized
+
+        return parse
+
+    def _parse(self, message: Any) -> Mapping[str, Any]:
+        return self._get_plan().deserialize(message)
+
+    def _request_id(self, message: Any) -> str:
+        context = self.context
+        if context is not None and context.message is message:
+            if context.request_id is None:
+                context.request_id = self._parse_request_id(message)
+            return context.request_id
+        return self._parse_request_id(message)
+
+    def _parse_request_id(self, message: Any) -> str:
+        assert self.deserializer is not None
+        try:
+            return self._parse(message)[self.deserializer.request_id_field]
+        except Exception:
+            return ''
+
+    def _format_message(self, message):
+        return _FormattedMessage(message, self.log_payload_limit)
+
+    def _payload(self, value):
+        return Payload(value, self.log_payload_limit)
+
+    @logs_only(_LOGGER, logging.INFO)
     def on_received(self, original_message: Any):
         logger = RequestIdLogger(_LOGGER, self.from_topic)
-        logger.info(f"Received message: {_format_message(original_message)}")
+        logger.info("Received message: %s", self._format_message(original_message))
 
+    @logs_only(_LOGGER, logging.DEBUG)
     def on_deserialized(
         self, original_message: Any, deserialized_message: Mapping[str, Any]
     ):
@@ -62,23 +123,25 @@ class GooglePubSubExecutorWithRequestId(
 
         logger = RequestIdLogger(_LOGGER, self.from_topic, request_id)
         logger.debug(
-            f"Message successfully deserialized into attributes: {deserialized_message}"
+            "Message successfully deserialized into attributes: %s",
+            self._payload(deserialized_message),
         )
 
     def on_deserialization_failed(self, original_message: Any, error: Exception):
         logger = RequestIdLogger(_LOGGER, self.from_topic)
         logger.exception(
-            f"Was not able to deserialize the following message: "
-            f"{_format_message(original_message)}"
+            "Was not able to deserialize the following message: %s",
+            self._format_message(original_message),
         )
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_handled(
         self, original_message: Any, deserialized_message: Mapping[str, Any], result
     ):
         assert self.deserializer is not None
         request_id = deserialized_message[self.deserializer.request_id_field]
         logger = RequestIdLogger(_LOGGER, self.from_topic, request_id)
-        logger.info(f"Message handled, result {result}")
+        logger.info("Message handled, result %s", self._payload(result))
 
     def on_handling_failed(
         self,
@@ -89,8 +152,9 @@ class GooglePubSubExecutorWithRequestId(
         assert self.deserializer is not None
         request_id = deserialized_message[self.deserializer.request_id_field]
         logger = RequestIdLogger(_LOGGER, self.from_topic, request_id)
-        logger.info(f'Failed to handle message, error {error}')
+        logger.info('Failed to handle message, error %s', error)
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_published(
         self,
         original_message: Any,
@@ -104,7 +168,9 @@ class GooglePubSubExecutorWithRequestId(
             request_id = deserialized_message[self.deserializer.request_id_field]
 
         logger = RequestIdLogger(_LOGGER, self.from_topic, request_id)
-        logger.info(f"Published serialized result: {serialized_message}")
+        logger.info(
+            "Published serialized result: %s", self._payload(serialized_message)
+        )
 
     def on_publishing_failed(
         self,
@@ -120,35 +186,23 @@ class GooglePubSubExecutorWithRequestId(
             request_id = deserialized_message[self.deserializer.request_id_field]
 
         logger = RequestIdLogger(_LOGGER, self.from_topic, request_id)
-        logger.exception(f"Failed to publish result: {serialized_message}")
+        logger.exception(
+            "Failed to publish result: %s", self._payload(serialized_message)
+        )
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_acknowledged(self, message: Any):
-        assert self.deserializer is not None
-        try:
-            msg: Mapping = self.deserializer.deserialize(message)
-            req_id = msg[self.deserializer.request_id_field]
-        except Exception:
-            req_id = ''
-        logger = RequestIdLogger(_LOGGER, self.from_topic, req_id)
+        logger = RequestIdLogger(_LOGGER, self.from_topic, self._request_id(message))
         logger.info('Message acknowledged.')
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_finished(self, original_message: Any, error: Optional[Exception]):
-        assert self.deserializer is not None
-        try:
-            msg: Mapping = self.deserializer.deserialize(original_message)
-            req_id = msg[self.deserializer.request_id_field]
-        except Exception:
-            req_id = ''
+        req_id = self._request_id(original_message)
         logger = RequestIdLogger(_LOGGER, self.from_topic, req_id)
         logger.info('Pipeline execution finished.')
 
     def on_stopped(self, original_message: Any, reason: str = ''):
-        assert self.deserializer is not None
-        try:
-            msg: Mapping = self.deserializer.deserialize(original_message)
-            req_id = msg[self.deserializer.request_id_field]
-        except Exception:
-            req_id = ''
+        req_id = self._request_id(original_message)
         logger = RequestIdLogger(_LOGGER, self.from_topic, req_id)
         s = "." if reason == "" else f" due to the reason: {reason}."
         logger.info(f'Stopped pipeline{s}')
@@ -14,9 +14,9 @@ class GoogleEarlyAckReceiver(GoogleBaseReceiver):
             '0.11.0',
         )
 
-    def _fetch_deserialized_and_result(self, message: Optional[Any]):
+    def _received(self, message: Optional[Any]):
+        super()._received(message)
         self.ack(message)
-        super()._fetch_deserialized_and_result(message)
 
 
 class GoogleEarlyAckReceiveAndReply(GoogleBaseReceiveAndReply):
@@ -28,6 +28,6 @@ class GoogleEarlyAckReceiveAndReply(GoogleBaseReceiveAndReply):
             '0.11.0',
         )
 
-    def _fetch_deserialized_and_result(self, message: Optional[Any]):
+    def _received(self, message: Optional[Any]):
+        super()._received(message)
         self.ack(message)
-        super()._fetch_deserialized_and_result(message)
@@ -1,4 +1,6 @@
-from typing import Any
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional
 
 from happyly.pubsub import BasePublisher
 
@@ -6,10 +8,26 @@ from happyly.pubsub import BasePublisher
 class GooglePubSubPublisher(BasePublisher):
     """
     Publisher for Google Pub/Sub.
-    Synchronously publishes the provided message to given topic.
+
+    :meth:`publish` synchronously publishes the provided message to given topic.
+    :meth:`publish_nowait` returns right away,
+    letting the client library batch messages in the background;
+    :class:`~happyly.listening.Executor` uses it
+    when publishing from its publisher threads,
+    and reports each message as published once Pub/Sub confirms it.
     """
 
-    def __init__(self, project: str, to_topic: str):
+    def __init__(
+        self, project: str, to_topic: str, max_outstanding: Optional[int] = 1000
+    ):
+        """
+        :param project: Google Cloud project
+        :param to_topic: Topic to publish to
+        :param max_outstanding: Max number of messages
+            started with :meth:`publish_nowait` but not confirmed yet.
+            When reached, :meth:`publish_nowait` blocks
+            until some message is confirmed. None means no limit.
+        """
         try:
             from google.cloud import pubsub_v1
         except ImportError:
@@ -20,14 +38,66 @@ class GooglePubSubPublisher(BasePublisher):
         super().__init__()
         self.project = project
         self.to_topic = to_topic
+        self.max_outstanding = max_outstanding
         self._publisher_client = pubsub_v1.PublisherClient()
+        self._topic_path = f'projects/{self.project}/topics/{self.to_topic}'
+        self._outstanding = 0
+        self._cond = threading.Condition(threading.Lock())
 
     def publish(self, serialized_message: Any):
-        future = self._publisher_client.publish(
-            f'projects/{self.project}/topics/{self.to_topic}', serialized_message
-        )
+        future = self._publisher_client.publish(self._topic_path, serialized_message)
         try:
             future.result()
             return
         except Exception as e:
             raise e
+
+    def publish_nowait(self, serialized_message: Any) -> Future:
+        with self._cond:
+            if self.max_outstanding is not None:
+                while self._outstanding >= self.max_outstanding:
+                    self._cond.wait()
+            self._outstanding += 1
+
+        done: Future = Future()
+        try:
+            google_future = self._publisher_client.publish(
+                self._topic_path, serialized_message
+            )
+        except Exception as e:
+            self._confirmed()
+            done.set_exception(e)
+            return done
+
+        def on_done(f):
+            self._confirmed()
+            error = f.exception()
+            if error is not None:
+                done.set_exception(error)
+            else:
+                done.set_result(None)
+
+        google_future.add_done_callback(on_done)
+        return done
+
+    def _confirmed(self):
+        with self._cond:
+            self._outstanding -= 1
+            self._cond.notify_all()
+
+    @property
+    def outstanding(self) -> int:
+        """
+        Number of messages started with :meth:`publish_nowait`
+        but not confirmed yet.
+        """
+        return self._outstanding
+
+    def flush(self):
+        """
+        Blocks until every message started with :meth:`publish_nowait`
+        is confirmed (or failed).
+        """
+        with self._cond:
+            while self._outstanding > 0:
+                self._cond.wait()
@@ -1,40 +1,133 @@
 import logging
+import threading
 import warnings
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 from happyly.caching.cacher import Cacher
 
 _LOGGER = logging.getLogger(__name__)
 
 
+_pools: Dict[Tuple[str, int, int], Any] = {}
+_pools_lock = threading.Lock()
+
+
+def _shared_pool(redis: Any, host: str, port: int, db: int):
+    # cachers connected to the same server share connections
+    with _pools_lock:
+        pool = _pools.get((host, port, db))
+        if pool is None:
+            pool = _pools[host, port, db] = redis.ConnectionPool(
+                host=host, port=port, db=db
+            )
+        return pool
+
+
 class RedisCacher(Cacher):
-    def __init__(self, host: str, port: int, prefix: str = ''):
+    """
+    Keeps cached data in a single Redis hash named `prefix`.
+
+    Cachers connected to the same server share a pool of connections.
+    Use :meth:`pipelined` or :meth:`add_many`/:meth:`remove_many`
+    to send several changes in a single round-trip.
+    """
+
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 6379,
+        prefix: str = '',
+        db: int = 0,
+        client: Optional[Any] = None,
+    ):
+        """
+        :param client: Redis client to use instead of connecting to `host`:`port`
+        """
         warnings.warn(
             'RedisCacher will be removed in happyly v0.11.0', DeprecationWarning
         )
 
-        try:
-            import redis
-        except ImportError as e:
-            raise ImportError('Please install redis>=3.0 to use this feature.') from e
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError(
+                    'Please install redis>=3.0 to use this feature.'
+                ) from e
+            client = redis.StrictRedis(
+                connection_pool=_shared_pool(redis, host, port, db)
+            )
+            _LOGGER.info(
+                f'Cache was successfully initialized with Redis client ({host}:{port})'
+            )
         self.prefix = prefix
-        self.client = redis.StrictRedis(host=host, port=port)
-        _LOGGER.info(
-            f'Cache was successfully initialized with Redis client ({host}:{port})'
-        )
+        self.client = client
+        self._local = threading.local()
         if self.prefix != '':
             _LOGGER.info(f'Using prefix {self.prefix}')
 
+    def _writer(self) -> Any:
+        # pipeline of the current thread if it's inside `pipelined`
+        return getattr(self._local, 'pipeline', None) or self.client
+
+    @contextmanager
+    def pipelined(self):
+        """
+        Changes made by the current thread inside the block
+        are sent to Redis together when the block exits::
+
+            with cacher.pipelined():
+                cacher.add(data, key)
+                cacher.remove(other_key)
+
+        Changes aren't visible to :meth:`get` until then.
+        If the block raises an exception, nothing is sent.
+        """
+        if getattr(self._local, 'pipeline', None) is not None:
+            # nested block, changes are sent by the outer one
+            yield
+            return
+        pipeline = self._local.pipeline = self.client.pipeline(transaction=False)
+        try:
+            yield
+            pipeline.execute()
+        finally:
+            self._local.pipeline = None
+
     def add(self, data: str, key: str):
-        self.client.hset(self.prefix, key, data)
-        _LOGGER.info(f'Cached message with id {key}')
+        self._writer().hset(self.prefix, key, data)
+        _LOGGER.info('Cached message with id %s', key)
 
     def remove(self, key: str):
-        self.client.hdel(self.prefix, key)
-        _LOGGER.info(f'Message with id {key} was removed from cache')
+        self._writer().hdel(self.prefix, key)
+        _LOGGER.info('Message with id %s was removed from cache', key)
+
+    def add_many(self, items: Mapping[str, Any]):
+        if not items:
+            return
+        with self.pipelined():
+            writer = self._writer()
+            for key, data in items.items():
+                writer.hset(self.prefix, key, data)
+        _LOGGER.info('Cached %d messages', len(items))
+
+    def remove_many(self, keys: Iterable[str]):
+        keys = list(keys)
+        if not keys:
+            return
+        self._writer().hdel(self.prefix, *keys)
+        _LOGGER.info('%d messages were removed from cache', len(keys))
 
     def get(self, key: str):
-        self.client.hget(self.prefix, key)
+        return self.client.hget(self.prefix, key)
+
+    def get_all(self) -> List[Any]:
+        return list(self.client.hgetall(self.prefix).values())
 
-    def get_all(self):
-        keys = self.client.hkeys(self.prefix)
-        return [self.client.hget(self.prefix, k) for k in keys]
+    def iter_all(self, count: int = 1000) -> Iterator[Tuple[Any, Any]]:
+        """
+        Yields (key, data) pairs fetched by portions of about `count` items,
+        so that a large cache isn't loaded into memory at once.
+        """
+        return self.client.hscan_iter(self.prefix, count=count)
@@ -1,5 +1,6 @@
 import logging
-from typing import Callable, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Any, Optional
 
 from happyly.pubsub import SubscriberWithAck
 
@@ -8,7 +9,29 @@ _LOGGER = logging.getLogger(__name__)
 
 
 class GooglePubSubSubscriber(SubscriberWithAck):
-    def __init__(self, project: str, subscription_name: str):
+    def __init__(
+        self,
+        project: str,
+        subscription_name: str,
+        max_messages: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        scheduler_factory: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        :param project: Google Cloud project
+        :param subscription_name: Subscription to listen to
+        :param max_messages: Max number of messages which are received
+            but not acked yet (flow control). Library's default if None.
+        :param max_bytes: Max total size of messages which are received
+            but not acked yet (flow control). Library's default if None.
+        :param max_workers: Number of threads which run the callback.
+            Library's default if None.
+        :param scheduler_factory: Function which creates a scheduler
+            (:class:`google.cloud.pubsub_v1.subscriber.scheduler.Scheduler`)
+            for each :meth:`subscribe` call.
+            Takes precedence over `max_workers`.
+        """
         try:
             from google.cloud import pubsub_v1
         except ImportError:
@@ -19,15 +42,58 @@ class GooglePubSubSubscriber(SubscriberWithAck):
         super().__init__()
         self.project = project
         self.subscription_name = subscription_name
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.scheduler_factory = scheduler_factory
         s = pubsub_v1.SubscriberClient()
         self._subscription_path = s.subscription_path(
             self.project, self.subscription_name
         )
         self._subscription_client = s
 
+    @property
+    def max_in_flight(self) -> Optional[int]:
+        return self.max_messages
+
+    def _flow_control(self):
+        from google.cloud import pubsub_v1
+
+        limits = {}
+        if self.max_messages is not None:
+            limits['max_messages'] = self.max_messages
+        if self.max_bytes is not None:
+            limits['max_bytes'] = self.max_bytes
+        if not limits:
+            return None
+        return pubsub_v1.types.FlowControl(**limits)
+
+    def _scheduler(self):
+        if self.scheduler_factory is not None:
+            return self.scheduler_factory()
+        if self.max_workers is None:
+            return None
+        from google.cloud.pubsub_v1.subscriber.scheduler import ThreadScheduler
+
+        return ThreadScheduler(
+            executor=ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f'{self.subscription_name}-callback',
+            )
+        )
+
     def subscribe(self, callback: Callable[[Any], Any]):
         _LOGGER.info(f'Starting to listen to {self.subscription_name}')
-        return self._subscription_client.subscribe(self._subscription_path, callback)
+        kwargs = {}
+        flow_control = self._flow_control()
+        if flow_control is not None:
+            kwargs['flow_control'] = flow_control
+        scheduler = self._scheduler()
+        if scheduler is not None:
+            kwargs['scheduler'] = scheduler
+        return self._subscription_client.subscribe(
+            self._subscription_path, callback, **kwargs
+        )
 
     def ack(self, message):
         message.ack()
@@ -1,2 +1,3 @@
 from .handler import Handler  # noqa: F401
 from .dummy_handler import DUMMY_HANDLER  # noqa: F401
+from .memoized import MemoizedHandler  # noqa: F401
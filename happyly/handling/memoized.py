@@ -0,0 +1,175 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Sequence, Union
+
+from happyly.serialization.cached import freeze
+from happyly.utils import generator_check
+from happyly.utils.lru import LRUCache, CacheCounters, MISSING
+from .handler import Handler
+
+_ABSENT = object()
+
+KeyType = Union[None, Sequence[str], Callable[[Mapping[str, Any]], Hashable]]
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, Mapping):
+        return dict, frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if value is True or value is False:
+        # True == 1, but results for them may differ
+        return bool, value
+    return value
+
+
+def _key_function(key: KeyType) -> Callable[[Mapping[str, Any]], Hashable]:
+    if key is None:
+        return _hashable
+    if callable(key):
+        return key
+    fields = tuple(key)
+
+    def key_by_fields(message):
+        return tuple(_hashable(message.get(field, _ABSENT)) for field in fields)
+
+    return key_by_fields
+
+
+class _Flight:
+    """
+    Computation which concurrent callers with the same key wait for.
+    """
+
+    __slots__ = ('done', 'results', 'ok')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.results = None
+        self.ok = False
+
+
+class MemoizedHandler(Handler):
+    """
+    Handler which remembers results of another handler,
+    to be used with handlers which are pure functions of message attributes
+    (lookups, enrichment, etc.)::
+
+        executor = Executor(handler=MemoizedHandler(enrich, key=['user_id']))
+
+    Executor treats it just like the wrapped handler,
+    so results taken from the cache are passed to `on_handled`
+    and published as usual.
+
+    Results of a generator handler are collected into a list
+    which is replayed for each following message with the same key,
+    so a generator which fails gives back no results at all.
+    Results are frozen (see :class:`~happyly.serialization.cached.FrozenDict`)
+    so that other stages can't corrupt the cached value.
+
+    Concurrent messages with the same key are handled once:
+    the first one runs the handler, the others wait for its results.
+    Failures are not cached, each message which gets one
+    is passed to wrapped handler's `on_handling_failed` (if any).
+
+    The cache is not shared between processes,
+    so memoization is useless with `handling_pool`.
+    """
+
+    def __init__(
+        self,
+        handler: Union[Handler, Callable[[Mapping[str, Any]], Any]],
+        key: KeyType = None,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+    ):
+        """
+        :param handler: Handler whose results are memoized
+        :param key: What identifies a message:
+            None means all its attributes,
+            a list of attribute names means only these attributes,
+            a function gets message attributes and returns a hashable key
+            (or None if the message shouldn't be memoized)
+        :param max_size: Max number of memoized messages,
+            the least recently used ones are evicted first
+        :param ttl: Seconds after which memoized results expire,
+            None means results don't expire
+        """
+        if generator_check.is_coroutine(handler) or (
+            generator_check.is_async_generator(handler)
+        ):
+            raise TypeError('Only synchronous handlers can be memoized.')
+        self.__wrapped__ = handler
+        self.handler = handler
+        self._is_generator = generator_check.is_generator(handler)
+        self._key = _key_function(key)
+        self._cache = LRUCache(max_size, ttl)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _compute(self, message: Mapping[str, Any]) -> tuple:
+        handle = getattr(self.handler, 'handle', self.handler)
+        if self._is_generator:
+            return tuple(freeze(result) for result in handle(message))
+        return (freeze(handle(message)),)
+
+    def _message_key(self, message: Mapping[str, Any]) -> Optional[Hashable]:
+        try:
+            key = self._key(message)
+            hash(key)
+        except TypeError:  # unhashable attributes
+            return None
+        return key
+
+    def _results(self, message: Mapping[str, Any]) -> tuple:
+        key = self._message_key(message)
+        if key is None:
+            return self._compute(message)
+        results = self._cache.get(key)
+        if results is not MISSING:
+            return results
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.ok:
+                return flight.results
+            return self._compute(message)
+
+        try:
+            results = self._compute(message)
+            flight.results, flight.ok = results, True
+            self._cache.put(key, results)
+            return results
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def handle(self, message: Mapping[str, Any]) -> Optional[Mapping[str, Any]]:
+        return self._results(message)[0]
+
+    def on_handling_failed(
+        self, message: Mapping[str, Any], error: Exception
+    ) -> Optional[Mapping[str, Any]]:
+        if isinstance(self.handler, Handler):
+            return self.handler.on_handling_failed(message, error)
+        raise error
+
+    def __call__(self, message: Mapping[str, Any]):
+        if self._is_generator:
+            return self._replay(message)
+        return super().__call__(message)
+
+    def _replay(self, message: Mapping[str, Any]):
+        yield from self._results(message)
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def counters(self) -> CacheCounters:
+        return self._cache.counters
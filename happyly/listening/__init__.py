@@ -2,3 +2,11 @@
 
 from .listener import BaseListener, EarlyAckListener, LateAckListener, ListenerWithAck
 from .executor import Executor
+from .async_executor import (
+    AsyncExecutor,
+    AsyncExecutorWithAck,
+    AsyncEarlyAckExecutor,
+    AsyncLateAckExecutor,
+)
+from .stats import PipelineStats, StageSnapshot
+from .context import MessageContext
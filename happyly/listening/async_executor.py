@@ -0,0 +1,383 @@
+"""
+:class:`AsyncExecutor` runs pipeline stages as coroutines
+so that many messages can be processed concurrently on a single event loop.
+"""
+
+import asyncio
+import inspect
+import logging
+from types import FunctionType
+from typing import Any, AsyncIterator, Iterable, Mapping, Optional, Tuple
+
+from happyly.exceptions import StopPipeline, FetchedNoResult
+from happyly.handling import Handler, DUMMY_HANDLER
+from happyly.pubsub import BasePublisher, AsyncPublisher
+from happyly.serialization import (
+    Deserializer,
+    AsyncDeserializer,
+    Serializer,
+    AsyncSerializer,
+)
+from happyly.utils import generator_check
+from .executor import Executor, ResultAndDeserialized, _Result
+from .listener import ExecutorWithAck, EarlyAckExecutor, LateAckExecutor
+from . import stats as _stats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _async_aware_converter(component, sync_base, async_base):
+    if isinstance(component, (sync_base, async_base)):
+        return component
+    elif isinstance(component, FunctionType):
+        if inspect.iscoroutinefunction(component):
+            return async_base.from_function(component)
+        return sync_base.from_function(component)
+    else:
+        raise TypeError
+
+
+async def _maybe_await(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+class AsyncExecutor(Executor):
+    """
+    :class:`Executor` which runs the pipeline as a coroutine.
+
+    Besides everything accepted by :class:`Executor`, it accepts
+    `async def` handlers (functions or :class:`Handler` subclasses
+    with `async def handle`), async-generator handlers,
+    as well as :class:`.AsyncDeserializer`, :class:`.AsyncSerializer`
+    and :class:`.AsyncPublisher`.
+    Synchronous publishers are run in the event loop's default executor
+    so that they don't block the loop.
+
+    Callbacks are the same synchronous methods as in :class:`Executor`
+    and have the same semantics, including :exc:`.StopPipeline`.
+    They run on the event loop, so keep them fast.
+    """
+
+    def __init__(
+        self,
+        handler: Any = DUMMY_HANDLER,
+        deserializer: Optional[Any] = None,
+        publisher: Optional[Any] = None,
+        serializer: Optional[Any] = None,
+        subscriber: Optional[Any] = None,
+        **kwargs,
+    ):
+        super().__init__(
+            handler=handler,
+            deserializer=None,
+            publisher=None,
+            serializer=None,
+            subscriber=subscriber,
+            **kwargs,
+        )
+        if deserializer is not None:
+            self.deserializer = _async_aware_converter(
+                deserializer, Deserializer, AsyncDeserializer
+            )
+        if publisher is not None:
+            self.publisher = _async_aware_converter(
+                publisher, BasePublisher, AsyncPublisher
+            )
+        if serializer is not None:
+            self.serializer = _async_aware_converter(
+                serializer, Serializer, AsyncSerializer
+            )
+
+    def _create_run_pool(self):
+        # messages are run concurrently by the event loop instead
+        return None
+
+    async def _deserialize_async(self, message: Optional[Any]):
+        started = _stats.clock() if self.stats is not None else 0.0
+        try:
+            deserialized = await _maybe_await(self.deserializer.deserialize(message))
+        except Exception as e:
+            deserialized = e
+        return self._deserialized(message, deserialized, started)
+
+    async def _build_error_result_async(self, message: Any, error: Exception):
+        try:
+            error_result = await _maybe_await(
+                self.deserializer.build_error_result(message, error)
+            )
+        except Exception as new_e:
+            _LOGGER.exception('')
+            _LOGGER.error("Deserialization failed and error result cannot be built.")
+            raise new_e from new_e
+        return error_result
+
+    async def _call_handler_async(self, deserialized: Mapping[str, Any]):
+        if not isinstance(self.handler, Handler):
+            return await self.handler(deserialized)  # type: ignore
+        # Handler.__call__ would not catch errors raised while awaiting
+        try:
+            return await self.handler.handle(deserialized)  # type: ignore
+        except Exception as e:
+            return await _maybe_await(
+                self.handler.on_handling_failed(deserialized, e)  # type: ignore
+            )
+
+    async def _handle_async(
+        self, message: Optional[Any], deserialized: Mapping[str, Any]
+    ) -> AsyncIterator[_Result]:
+        notify = self._callback_enabled('on_handled')
+        stats = self.stats
+        started = _stats.clock() if stats is not None else 0.0
+        try:
+            if generator_check.is_async_generator(self.handler):
+                async for result in self.handler(deserialized):  # type: ignore
+                    if notify:
+                        self.on_handled(
+                            original_message=message,
+                            deserialized_message=deserialized,
+                            result=result,
+                        )
+                    if stats is not None:
+                        stats.record(_stats.HANDLE, _stats.clock() - started)
+                    yield result
+                    if stats is not None:
+                        started = _stats.clock()
+            elif generator_check.is_generator(self.handler):
+                for result in self.handler(deserialized):  # type: ignore
+                    if notify:
+                        self.on_handled(
+                            original_message=message,
+                            deserialized_message=deserialized,
+                            result=result,
+                        )
+                    if stats is not None:
+                        stats.record(_stats.HANDLE, _stats.clock() - started)
+                    yield result
+                    if stats is not None:
+                        started = _stats.clock()
+            else:
+                if generator_check.is_coroutine(self.handler):
+                    result = await self._call_handler_async(deserialized)
+                else:
+                    result = self.handler(deserialized)  # type: ignore
+                if notify:
+                    self.on_handled(
+                        original_message=message,
+                        deserialized_message=deserialized,
+                        result=result,
+                    )
+                if stats is not None:
+                    stats.record(_stats.HANDLE, _stats.clock() - started)
+                yield result
+        except Exception as e:
+            try:
+                self.on_handling_failed(
+                    original_message=message, deserialized_message=deserialized, error=e
+                )
+            finally:
+                if stats is not None:
+                    stats.record(_stats.HANDLE, _stats.clock() - started, ok=False)
+            raise e from e
+
+    async def _fetch_deserialized_and_result_async(
+        self, message: Optional[Any]
+    ) -> AsyncIterator[ResultAndDeserialized]:
+        try:
+            deserialized = await self._deserialize_async(message)
+        except StopPipeline as e:
+            raise e from e
+        except Exception as e:
+            yield ResultAndDeserialized(
+                result=await self._build_error_result_async(message, e),
+                deserialized=None,
+            )
+            return
+
+        async for result in self._handle_async(message, deserialized):
+            yield ResultAndDeserialized(result=result, deserialized=deserialized)
+
+    async def _serialize_async(
+        self,
+        original_message: Optional[Any],
+        parsed_message: Optional[Mapping[str, Any]],
+        result: Mapping[str, Any],
+    ) -> Any:
+        started = _stats.clock() if self.stats is not None else 0.0
+        try:
+            serialized = await _maybe_await(self.serializer.serialize(result))
+        except Exception as e:
+            serialized = e
+        return self._serialized(
+            original_message, parsed_message, result, serialized, started
+        )
+
+    async def _run_core_async(
+        self, message: Optional[Any] = None
+    ) -> AsyncIterator[Tuple[Optional[Mapping[str, Any]], _Result, Optional[Any]]]:
+        self._received(message)
+        async for result, deserialized in self._fetch_deserialized_and_result_async(
+            message
+        ):
+            if result is not None:
+                serialized = await self._serialize_async(message, deserialized, result)
+            else:
+                serialized = None
+            yield deserialized, result, serialized
+
+    async def _try_publish_async(
+        self,
+        original: Any,
+        parsed: Optional[Mapping[str, Any]],
+        result: _Result,
+        serialized: Any,
+    ):
+        assert self.publisher is not None
+        started = _stats.clock() if self.stats is not None else 0.0
+        try:
+            if isinstance(self.publisher, AsyncPublisher):
+                await self.publisher.publish(serialized)
+            else:
+                await asyncio.get_event_loop().run_in_executor(
+                    None, self.publisher.publish, serialized
+                )
+        except Exception as e:
+            error: Optional[Exception] = e
+        else:
+            error = None
+        self._published(original, parsed, result, serialized, error, started)
+
+    async def run(self, message: Optional[Any] = None):  # type: ignore
+        """
+        Coroutine which executes pipeline stages.
+
+        To stop the pipeline
+        raise StopPipeline inside any callback.
+
+        :param message: Message as is, without deserialization.
+            Or message attributes
+            if the executor was instantiated with neither a deserializer nor a handler
+        """
+        context = self.context_class(message)
+        token = self._current.set(context)
+        try:
+            async for deserialized, result, serialized in self._run_core_async(message):
+                context.deserialized = deserialized
+                context.result = result
+                context.serialized = serialized
+                if self.publisher is not None and serialized is not None:
+                    await self._try_publish_async(
+                        message, deserialized, result, serialized
+                    )
+        except StopPipeline as e:
+            context.stop_reason = e.reason
+            self.on_stopped(original_message=message, reason=e.reason)
+        except Exception as e:
+            context.error = e
+            self._finish(message, e)
+        else:
+            self._finish(message, None)
+        finally:
+            context.finish()
+            self._current.reset(token)
+        stats = self.stats
+        if stats is not None:
+            stats.record(_stats.PIPELINE, context.elapsed, context.error is None)
+
+    async def run_batch(self, messages: Iterable[Any]):  # type: ignore
+        """
+        Runs the pipeline for several messages concurrently.
+
+        :param messages: Messages as is, without deserialization.
+        """
+        await asyncio.gather(*(self.run(message) for message in messages))
+
+    async def run_for_result(self, message: Optional[Any] = None):  # type: ignore
+        """
+        Coroutine which executes pipeline stages
+        and returns the serialized result.
+
+        For generator handlers (sync or async),
+        returns a list of all serialized results.
+        """
+        context = self.context_class(message)
+        token = self._current.set(context)
+        try:
+            results = [
+                serialized async for _, _, serialized in self._run_core_async(message)
+            ]
+        except StopPipeline as e:
+            context.stop_reason = e.reason
+            self.on_stopped(original_message=message, reason=e.reason)
+            raise FetchedNoResult from e
+        except Exception as e:
+            context.error = e
+            self._finish(message, e)
+            raise FetchedNoResult from e
+        else:
+            self._finish(message, None)
+            if generator_check.is_generator(
+                self.handler
+            ) or generator_check.is_async_generator(self.handler):
+                return results
+            return results[0]
+        finally:
+            context.finish()
+            self._current.reset(token)
+
+    def start_listening(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Subscribes to messages using the subscriber
+        and schedules :meth:`run` for each received message on the given loop.
+
+        Subscriber's callback returns right away,
+        so the number of messages processed concurrently is limited
+        by subscriber's own flow control.
+
+        :param loop: Running event loop which executes the pipelines.
+            Defaults to the current event loop.
+        """
+        if self.subscriber is None:
+            raise Exception('Cannot subscribe since subscriber is not initialized.')
+        if loop is None:
+            loop = asyncio.get_event_loop()
+
+        def callback(message: Any):
+            asyncio.run_coroutine_threadsafe(self.run(message), loop)
+
+        return self.subscriber.subscribe(callback=callback)
+
+
+class AsyncExecutorWithAck(AsyncExecutor, ExecutorWithAck):
+    """
+    Acknowledge-aware :class:`AsyncExecutor`.
+    Counterpart of :class:`.ExecutorWithAck`.
+    """
+
+    async def _deserialize_async(self, message: Optional[Any]):
+        deserialized = await super()._deserialize_async(message)
+        if self.processed_ids is not None:
+            self._skip_processed(message, deserialized)
+        return deserialized
+
+
+class AsyncEarlyAckExecutor(AsyncExecutorWithAck, EarlyAckExecutor):
+    """
+    :class:`AsyncExecutor` which performs :meth:`.ack` right after
+    :meth:`.on_received` callback is finished.
+    Counterpart of :class:`.EarlyAckExecutor`.
+    """
+
+
+class AsyncLateAckExecutor(AsyncExecutorWithAck, LateAckExecutor):
+    """
+    :class:`AsyncExecutor` which performs :meth:`.ack`
+    at the very end of pipeline.
+    Counterpart of :class:`.LateAckExecutor`.
+    """
+
+
+AsyncListenerWithAck = AsyncExecutorWithAck
+AsyncEarlyAckListener = AsyncEarlyAckExecutor
+AsyncLateAckListener = AsyncLateAckExecutor
@@ -0,0 +1,102 @@
+"""
+Pool of threads which run pipelines of :class:`~happyly.listening.Executor`
+concurrently, with a bounded number of messages in flight.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RunPool:
+    """
+    Runs a function for each submitted message in a pool of threads.
+
+    At most `max_in_flight` messages are processed (or wait for a thread)
+    at the same time. When the limit is reached, :meth:`submit`
+    blocks the caller (e.g. subscriber's callback thread)
+    until some message is finished,
+    which gives natural backpressure to the message source.
+
+    Threads are started lazily, on the first :meth:`submit`.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Any], Any],
+        workers: int,
+        max_in_flight: Optional[int] = None,
+        name: str = 'happyly-run',
+    ):
+        """
+        :param run: Function which processes a single message
+        :param workers: Number of threads which run the function
+        :param max_in_flight: Max number of messages submitted but not finished yet.
+            Defaults to `workers`.
+        :param name: Prefix for names of threads
+        """
+        if workers < 1:
+            raise ValueError('RunPool requires at least one worker.')
+        if max_in_flight is None:
+            max_in_flight = workers
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight should be positive.')
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self._run = run
+        self._name = name
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError('Cannot submit to a RunPool after shutdown.')
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix=self._name
+                    )
+        return self._executor
+
+    def submit(self, message: Any) -> Future:
+        """
+        Schedules processing of the message.
+        Blocks while `max_in_flight` messages are being processed.
+
+        :return: Future which is resolved when the message is processed
+        """
+        executor = self._get_executor()
+        self._slots.acquire()
+        try:
+            future = executor.submit(self._run, message)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        self._slots.release()
+        if not future.cancelled() and future.exception() is not None:
+            _LOGGER.error(
+                'Unhandled exception while running the pipeline',
+                exc_info=future.exception(),
+            )
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the threads after all submitted messages are processed.
+
+        :param wait: Whether to block until that happens
+        """
+        with self._lock:
+            self._closed = True
+            executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=wait)
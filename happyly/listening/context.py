@@ -0,0 +1,141 @@
+"""
+Per-message state of a pipeline run, see :attr:`Executor.context`.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Mapping, Optional
+
+from . import stats as _stats
+
+try:
+    import contextvars
+except ImportError:  # Python 3.6
+    contextvars = None  # type: ignore
+
+
+class MessageContext:
+    """
+    State of a single message going through the pipeline.
+
+    Created once per message and filled by the executor as stages are performed,
+    so callbacks may look at what other stages produced
+    without recomputing it.
+    If the handler yields several results,
+    `result` and `serialized` refer to the latest one.
+
+    Subclasses may add their own slots
+    and be set as :attr:`Executor.context_class`.
+    """
+
+    __slots__ = (
+        'message',
+        'deserialized',
+        'result',
+        'serialized',
+        'error',
+        'stop_reason',
+        'request_id',
+        'acked',
+        'done',
+        'started',
+        'finished',
+    )
+
+    def __init__(self, message: Any):
+        self.message = message
+        """
+        Message as it has been received, without any deserialization
+        """
+        self.deserialized: Optional[Mapping[str, Any]] = None
+        self.result: Optional[Mapping[str, Any]] = None
+        self.serialized: Any = None
+        self.error: Optional[Exception] = None
+        """
+        The first exception which failed the pipeline, if any
+        """
+        self.stop_reason: Optional[str] = None
+        """
+        Reason of :exc:`.StopPipeline` if the pipeline was stopped
+        """
+        self.request_id: Optional[str] = None
+        """
+        Request id of the message if the executor knows about request ids
+        """
+        self.acked = False
+        self.done = False
+        self.started = _stats.clock()
+        self.finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Seconds since the message was received,
+        until the pipeline was finished if it's done.
+        """
+        end = self.finished if self.finished is not None else _stats.clock()
+        return end - self.started
+
+    def stop(self, reason: str):
+        self.stop_reason = reason
+        self.finish()
+
+    def fail(self, error: Exception):
+        if self.error is None:
+            self.error = error
+        self.finish()
+
+    def finish(self):
+        if not self.done:
+            self.done = True
+            self.finished = _stats.clock()
+
+    def __repr__(self):
+        return (
+            f'<{type(self).__name__} request_id={self.request_id!r} '
+            f'done={self.done} acked={self.acked}>'
+        )
+
+
+class CurrentContext:
+    """
+    Context of the message which is being processed by the current thread
+    (or asyncio task, on Python 3.7+).
+    """
+
+    __slots__ = ('_var', '_local')
+
+    def __init__(self):
+        if contextvars is not None:
+            self._var = contextvars.ContextVar('happyly_message', default=None)
+        else:
+            self._local = threading.local()
+
+    def get(self) -> Optional[MessageContext]:
+        if contextvars is not None:
+            return self._var.get()
+        return getattr(self._local, 'context', None)
+
+    def set(self, context: Optional[MessageContext]) -> Any:
+        """
+        :return: Token which restores the previous context, see :meth:`reset`
+        """
+        if contextvars is not None:
+            return self._var.set(context)
+        previous = getattr(self._local, 'context', None)
+        self._local.context = context
+        return previous
+
+    def reset(self, token: Any):
+        if contextvars is not None:
+            self._var.reset(token)
+        else:
+            self._local.context = token
+
+    @contextmanager
+    def activate(self, context: Optional[MessageContext]):
+        token = self.set(context)
+        try:
+            yield context
+        finally:
+            self.reset(token)
@@ -1,7 +1,6 @@
 import logging
-import threading
-import queue
 from collections import namedtuple
+from concurrent.futures import Executor as PoolExecutor, Future
 from types import FunctionType
 from typing import (
     Mapping,
@@ -13,6 +12,8 @@ from typing import (
     Union,
     Callable,
     Iterator,
+    Iterable,
+    List,
 )
 
 from happyly.utils import generator_check
@@ -24,6 +25,13 @@ from happyly.serialization.serializer import Serializer
 from happyly.pubsub import BasePublisher
 from happyly.serialization import DUMMY_SERDE
 from happyly.pubsub import BaseSubscriber
+from .publishing import PublisherPool, PendingPublishes
+from .process_handling import ProcessHandling
+from .concurrency import RunPool
+from . import stats as _stats
+from .stats import PipelineStats
+from .context import MessageContext, CurrentContext
+from happyly.logs.lazy import Payload, logs_only, callback_gate, DEFAULT_PAYLOAD_LIMIT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +46,72 @@ ResultAndDeserialized = namedtuple('ResultAndDeserialized', 'result deserialized
 HandlerClsOrFn = Union[Handler, Callable[[Mapping[str, Any]], _Result]]
 
 
+def _identity_transform(message):
+    # the same as DUMMY_SERDE does, without a method call
+    if isinstance(message, Mapping):
+        return message
+    return DUMMY_SERDE.deserialize(message)
+
+
+class _PipelinePlan:
+    """
+    Facts about executor's configuration which don't change from message to message,
+    analysed once so that they aren't re-checked for every message.
+    """
+
+    __slots__ = (
+        'handler_is_generator',
+        'straight',
+        'stream_to_publisher',
+        'publishes_nowait',
+        'deserialize',
+        'serialize',
+        'callback_gates',
+    )
+
+    def __init__(self, executor: 'Executor'):
+        self.handler_is_generator = generator_check.is_generator(executor.handler)
+        # non-generator handler runs without any nested generators and queues,
+        # unless the subclass relies on them
+        internals_overridden = any(
+            getattr(type(executor), name) is not getattr(Executor, name)
+            for name in _PIPELINE_INTERNALS
+        )
+        in_process = executor._process_handling is None
+        self.straight = (
+            not self.handler_is_generator and in_process and not internals_overridden
+        )
+        # results are serialized by publisher threads
+        # concurrently with handling of the next ones
+        publishes = executor.publisher is not None
+        self.stream_to_publisher = publishes and not (
+            self.straight or internals_overridden
+        )
+        # publisher completes messages in the background (e.g. in batches),
+        # so publisher threads don't wait for each of them
+        self.publishes_nowait = publishes and _overrides(
+            executor.publisher, BasePublisher, 'publish_nowait'
+        )
+        if _overrides(executor, Executor, '_try_publish'):
+            self.publishes_nowait = False
+        self.deserialize = executor._deserialize_function()
+        self.serialize = (
+            _identity_transform
+            if executor.serializer is DUMMY_SERDE
+            else executor.serializer.serialize
+        )
+        # callbacks which only log are skipped when logging is disabled
+        self.callback_gates = {
+            name: callback_gate(getattr(type(executor), name), executor.quiet)
+            for name in _HOT_CALLBACKS
+            if hasattr(type(executor), name)
+        }
+
+
+def _overrides(obj: Any, base: type, name: str) -> bool:
+    return getattr(type(obj), name, None) is not getattr(base, name)
+
+
 def _deser_converter(deserializer: Union[Deserializer, Callable]):
     if isinstance(deserializer, FunctionType):
         return Deserializer.from_function(deserializer)
@@ -82,30 +156,120 @@ class Executor(Generic[D, P, SE, S]):
     depending on concrete components provided to executor's constructor.
     """
 
-    handler: HandlerClsOrFn
+    subscriber: Optional[S]
+
+    context_class = MessageContext
     """
-    Provides implementation of handling stage to Executor.
+    Class of :attr:`context` objects, created once per message.
     """
 
-    deserializer: D
-    # Why type:ignore? Because DUMMY_SERDE is a subclass of Deserializer
-    # but not necessarily subclass of whatever D will be in runtime.
+    wait_for_publishing = True
     """
-    Provides implementation of deserialization stage to Executor.
-
-    If not present, no deserialization is performed.
+    Whether :meth:`run` waits until every result is published
+    (or confirmed by the publisher, see :meth:`.BasePublisher.publish_nowait`)
+    before finishing the pipeline,
+    so that `on_finished` gets the first publishing error, if any.
+
+    Set it to False in a subclass to opt into fire-and-forget publishing:
+    `on_finished` is called as soon as all results are handed over
+    to the publisher, failures which happen after that are reported
+    only to `on_publishing_failed` (:exc:`.StopPipeline` raised by their callbacks
+    is ignored), and results which are not published yet are lost
+    if the process exits without :meth:`shutdown`.
+    Don't do it for executors which ack messages in `on_finished`.
     """
 
-    publisher: Optional[P]
-    """
-    Provides implementation of serialization and publishing stages to Executor.
+    _plan: Optional[_PipelinePlan] = None
 
-    If not present, no publishing is performed.
-    """
+    @property
+    def handler(self) -> HandlerClsOrFn:
+        """
+        Provides implementation of handling stage to Executor.
+        """
+        return self._handler
 
-    serializer: SE
+    @handler.setter
+    def handler(self, handler: HandlerClsOrFn):
+        self._handler = handler
+        self._plan = None
 
-    subscriber: Optional[S]
+    @property
+    def deserializer(self) -> D:
+        # Why type:ignore? Because DUMMY_SERDE is a subclass of Deserializer
+        # but not necessarily subclass of whatever D will be in runtime.
+        """
+        Provides implementation of deserialization stage to Executor.
+
+        If not present, no deserialization is performed.
+        """
+        return self._deserializer
+
+    @deserializer.setter
+    def deserializer(self, deserializer: D):
+        self._deserializer = deserializer
+        self._plan = None
+
+    @property
+    def publisher(self) -> Optional[P]:
+        """
+        Provides implementation of serialization and publishing stages to Executor.
+
+        If not present, no publishing is performed.
+        """
+        return self._publisher
+
+    @publisher.setter
+    def publisher(self, publisher: Optional[P]):
+        self._publisher = publisher
+        self._plan = None
+
+    @property
+    def quiet(self) -> bool:
+        """
+        If True, callbacks which only log are not called at all,
+        see the constructor's `quiet` argument.
+        """
+        return self._quiet
+
+    @quiet.setter
+    def quiet(self, quiet: bool):
+        self._quiet = quiet
+        self._plan = None
+
+    @property
+    def serializer(self) -> SE:
+        return self._serializer
+
+    @serializer.setter
+    def serializer(self, serializer: SE):
+        self._serializer = serializer
+        self._plan = None
+
+    def _get_plan(self) -> _PipelinePlan:
+        plan = self._plan
+        if plan is None:
+            plan = self._plan = _PipelinePlan(self)
+        return plan
+
+    def _deserialize_function(self) -> Callable[[Any], Mapping[str, Any]]:
+        # function which deserialization stage uses, computed once per plan
+        if self.deserializer is DUMMY_SERDE:
+            return _identity_transform
+        return self.deserializer.deserialize
+
+    @property
+    def context(self) -> Optional[MessageContext]:
+        """
+        State of the message which is being processed by the current thread
+        (or asyncio task), available to callbacks.
+        None outside of a pipeline run.
+        """
+        return self._current.get()
+
+    def _callback_enabled(self, name: str) -> bool:
+        gate = self._get_plan().callback_gates[name]
+        # a callback set on the instance (e.g. patched) is always called
+        return gate is None or name in self.__dict__ or gate()
 
     def __init__(
         self,
@@ -114,7 +278,66 @@ class Executor(Generic[D, P, SE, S]):
         publisher: Optional[Union[P, Callable]] = None,
         serializer: Optional[Union[SE, Callable]] = None,
         subscriber: Optional[S] = None,
+        publisher_workers: int = 1,
+        publisher_queue_size: int = 1000,
+        handling_pool: Optional[PoolExecutor] = None,
+        workers: int = 0,
+        max_in_flight: Optional[int] = None,
+        quiet: bool = False,
+        log_payload_limit: Optional[int] = DEFAULT_PAYLOAD_LIMIT,
+        collect_stats: bool = False,
+        max_pending_results: Optional[int] = None,
     ):
+        """
+        :param publisher_workers: Number of threads which publish results.
+            They are started on the first publishing
+            and are reused by all the following runs until :meth:`shutdown`.
+        :param publisher_queue_size: Max number of results waiting to be published.
+            When reached, the pipeline waits for publishers to catch up.
+            0 means unbounded.
+        :param handling_pool: Pool (usually
+            :class:`~concurrent.futures.ProcessPoolExecutor`)
+            which runs the handling stage, useful for CPU-bound handlers.
+            Handler must be picklable then.
+            All the other stages and callbacks are run in the calling process.
+            The pool is not shut down by the executor.
+        :param workers: Number of threads which run pipelines
+            submitted via :meth:`submit`.
+            If positive, :meth:`start_listening` hands each message
+            over to these threads instead of running it
+            in subscriber's callback thread.
+            Each message has its own state, so any number of pipelines
+            can safely run concurrently.
+        :param max_in_flight: Max number of messages submitted but not finished yet.
+            Defaults to subscriber's :attr:`~.BaseSubscriber.max_in_flight`
+            if it's set, otherwise to `workers`.
+            When reached, :meth:`submit` blocks the caller
+            (e.g. subscriber's callback thread) until some message is finished.
+        :param quiet: If True, callbacks which only log
+            (like base implementations of `on_received`, `on_handled`, etc.)
+            are not called at all, regardless of logging configuration.
+            Otherwise they are skipped only when their log level is disabled.
+            Failure callbacks are always called.
+        :param log_payload_limit: Max length of messages and results
+            in callbacks' logs. None means no limit.
+        :param collect_stats: If True, duration of each pipeline stage
+            (including its callbacks) is recorded into :attr:`stats`.
+            See :mod:`happyly.listening.stats` for the list of stages.
+        :param max_pending_results: Max number of results of a single message
+            which are handed over to publisher threads but not published yet.
+            When reached, a generator handler is not resumed
+            until the publisher catches up.
+            None means results of a message are limited
+            only by `publisher_queue_size`.
+        """
+        self.quiet = quiet
+        self.log_payload_limit = log_payload_limit
+        self._current = CurrentContext()
+        self.stats: Optional[PipelineStats] = PipelineStats() if collect_stats else None
+        """
+        Latency histograms of pipeline stages,
+        None unless the executor was created with `collect_stats=True`.
+        """
         self.handler = handler  # type: ignore
         if deserializer is None:
             self.deserializer = DUMMY_SERDE  # type: ignore
@@ -132,8 +355,69 @@ class Executor(Generic[D, P, SE, S]):
             self.serializer = _ser_converter(serializer)
 
         self.subscriber = subscriber
-        self.publisher_queue: queue.Queue = queue.Queue()
+        self.publisher_workers = publisher_workers
+        self.publisher_queue_size = publisher_queue_size
+        self.max_pending_results = max_pending_results
+        self._publisher_pool = self._create_publisher_pool()
+        self._process_handling = (
+            ProcessHandling(handling_pool) if handling_pool is not None else None
+        )
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self._run_pool = self._create_run_pool()
+        self._plan = _PipelinePlan(self)
 
+    @property
+    def publisher_queue(self):
+        """
+        Queue of results waiting to be published.
+        """
+        return self._publisher_pool.queue
+
+    def _create_publisher_pool(self) -> PublisherPool:
+        return PublisherPool(
+            publish=self._publish_result,
+            workers=self.publisher_workers,
+            queue_size=self.publisher_queue_size,
+            name=f'{type(self).__name__}-publisher',
+        )
+
+    def _create_run_pool(self) -> Optional[RunPool]:
+        if self.workers <= 0:
+            return None
+        max_in_flight = self.max_in_flight
+        if max_in_flight is None and self.subscriber is not None:
+            # match the number of messages the subscriber hands over at once
+            max_in_flight = getattr(self.subscriber, 'max_in_flight', None)
+        return RunPool(
+            run=self.run,
+            workers=self.workers,
+            max_in_flight=max_in_flight,
+            name=f'{type(self).__name__}-worker',
+        )
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops worker threads once all submitted messages are processed
+        and publisher threads once all queued results are published
+        (and flushes the publisher if `wait` is True).
+        If the executor is run again, new threads are started.
+
+        :param wait: Whether to block until the threads are stopped
+        """
+        run_pool = self._run_pool
+        if run_pool is not None:
+            self._run_pool = self._create_run_pool()
+            run_pool.shutdown(wait=wait)
+        pool = self._publisher_pool
+        self._publisher_pool = self._create_publisher_pool()
+        pool.shutdown(wait=wait)
+        if wait and isinstance(self.publisher, BasePublisher):
+            self.publisher.flush()
+        if self._process_handling is not None:
+            self._process_handling.shutdown()
+
+    @logs_only(_LOGGER, logging.INFO)
     def on_received(self, original_message: Any):
         """
         Callback which is called as soon as pipeline is run.
@@ -144,8 +428,11 @@ class Executor(Generic[D, P, SE, S]):
         :param original_message: Message as it has been received,
             without any deserialization
         """
-        _LOGGER.info(f"Received message: {original_message}")
+        _LOGGER.info(
+            'Received message: %s', Payload(original_message, self.log_payload_limit)
+        )
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_deserialized(
         self, original_message: Any, deserialized_message: Mapping[str, Any]
     ):
@@ -160,8 +447,8 @@ class Executor(Generic[D, P, SE, S]):
         :param deserialized_message: Message attributes after deserialization
         """
         _LOGGER.info(
-            'Message successfully deserialized into attributes: '
-            f'{deserialized_message}'
+            'Message successfully deserialized into attributes: %s',
+            Payload(deserialized_message, self.log_payload_limit),
         )
 
     def on_deserialization_failed(self, original_message: Any, error: Exception):
@@ -177,9 +464,11 @@ class Executor(Generic[D, P, SE, S]):
         """
         _LOGGER.exception('')
         _LOGGER.error(
-            f"Was not able to deserialize the following message: {original_message}"
+            'Was not able to deserialize the following message: %s',
+            Payload(original_message, self.log_payload_limit),
         )
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_handled(
         self,
         original_message: Any,
@@ -199,7 +488,9 @@ class Executor(Generic[D, P, SE, S]):
         :param result:
             Result fetched from handler
         """
-        _LOGGER.info(f"Message handled, result: {result}.")
+        _LOGGER.info(
+            'Message handled, result: %s.', Payload(result, self.log_payload_limit)
+        )
 
     def on_handling_failed(
         self,
@@ -220,8 +511,9 @@ class Executor(Generic[D, P, SE, S]):
         :param error: exception object which was raised
         """
         _LOGGER.exception('')
-        _LOGGER.error(f'Handler raised an exception.')
+        _LOGGER.error('Handler raised an exception.')
 
+    @logs_only(_LOGGER, logging.DEBUG)
     def on_serialized(
         self,
         original_message: Any,
@@ -241,6 +533,7 @@ class Executor(Generic[D, P, SE, S]):
         _LOGGER.exception('')
         _LOGGER.error('Was not able to deserialize message.')
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_published(
         self,
         original_message: Any,
@@ -260,7 +553,7 @@ class Executor(Generic[D, P, SE, S]):
         :param result:
             Result fetched from handler
         """
-        _LOGGER.info(f"Published result: {result}")
+        _LOGGER.info('Published result: %s', Payload(result, self.log_payload_limit))
 
     def on_publishing_failed(
         self,
@@ -284,8 +577,11 @@ class Executor(Generic[D, P, SE, S]):
         :param error: exception object which was raised
         """
         _LOGGER.exception('')
-        _LOGGER.error(f"Failed to publish result: {result}")
+        _LOGGER.error(
+            'Failed to publish result: %s', Payload(result, self.log_payload_limit)
+        )
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_finished(self, original_message: Any, error: Optional[Exception]):
         """
         Callback which is called when pipeline finishes its execution.
@@ -311,34 +607,114 @@ class Executor(Generic[D, P, SE, S]):
         _LOGGER.info(f'Stopped pipeline{s}')
 
     def _try_publish(
-        self
-        # original: Any,
-        # parsed: Optional[Mapping[str, Any]],
-        # result: _Result,
-        # serialized: Any,
+        self,
+        original: Any,
+        parsed: Optional[Mapping[str, Any]],
+        result: _Result,
+        serialized: Any,
     ):
-        original, parsed, result, serialized = self.publisher_queue.get()
         assert self.publisher is not None
+        started = _stats.clock() if self.stats is not None else 0.0
         try:
             self.publisher.publish(serialized)
         except Exception as e:
-            self.on_publishing_failed(
-                original_message=original,
-                deserialized_message=parsed,
-                result=result,
-                serialized_message=serialized,
-                error=e,
-            )
-            self.publisher_queue.task_done()
-            raise e from e
+            error: Optional[Exception] = e
         else:
-            self.on_published(
-                original_message=original,
-                deserialized_message=parsed,
-                result=result,
-                serialized_message=serialized,
-            )
-            self.publisher_queue.task_done()
+            error = None
+        self._published(original, parsed, result, serialized, error, started)
+
+    def _published(
+        self,
+        original: Any,
+        parsed: Optional[Mapping[str, Any]],
+        result: _Result,
+        serialized: Any,
+        error: Optional[Exception],
+        started: float,
+    ):
+        # callbacks of the publishing stage once the publisher is done,
+        # `started` is when the stage started for this message
+        stats = self.stats
+        ok = False
+        try:
+            if error is not None:
+                self.on_publishing_failed(
+                    original_message=original,
+                    deserialized_message=parsed,
+                    result=result,
+                    serialized_message=serialized,
+                    error=error,
+                )
+                raise error from error
+            if self._callback_enabled('on_published'):
+                self.on_published(
+                    original_message=original,
+                    deserialized_message=parsed,
+                    result=result,
+                    serialized_message=serialized,
+                )
+            ok = True
+        finally:
+            if stats is not None:
+                stats.record(_stats.PUBLISH, _stats.clock() - started, ok)
+
+    def _publish_result(
+        self,
+        context: MessageContext,
+        parsed: Optional[Mapping[str, Any]],
+        result: _Result,
+        serialized: Any,
+    ):
+        # called by publisher threads
+        original = context.message
+        token = self._current.set(context)
+        try:
+            if serialized is _SERIALIZE_IN_PUBLISHER:
+                serialized = self._serialize(original, parsed, result)
+                if serialized is None:
+                    return None
+                context.serialized = serialized
+            if self._get_plan().publishes_nowait:
+                return self._try_publish_nowait(original, parsed, result, serialized)
+            self._try_publish(original, parsed, result, serialized)
+            return None
+        finally:
+            self._current.reset(token)
+
+    def _try_publish_nowait(
+        self,
+        original: Any,
+        parsed: Optional[Mapping[str, Any]],
+        result: _Result,
+        serialized: Any,
+    ) -> Future:
+        # the same as _try_publish, but callbacks are called
+        # once the publisher completes the message
+        assert self.publisher is not None
+        started = _stats.clock() if self.stats is not None else 0.0
+        done: Future = Future()
+        context = self.context
+
+        def on_complete(future: Future):
+            # called by the publisher, possibly in its own thread
+            token = self._current.set(context)
+            try:
+                self._published(
+                    original, parsed, result, serialized, future.exception(), started
+                )
+            except Exception as e:
+                done.set_exception(e)
+            else:
+                done.set_result(None)
+            finally:
+                self._current.reset(token)
+
+        self.publisher.publish_nowait(serialized).add_done_callback(on_complete)
+        return done
+
+    def _finish(self, message: Optional[Any], error: Optional[Exception]):
+        if error is not None or self._callback_enabled('on_finished'):
+            self.on_finished(original_message=message, error=error)
 
     def _fetch_deserialized_and_result(
         self, message: Optional[Any]
@@ -356,17 +732,74 @@ class Executor(Generic[D, P, SE, S]):
         for result in self._handle(message, deserialized):
             yield ResultAndDeserialized(result=result, deserialized=deserialized)
 
-    def _deserialize(self, message: Optional[Any]):
+    def _fetch_deserialized_and_result_from(
+        self,
+        message: Any,
+        deserialized: Union[Mapping[str, Any], Exception],
+        started: float = 0.0,
+    ) -> Iterator[ResultAndDeserialized]:
+        # the same as _fetch_deserialized_and_result
+        # but deserialization itself has already been performed by the caller
         try:
-            deserialized = self.deserializer.deserialize(message)
-        except Exception as e:
-            self.on_deserialization_failed(original_message=message, error=e)
+            deserialized = self._deserialized(message, deserialized, started)
+        except StopPipeline as e:
             raise e from e
-        else:
-            self.on_deserialized(
-                original_message=message, deserialized_message=deserialized
+        except Exception as e:
+            yield ResultAndDeserialized(
+                result=self._build_error_result(message, e), deserialized=None
             )
+            return
+
+        for result in self._handle(message, deserialized):
+            yield ResultAndDeserialized(result=result, deserialized=deserialized)
+
+    def _received(self, message: Optional[Any]):
+        if self._callback_enabled('on_received'):
+            stats = self.stats
+            if stats is None:
+                self.on_received(message)
+                return
+            started = _stats.clock()
+            ok = False
+            try:
+                self.on_received(message)
+                ok = True
+            finally:
+                stats.record(_stats.RECEIVE, _stats.clock() - started, ok)
+
+    def _deserialize(self, message: Optional[Any]):
+        started = _stats.clock() if self.stats is not None else 0.0
+        try:
+            deserialized = self._get_plan().deserialize(message)
+        except Exception as e:
+            deserialized = e
+        return self._deserialized(message, deserialized, started)
+
+    def _deserialized(
+        self,
+        message: Optional[Any],
+        deserialized: Union[Mapping[str, Any], Exception],
+        started: float,
+    ) -> Mapping[str, Any]:
+        # callbacks of the deserialization stage once its outcome is known,
+        # `started` is when the stage started for this message
+        stats = self.stats
+        ok = False
+        try:
+            if isinstance(deserialized, Exception):
+                self.on_deserialization_failed(
+                    original_message=message, error=deserialized
+                )
+                raise deserialized from deserialized
+            if self._callback_enabled('on_deserialized'):
+                self.on_deserialized(
+                    original_message=message, deserialized_message=deserialized
+                )
+            ok = True
             return deserialized
+        finally:
+            if stats is not None:
+                stats.record(_stats.DESERIALIZE, _stats.clock() - started, ok)
 
     def _build_error_result(self, message: Any, error: Exception):
         try:
@@ -377,30 +810,67 @@ class Executor(Generic[D, P, SE, S]):
             raise new_e from new_e
         return error_result
 
+    def _handler_results(self, deserialized: Mapping[str, Any]) -> Iterable[_Result]:
+        is_generator = self._get_plan().handler_is_generator
+        if self._process_handling is not None:
+            if is_generator:
+                return self._process_handling.stream(self.handler, deserialized)
+            return (self._process_handling.call(self.handler, deserialized),)
+        if is_generator:
+            return self.handler(deserialized)  # type: ignore
+        return (self.handler(deserialized),)  # type: ignore
+
     def _handle(self, message: Optional[Any], deserialized: Mapping[str, Any]):
+        stats = self.stats
+        # each yielded result is measured separately,
+        # time spent by the caller while the generator is suspended is excluded
+        started = _stats.clock() if stats is not None else 0.0
         try:
-            if generator_check.is_generator(self.handler):  # type: ignore
-                for result in self.handler(deserialized):  # type: ignore
-                    self.on_handled(  # type: ignore
+            for result in self._handler_results(deserialized):
+                if self._callback_enabled('on_handled'):
+                    self.on_handled(
                         original_message=message,
                         deserialized_message=deserialized,
                         result=result,
                     )
-                    yield result
-            else:
-                result = self.handler(deserialized)  # type: ignore
+                if stats is not None:
+                    stats.record(_stats.HANDLE, _stats.clock() - started)
+                yield result
+                if stats is not None:
+                    started = _stats.clock()
+        except Exception as e:
+            try:
+                self.on_handling_failed(
+                    original_message=message, deserialized_message=deserialized, error=e
+                )
+            finally:
+                if stats is not None:
+                    stats.record(_stats.HANDLE, _stats.clock() - started, ok=False)
+            raise e from e
+
+    def _handle_one(self, message: Optional[Any], deserialized: Mapping[str, Any]):
+        # the same as _handle for a non-generator handler in this process
+        stats = self.stats
+        started = _stats.clock() if stats is not None else 0.0
+        ok = False
+        try:
+            result = self.handler(deserialized)  # type: ignore
+            if self._callback_enabled('on_handled'):
                 self.on_handled(
                     original_message=message,
                     deserialized_message=deserialized,
                     result=result,
                 )
-                yield result
-                return
+            ok = True
+            return result
         except Exception as e:
             self.on_handling_failed(
                 original_message=message, deserialized_message=deserialized, error=e
             )
             raise e from e
+        finally:
+            if stats is not None:
+                stats.record(_stats.HANDLE, _stats.clock() - started, ok)
 
     def _serialize(
         self,
@@ -408,30 +878,72 @@ class Executor(Generic[D, P, SE, S]):
         parsed_message: Optional[Mapping[str, Any]],
         result: Mapping[str, Any],
     ) -> Any:
+        started = _stats.clock() if self.stats is not None else 0.0
+        try:
+            serialized = self._get_plan().serialize(result)
+        except Exception as e:
+            serialized = e
+        return self._serialized(
+            original_message, parsed_message, result, serialized, started
+        )
 
+    def _serialized(
+        self,
+        original_message: Optional[Any],
+        parsed_message: Optional[Mapping[str, Any]],
+        result: Mapping[str, Any],
+        serialized: Any,
+        started: float,
+    ) -> Any:
+        # callbacks of the serialization stage once its outcome is known,
+        # returns None if serialization failed
+        stats = self.stats
+        ok = False
         try:
-            serialized = self.serializer.serialize(result)
+            if isinstance(serialized, Exception):
+                self.on_serialization_failed(
+                    original=original_message,
+                    deserialized=parsed_message,
+                    result=result,
+                    error=serialized,
+                )
+                return None
+            if self._callback_enabled('on_serialized'):
+                self.on_serialized(
+                    original_message=original_message,
+                    deserialized_message=parsed_message,
+                    result=result,
+                    serialized_message=serialized,
+                )
+            ok = True
+            return serialized
+        finally:
+            if stats is not None:
+                stats.record(_stats.SERIALIZE, _stats.clock() - started, ok)
+
+    def _run_straight(self, context: MessageContext):
+        # the same as _run_core for a single result, without generators,
+        # stage outputs are stored in the context
+        message = context.message
+        self._received(message)
+        try:
+            deserialized = context.deserialized = self._deserialize(message)
+        except StopPipeline as e:
+            raise e from e
         except Exception as e:
-            self.on_serialization_failed(
-                original=original_message,
-                deserialized=parsed_message,
-                result=result,
-                error=e,
-            )
+            result = context.result = self._build_error_result(message, e)
+            deserialized = None
         else:
-            self.on_serialized(
-                original_message=original_message,
-                deserialized_message=parsed_message,
-                result=result,
-                serialized_message=serialized,
-            )
-            return serialized
+            result = context.result = self._handle_one(message, deserialized)
+
+        if result is not None:
+            context.serialized = self._serialize(message, deserialized, result)
 
     def _run_core(
         self, message: Optional[Any] = None
     ) -> Iterator[Tuple[Optional[Mapping[str, Any]], _Result, Optional[Any]]]:
 
-        self.on_received(message)
+        self._received(message)
         for result, deserialized in self._fetch_deserialized_and_result(message):
             if result is not None:
                 serialized = self._serialize(message, deserialized, result)
@@ -439,6 +951,15 @@ class Executor(Generic[D, P, SE, S]):
                 serialized = None
             yield deserialized, result, serialized
 
+    def _stream_to_publisher(
+        self, message: Optional[Any]
+    ) -> Iterator[Tuple[Optional[Mapping[str, Any]], _Result, Any]]:
+        # the same as _run_core, but serialization is left to publisher threads
+        self._received(message)
+        for result, deserialized in self._fetch_deserialized_and_result(message):
+            if result is not None:
+                yield deserialized, result, _SERIALIZE_IN_PUBLISHER
+
     def run(self, message: Optional[Any] = None):
         """
         Method that starts execution of pipeline stages.
@@ -451,30 +972,276 @@ class Executor(Generic[D, P, SE, S]):
             if the executor was instantiated with neither a deserializer nor a handler
             (useful to quickly publish message attributes by hand)
         """
+        context = self.context_class(message)
+        token = self._current.set(context)
         try:
-            publisher_thread = threading.Thread(target=self._try_publish, daemon=True)
-            publisher_thread.start()
+            ok = self._run_pipeline(context)
+        finally:
+            context.finish()
+            self._current.reset(token)
+        stats = self.stats
+        if stats is not None:
+            stats.record(_stats.PIPELINE, context.elapsed, ok)
+
+    def _run_pipeline(self, context: MessageContext) -> bool:
+        # returns False if the pipeline failed
+        plan = self._get_plan()
+        if plan.straight:
+            return self._run_straight_and_publish(context)
+
+        message = context.message
+        stages = (
+            self._stream_to_publisher(message)
+            if plan.stream_to_publisher
+            else self._run_core(message)
+        )
+        pending: Optional[PendingPublishes] = None
+        try:
+            try:
+                for deserialized, result, serialized in stages:
+                    context.deserialized = deserialized
+                    context.result = result
+                    if serialized is not _SERIALIZE_IN_PUBLISHER:
+                        context.serialized = serialized
+                    if self.publisher is not None and serialized is not None:
+                        assert (
+                            result is not None
+                        )  # something is serialized, so there must be a result
+                        if pending is None:
+                            pending = PendingPublishes(self.max_pending_results)
+                        # blocks while the publisher is behind,
+                        # so the generator handler is paused
+                        self._publisher_pool.submit(
+                            pending, context, deserialized, result, serialized
+                        )
+                        if isinstance(pending.error, StopPipeline):
+                            # raised by a callback in a publisher thread
+                            raise pending.error
+            except BaseException:
+                # results yielded before the failure are still being published
+                if pending is not None and self.wait_for_publishing:
+                    pending.wait(reraise=False)
+                raise
+            if pending is not None:
+                if self.wait_for_publishing:
+                    pending.wait()
+                elif pending.error is not None:
+                    # failures which are known by now are reported anyway
+                    raise pending.error
+        except StopPipeline as e:
+            context.stop_reason = e.reason
+            self.on_stopped(original_message=message, reason=e.reason)
+        except Exception as e:
+            context.error = e
+            self._finish(message, e)
+            return False
+        else:
+            self._finish(message, None)
+        return True
 
-            for deserialized, result, serialized in self._run_core(message):
-                if self.publisher is not None and serialized is not None:
-                    assert (
-                        result is not None
-                    )  # something is serialized, so there must be a result
-                    self.publisher_queue.put(
-                        (message, deserialized, result, serialized)
+    def _run_straight_and_publish(self, context: MessageContext) -> bool:
+        message = context.message
+        try:
+            self._run_straight(context)
+            serialized = context.serialized
+            if self.publisher is not None and serialized is not None:
+                # a single result isn't handed over to publisher threads,
+                # publisher which is able to send it in the background does so
+                if self._get_plan().publishes_nowait:
+                    published = self._try_publish_nowait(
+                        message, context.deserialized, context.result, serialized
+                    )
+                    if self.wait_for_publishing:
+                        published.result()
+                else:
+                    self._try_publish(
+                        message, context.deserialized, context.result, serialized
                     )
-
-            self.publisher_queue.join()
         except StopPipeline as e:
+            context.stop_reason = e.reason
             self.on_stopped(original_message=message, reason=e.reason)
         except Exception as e:
-            self.on_finished(original_message=message, error=e)
+            context.error = e
+            self._finish(message, e)
+            return False
         else:
-            self.on_finished(original_message=message, error=None)
+            self._finish(message, None)
+        return True
+
+    def run_batch(self, messages: Iterable[Any]):
+        """
+        Runs the pipeline for several messages at once.
+
+        Each stage is performed for the whole batch before the next one starts,
+        so that deserializer, serializer and publisher are able to
+        amortize their per-call overhead
+        (see :meth:`Deserializer.deserialize_many`,
+        :meth:`Serializer.serialize_many` and :meth:`BasePublisher.publish_many`).
+
+        Callbacks are still called for each message (and each result)
+        just like with :meth:`run`.
+        A failure or :exc:`.StopPipeline` affects only the message it relates to,
+        other messages of the batch are processed as usual.
+
+        :param messages: Messages as is, without deserialization.
+        """
+        entries = [self.context_class(message) for message in messages]
+        activate = self._current.activate
+        # time of a batched call is shared equally by its messages
+        timed = self.stats is not None
+
+        for entry in entries:
+            try:
+                with activate(entry):
+                    self._received(entry.message)
+            except StopPipeline as e:
+                entry.stop(e.reason)
+            except Exception as e:
+                entry.fail(e)
+
+        alive = [entry for entry in entries if not entry.done]
+        started = _stats.clock() if timed else 0.0
+        deserialized_many = self._deserialize_many(alive)
+        share = _batch_share(started, len(alive)) if timed else 0.0
+
+        to_serialize: List[Tuple[MessageContext, Any, Mapping[str, Any]]] = []
+        for entry, deserialized in zip(alive, deserialized_many):
+            try:
+                with activate(entry):
+                    for result, parsed in self._fetch_deserialized_and_result_from(
+                        entry.message,
+                        deserialized,
+                        _stats.clock() - share if timed else 0.0,
+                    ):
+                        entry.deserialized = parsed
+                        entry.result = result
+                        if result is not None:
+                            to_serialize.append((entry, parsed, result))
+            except StopPipeline as e:
+                entry.stop(e.reason)
+            except Exception as e:
+                entry.fail(e)
+
+        to_serialize = [item for item in to_serialize if not item[0].done]
+        started = _stats.clock() if timed else 0.0
+        serialized_many = (
+            self.serializer.serialize_many([result for _, _, result in to_serialize])
+            if to_serialize
+            else []
+        )
+        share = _batch_share(started, len(to_serialize)) if timed else 0.0
+
+        to_publish = []
+        for (entry, parsed, result), serialized in zip(to_serialize, serialized_many):
+            if entry.done:
+                continue
+            try:
+                with activate(entry):
+                    serialized = self._serialized(
+                        entry.message,
+                        parsed,
+                        result,
+                        serialized,
+                        _stats.clock() - share if timed else 0.0,
+                    )
+                    if serialized is not None:
+                        entry.serialized = serialized
+            except StopPipeline as e:
+                entry.stop(e.reason)
+            except Exception as e:
+                entry.fail(e)
+            else:
+                if self.publisher is not None and serialized is not None:
+                    to_publish.append((entry, parsed, result, serialized))
+
+        to_publish = [item for item in to_publish if not item[0].done]
+        if to_publish:
+            assert self.publisher is not None
+            started = _stats.clock() if timed else 0.0
+            errors = self.publisher.publish_many(
+                [serialized for _, _, _, serialized in to_publish]
+            )
+            share = _batch_share(started, len(to_publish)) if timed else 0.0
+            for (entry, parsed, result, serialized), error in zip(to_publish, errors):
+                if entry.stop_reason is not None:
+                    continue
+                try:
+                    with activate(entry):
+                        self._published(
+                            entry.message,
+                            parsed,
+                            result,
+                            serialized,
+                            error,
+                            _stats.clock() - share if timed else 0.0,
+                        )
+                except StopPipeline as e:
+                    entry.stop(e.reason)
+                except Exception as e:
+                    entry.fail(e)
+
+        self._finish_batch(entries)
+
+    def _deserialize_many(self, entries: List[MessageContext]) -> List[Any]:
+        # attributes parsed earlier (e.g. by a callback) are reused
+        parsed_before = [entry.deserialized for entry in entries]
+        messages = [
+            entry.message
+            for entry, parsed in zip(entries, parsed_before)
+            if parsed is None
+        ]
+        outcomes = iter(
+            self.deserializer.deserialize_many(messages) if messages else ()
+        )
+        deserialized_many = []
+        for entry, parsed in zip(entries, parsed_before):
+            if parsed is None:
+                parsed = next(outcomes)
+                if not isinstance(parsed, Exception):
+                    entry.deserialized = parsed
+            deserialized_many.append(parsed)
+        return deserialized_many
+
+    def _finish_batch(self, entries: List[MessageContext]):
+        first_error: Optional[Exception] = None
+        stats = self.stats
+        for entry in entries:
+            entry.finish()
+            if stats is not None:
+                stats.record(_stats.PIPELINE, entry.elapsed, entry.error is None)
+            try:
+                with self._current.activate(entry):
+                    if entry.stop_reason is not None:
+                        self.on_stopped(
+                            original_message=entry.message, reason=entry.stop_reason
+                        )
+                    else:
+                        self._finish(entry.message, entry.error)
+            except Exception as e:
+                # finish the rest of the batch anyway
+                _LOGGER.exception('')
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
 
     def run_for_result(self, message: Optional[Any] = None):
+        context = self.context_class(message)
+        token = self._current.set(context)
         try:
-            if generator_check.is_generator(self.handler):  # type: ignore
+            return self._run_for_result(context)
+        finally:
+            context.finish()
+            self._current.reset(token)
+
+    def _run_for_result(self, context: MessageContext):
+        message = context.message
+        plan = self._get_plan()
+        try:
+            if plan.straight:
+                self._run_straight(context)
+                result = context.serialized
+            elif plan.handler_is_generator:
 
                 def func(m):
                     for _, _, res in self._run_core(m):
@@ -484,21 +1251,62 @@ class Executor(Generic[D, P, SE, S]):
             else:
                 _, _, result = next(self._run_core(message))
         except StopPipeline as e:
+            context.stop_reason = e.reason
             self.on_stopped(original_message=message, reason=e.reason)
             raise FetchedNoResult from e
         except Exception as e:
-            self.on_finished(original_message=message, error=e)
+            context.error = e
+            self._finish(message, e)
             raise FetchedNoResult from e
         else:
-            self.on_finished(original_message=message, error=None)
+            self._finish(message, None)
             return result
 
+    def submit(self, message: Optional[Any] = None) -> Future:
+        """
+        Schedules execution of pipeline stages in one of executor's worker threads
+        (see `workers` argument of the constructor).
+        Blocks while `max_in_flight` messages are being processed.
+
+        :param message: The same as for :meth:`run`
+        :return: Future which is resolved when the pipeline is finished
+        """
+        if self._run_pool is None:
+            raise RuntimeError('Cannot submit since executor has no workers.')
+        return self._run_pool.submit(message)
+
     def start_listening(self):
         if self.subscriber is None:
             raise Exception('Cannot subscribe since subscriber is not initialized.')
+        if self._run_pool is not None:
+            return self.subscriber.subscribe(callback=self.submit)
         return self.subscriber.subscribe(callback=self.run)
 
 
+def _batch_share(started: float, count: int) -> float:
+    # part of the time since `started` which is spent on each of `count` messages
+    return (_stats.clock() - started) / count if count else 0.0
+
+
+_SERIALIZE_IN_PUBLISHER = object()
+_HOT_CALLBACKS = (
+    'on_received',
+    'on_deserialized',
+    'on_handled',
+    'on_serialized',
+    'on_published',
+    'on_finished',
+    'on_acknowledged',
+)
+_PIPELINE_INTERNALS = (
+    'run',
+    '_run_core',
+    '_fetch_deserialized_and_result',
+    '_handle',
+    '_handler_results',
+)
+
+
 if __name__ == '__main__':
 
     def a(m):
@@ -5,7 +5,7 @@ which is able to run pipeline by an event coming from a subscription.
 """
 
 import logging
-from typing import Any, TypeVar, Optional, Generic
+from typing import Any, Mapping, TypeVar, Optional, Generic
 
 from happyly.serialization.serializer import Serializer
 from happyly.serialization.dummy import DUMMY_SERDE
@@ -13,7 +13,12 @@ from happyly.handling import Handler
 from happyly.pubsub import BasePublisher
 from happyly.pubsub.subscriber import BaseSubscriber, SubscriberWithAck
 from happyly.serialization import Deserializer
+from happyly.logs.lazy import logs_only
+from happyly.caching.dedup import ProcessedIds
+from happyly.exceptions import StopPipeline
 from .executor import Executor
+from .context import MessageContext
+from . import stats as _stats
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -43,15 +48,31 @@ class ExecutorWithAck(Executor[D, P, SE, SubscriberWithAck], Generic[D, P, SE]):
         deserializer: D,
         serializer: SE = DUMMY_SERDE,
         publisher: Optional[P] = None,
+        processed_ids: Optional[ProcessedIds] = None,
+        **kwargs,
     ):
+        """
+        :param processed_ids: Store of ids of messages processed successfully
+            (see :mod:`happyly.caching.dedup`).
+            If provided, a message whose id is found there
+            is acked and not processed again,
+            which makes redeliveries by the broker harmless.
+            See :meth:`_dedup_key` for what the id is.
+
+        Keyword arguments not listed here
+        (e.g. `publisher_workers`) are passed to :class:`Executor`.
+        """
         super().__init__(
             handler=handler,
             deserializer=deserializer,
             serializer=serializer,
             publisher=publisher,
             subscriber=subscriber,
+            **kwargs,
         )
+        self.processed_ids = processed_ids
 
+    @logs_only(_LOGGER, logging.INFO)
     def on_acknowledged(self, message: Any):
         """
         Callback which is called write after message was acknowledged.
@@ -74,8 +95,77 @@ class ExecutorWithAck(Executor[D, P, SE, SubscriberWithAck], Generic[D, P, SE]):
         """
         if self.subscriber is None:
             raise Exception('Cannot ack since subscriber is not initialized.')
-        self.subscriber.ack(message)
-        self.on_acknowledged(message)
+        stats = self.stats
+        started = _stats.clock() if stats is not None else 0.0
+        ok = False
+        try:
+            self.subscriber.ack(message)
+            context = self.context
+            if context is not None and context.message is message:
+                context.acked = True
+            if self._callback_enabled('on_acknowledged'):
+                self.on_acknowledged(message)
+            ok = True
+        finally:
+            if stats is not None:
+                stats.record(_stats.ACK, _stats.clock() - started, ok)
+
+    def _dedup_key(self, deserialized: Mapping[str, Any]) -> Optional[str]:
+        """
+        Id of the message in :attr:`processed_ids`,
+        None if the message shouldn't be deduplicated.
+
+        Defaults to the request id attribute
+        (`request_id_field` of the deserializer if it has one).
+        Override it to deduplicate by some other attribute.
+        """
+        field = getattr(self.deserializer, 'request_id_field', 'request_id')
+        key = deserialized.get(field)
+        return None if key is None else str(key)
+
+    def _skip_processed(self, message: Any, deserialized: Mapping[str, Any]):
+        context = self.context
+        if context is not None:
+            # a handler may give back no results, the message is marked anyway
+            context.deserialized = deserialized
+        key = self._dedup_key(deserialized)
+        if key is None or not self.processed_ids.contains(key):  # type: ignore
+            return
+        if context is None or not context.acked:
+            self.ack(message)
+        raise StopPipeline(f'message {key} has already been processed')
+
+    def _mark_processed(self, context: Optional[MessageContext]):
+        if context is None or context.deserialized is None:
+            return
+        key = self._dedup_key(context.deserialized)
+        if key is None:
+            return
+        try:
+            self.processed_ids.add(key)  # type: ignore
+        except Exception:
+            # the message is processed anyway
+            _LOGGER.exception(f'Failed to remember message {key} as processed.')
+
+    def _deserialize(self, message: Optional[Any]):
+        deserialized = super()._deserialize(message)
+        if self.processed_ids is not None:
+            self._skip_processed(message, deserialized)
+        return deserialized
+
+    def _fetch_deserialized_and_result_from(
+        self, message: Any, deserialized: Any, started: float = 0.0
+    ):
+        if self.processed_ids is not None and not isinstance(deserialized, Exception):
+            self._skip_processed(message, deserialized)
+        return super()._fetch_deserialized_and_result_from(
+            message, deserialized, started
+        )
+
+    def _finish(self, message: Optional[Any], error: Optional[Exception]):
+        if error is None and self.processed_ids is not None:
+            self._mark_processed(self.context)
+        super()._finish(message, error)
 
 
 class EarlyAckExecutor(ExecutorWithAck[D, P, SE], Generic[D, P, SE]):
@@ -85,15 +175,20 @@ class EarlyAckExecutor(ExecutorWithAck[D, P, SE], Generic[D, P, SE]):
     :meth:`.on_received` callback is finished.
     """
 
-    def _fetch_deserialized_and_result(self, message: Optional[Any]):
+    def _received(self, message: Optional[Any]):
+        super()._received(message)
         self.ack(message)
-        super()._fetch_deserialized_and_result(message)
 
 
 class LateAckExecutor(ExecutorWithAck[D, P, SE], Generic[D, P, SE]):
     """
     Acknowledge-aware listener,
     which performs :meth:`.ack` at the very end of pipeline.
+
+    The pipeline ends after every result is confirmed by the publisher,
+    including publishers which complete messages in the background
+    (see :meth:`.BasePublisher.publish_nowait`),
+    so a message is acked only once its replies are actually published.
     """
 
     def on_finished(self, original_message: Any, error: Optional[Exception]):
@@ -0,0 +1,132 @@
+"""
+Helpers which run handling stage of :class:`~happyly.listening.Executor`
+in a pool of processes.
+Functions submitted to the pool are defined on module level
+so that child processes are able to import them.
+"""
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor as PoolExecutor, Future
+from typing import Any, Iterator, Mapping, Optional
+
+# each item of a results queue is tagged,
+# so that no result is mistaken for the end of the stream
+_RESULT, _DONE = range(2)
+_POLL_INTERVAL = 0.1
+
+
+def call_handler(handler, message: Mapping[str, Any]):
+    return handler(message)
+
+
+def _put(results, item, cancelled) -> bool:
+    # returns False if the parent is not interested in results anymore
+    while True:
+        try:
+            results.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            if cancelled.is_set():
+                return False
+
+
+def stream_handler_results(handler, message: Mapping[str, Any], results, cancelled):
+    try:
+        for result in handler(message):
+            if not _put(results, (_RESULT, result), cancelled):
+                return
+    finally:
+        _put(results, (_DONE, None), cancelled)
+
+
+def _drain(results):
+    try:
+        while True:
+            results.get_nowait()
+    except queue.Empty:
+        pass
+
+
+class ProcessHandling:
+    """
+    Runs handlers in the provided pool of processes
+    and brings their results back to the parent process.
+
+    Handler must be picklable: a function defined on module level
+    or an instance of :class:`~happyly.Handler`.
+    """
+
+    def __init__(self, pool: PoolExecutor, max_pending_results: int = 100):
+        """
+        :param max_pending_results: Max number of results of a generator handler
+            which are produced but not consumed by the parent yet.
+            When reached, the handler is paused.
+        """
+        self.pool = pool
+        self.max_pending_results = max_pending_results
+        self._manager: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def _get_manager(self):
+        # queues and events which can be passed to pool's processes
+        # are only available through a manager
+        if self._manager is None:
+            with self._lock:
+                if self._manager is None:
+                    self._manager = multiprocessing.Manager()
+        return self._manager
+
+    def call(self, handler, message: Mapping[str, Any]):
+        """
+        Calls the handler in a child process and returns its result.
+        Exception raised by the handler is re-raised in the parent.
+        """
+        return self.pool.submit(call_handler, handler, message).result()
+
+    def stream(self, handler, message: Mapping[str, Any]) -> Iterator[Any]:
+        """
+        Runs the generator handler in a child process
+        and yields its results one by one as soon as they are produced.
+        Exception raised by the handler is re-raised in the parent
+        after the results yielded before it.
+
+        If the caller stops iterating early (e.g. closes the iterator),
+        the handler is stopped as well.
+        """
+        manager = self._get_manager()
+        results = manager.Queue(self.max_pending_results)
+        cancelled = manager.Event()
+        future: Future = self.pool.submit(
+            stream_handler_results, handler, message, results, cancelled
+        )
+        try:
+            while True:
+                try:
+                    kind, result = results.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    if future.done() and results.empty():
+                        # child process died without reporting
+                        break
+                    continue
+                if kind == _DONE:
+                    break
+                yield result
+            future.result()
+        finally:
+            if not future.done():
+                # the caller abandoned the results
+                cancelled.set()
+                future.cancel()
+                _drain(results)
+
+    def shutdown(self):
+        """
+        Stops the manager process used to stream results.
+        The pool itself is owned by the caller and is not shut down.
+        """
+        with self._lock:
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
@@ -0,0 +1,178 @@
+"""
+Long-lived pool of publisher workers used by :class:`~happyly.listening.Executor`.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+_STOP = object()
+
+
+class PendingPublishes:
+    """
+    Tracks results of a single pipeline run
+    which were handed over to :class:`PublisherPool`.
+
+    Lets the run wait only for its own results,
+    no matter how many of them were yielded by the handler
+    and how many other runs share the same pool.
+    """
+
+    __slots__ = ('_cond', '_count', '_limit', 'error')
+
+    def __init__(self, limit: Optional[int] = None):
+        """
+        :param limit: Max number of results of the run which are not published yet.
+            When reached, :meth:`add` blocks until some result is published.
+            None means no limit.
+        """
+        self._cond = threading.Condition(threading.Lock())
+        self._count = 0
+        self._limit = limit
+        self.error: Optional[Exception] = None
+        """
+        The first exception raised while publishing results of the run, if any.
+        """
+
+    def add(self):
+        with self._cond:
+            if self._limit is not None:
+                while self._count >= self._limit:
+                    self._cond.wait()
+            self._count += 1
+
+    def done(self, error: Optional[Exception] = None):
+        with self._cond:
+            if error is not None and self.error is None:
+                self.error = error
+            self._count -= 1
+            if self._count == 0 or self._limit is not None:
+                self._cond.notify_all()
+
+    def future_done(self, future: Future):
+        self.done(future.exception())
+
+    def wait(self, reraise: bool = True):
+        """
+        Blocks until every result of the run is published
+        (successfully or not).
+
+        :param reraise: Whether to raise the first exception
+            raised while publishing
+        """
+        with self._cond:
+            while self._count > 0:
+                self._cond.wait()
+        if reraise and self.error is not None:
+            raise self.error
+
+
+class PublisherPool:
+    """
+    Fixed-size pool of daemon threads which drain a bounded queue of results
+    and publish them.
+
+    Threads are started lazily, on the first :meth:`submit`.
+    When the queue is full, :meth:`submit` blocks
+    until workers catch up.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[..., Any],
+        workers: int = 1,
+        queue_size: int = 1000,
+        name: str = 'happyly-publisher',
+    ):
+        """
+        :param publish: Function which is called by a worker
+            with arguments of each submitted item.
+            It may return a :class:`~concurrent.futures.Future`,
+            then the item is considered published once the future is done.
+        :param workers: Number of worker threads
+        :param queue_size: Max number of results waiting for a worker,
+            0 means unbounded
+        :param name: Prefix for names of worker threads
+        """
+        if workers < 1:
+            raise ValueError('PublisherPool requires at least one worker.')
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.workers = workers
+        self._publish = publish
+        self._name = name
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def started(self) -> bool:
+        return bool(self._threads)
+
+    def _start(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Cannot submit to a PublisherPool after shutdown.')
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f'{self._name}-{i}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, pending: PendingPublishes, *args):
+        """
+        Queues an item to be published by one of the workers.
+        Blocks while the queue is full.
+
+        :param pending: Tracker of the run which the item belongs to
+        :param args: Arguments passed to `publish`
+        """
+        if not self._threads or self._closed:
+            self._start()
+        pending.add()
+        self.queue.put((pending, args))
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                pending, args = item
+                try:
+                    outcome = self._publish(*args)
+                except Exception as e:
+                    pending.done(e)
+                else:
+                    if isinstance(outcome, Future):
+                        outcome.add_done_callback(pending.future_done)
+                    else:
+                        pending.done()
+            finally:
+                self.queue.task_done()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops all workers after the items already queued are published.
+
+        :param wait: Whether to block until workers are stopped
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self.queue.put(_STOP)
+        if wait:
+            for thread in threads:
+                thread.join()
+        _LOGGER.debug('Publisher pool is shut down.')
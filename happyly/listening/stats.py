@@ -0,0 +1,191 @@
+"""
+Latency histograms of pipeline stages collected by
+:class:`~happyly.listening.Executor` (see its `collect_stats` argument).
+
+Each thread records into its own set of counters,
+so recording a measurement takes no locks.
+Counters of all threads are summed up only when a snapshot is requested.
+Counters of a thread which has exited are merged into a common set.
+"""
+
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from attr import attrs
+
+clock = time.perf_counter
+
+RECEIVE = 'receive'
+DESERIALIZE = 'deserialize'
+HANDLE = 'handle'
+SERIALIZE = 'serialize'
+PUBLISH = 'publish'
+ACK = 'ack'
+PIPELINE = 'pipeline'
+
+STAGES = (RECEIVE, DESERIALIZE, HANDLE, SERIALIZE, PUBLISH, ACK, PIPELINE)
+
+_BUCKETS_COUNT = 28
+BUCKET_BOUNDS: Tuple[float, ...] = tuple(
+    (2**i) / 1_000_000 for i in range(_BUCKETS_COUNT - 1)
+) + (float('inf'),)
+"""
+Upper bounds (in seconds) of histogram buckets:
+1µs, 2µs, 4µs, ..., ~67s and infinity.
+"""
+
+# layout of per-thread counters of a stage
+_COUNT, _FAILURES, _TOTAL, _MAX, _FIRST_BUCKET = range(5)
+
+
+def _new_cells() -> List:
+    return [0, 0, 0.0, 0.0] + [0] * _BUCKETS_COUNT
+
+
+def _add_cells(
+    summed: Dict[str, List], cells: Dict[str, List], stage: Optional[str] = None
+):
+    for name, stage_cells in list(cells.items()):
+        if stage is not None and name != stage:
+            continue
+        values = list(stage_cells)
+        acc = summed.setdefault(name, _new_cells())
+        acc[_COUNT] += values[_COUNT]
+        acc[_FAILURES] += values[_FAILURES]
+        acc[_TOTAL] += values[_TOTAL]
+        acc[_MAX] = max(acc[_MAX], values[_MAX])
+        for i in range(_FIRST_BUCKET, len(acc)):
+            acc[i] += values[i]
+
+
+class _ThreadCells:
+    """
+    Counters of a thread, released when the thread exits.
+    """
+
+    __slots__ = ('cells', '__weakref__')
+
+    def __init__(self, cells: Dict[str, List]):
+        self.cells = cells
+
+
+@attrs(auto_attribs=True, frozen=True)
+class StageSnapshot:
+    """
+    Measurements of a single stage at some point of time.
+    Durations are in seconds.
+    """
+
+    count: int
+    failures: int
+    total: float
+    max: float
+    buckets: Tuple[int, ...]
+    """
+    Number of measurements in each bucket, see :data:`BUCKET_BOUNDS`
+    """
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Approximate `q`-th percentile (0 < q <= 100) of stage durations:
+        upper bound of the bucket which contains it
+        (capped by the max duration observed).
+        """
+        if not self.count:
+            return 0.0
+        rank = self.count * q / 100
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class PipelineStats:
+    """
+    Collection of per-stage latency histograms
+    with counters of successful and failed executions.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        # reentrant since a thread may exit (and be retired) during a snapshot
+        self._lock = threading.RLock()
+        self._threads_cells: List[Dict[str, List]] = []
+        self._retired: Dict[str, List] = {}
+
+    def _thread_cells(self) -> Dict[str, List]:
+        cells = {stage: _new_cells() for stage in STAGES}
+        with self._lock:
+            self._threads_cells.append(cells)
+        owner = self._local.owner = _ThreadCells(cells)
+        # thread-local data is dropped when the thread exits
+        weakref.finalize(owner, self._retire, cells)
+        self._local.cells = cells
+        return cells
+
+    def _retire(self, cells: Dict[str, List]):
+        with self._lock:
+            self._threads_cells = [c for c in self._threads_cells if c is not cells]
+            _add_cells(self._retired, cells)
+
+    def record(self, stage: str, elapsed: float, ok: bool = True):
+        """
+        Records a single execution of the stage.
+
+        :param stage: One of :data:`STAGES` or a custom stage name
+        :param elapsed: Duration in seconds
+        :param ok: Whether the stage succeeded
+        """
+        try:
+            cells = self._local.cells
+        except AttributeError:
+            cells = self._thread_cells()
+        try:
+            stage_cells = cells[stage]
+        except KeyError:
+            stage_cells = cells[stage] = _new_cells()
+        stage_cells[_COUNT] += 1
+        if not ok:
+            stage_cells[_FAILURES] += 1
+        stage_cells[_TOTAL] += elapsed
+        if elapsed > stage_cells[_MAX]:
+            stage_cells[_MAX] = elapsed
+        bucket = min(int(elapsed * 1_000_000).bit_length(), _BUCKETS_COUNT - 1)
+        stage_cells[_FIRST_BUCKET + bucket] += 1
+
+    def snapshot(self, stage: Optional[str] = None) -> Dict[str, StageSnapshot]:
+        """
+        Sums up measurements of all threads.
+
+        Threads keep recording while the snapshot is taken,
+        so it may be slightly inconsistent (e.g. a measurement is already counted
+        but its duration is not added to the total yet).
+
+        :param stage: Return only this stage
+        :return: Snapshot of each stage which has been recorded at least once
+        """
+        summed: Dict[str, List] = {}
+        with self._lock:
+            threads_cells = list(self._threads_cells)
+            _add_cells(summed, self._retired, stage)
+        for cells in threads_cells:
+            _add_cells(summed, cells, stage)
+        return {
+            name: StageSnapshot(
+                count=acc[_COUNT],
+                failures=acc[_FAILURES],
+                total=acc[_TOTAL],
+                max=acc[_MAX],
+                buckets=tuple(acc[_FIRST_BUCKET:]),
+            )
+            for name, acc in summed.items()
+            if acc[_COUNT]
+        }
@@ -6,21 +6,21 @@ _not_impl = NotImplementedError('No default implementation in base logger class'
 
 class BaseLogger(ABC):
     @abstractmethod
-    def info(self, message: str):
+    def info(self, message: str, *args):
         raise _not_impl
 
     @abstractmethod
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         raise _not_impl
 
     @abstractmethod
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         raise _not_impl
 
     @abstractmethod
-    def exception(self, message: str):
+    def exception(self, message: str, *args):
         raise _not_impl
 
     @abstractmethod
-    def error(self, message: str):
+    def error(self, message: str, *args):
         raise _not_impl
@@ -0,0 +1,78 @@
+"""
+Helpers which keep logging off the hot path of a pipeline:
+payloads are formatted only when a record is actually emitted
+and callbacks which only log can be skipped altogether.
+"""
+
+import functools
+import logging
+from typing import Any, Callable, Optional
+
+DEFAULT_PAYLOAD_LIMIT = 1000
+"""
+Default max length of a payload representation in logs.
+"""
+
+
+class Payload:
+    """
+    Wraps a (potentially huge) payload passed to a logger as an argument.
+    It's converted to string only if the record is emitted,
+    and the string is truncated to `limit` characters.
+    """
+
+    __slots__ = ('value', 'limit')
+
+    def __init__(self, value: Any, limit: Optional[int] = DEFAULT_PAYLOAD_LIMIT):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        value, limit = self.value, self.limit
+        if not limit:
+            return str(value)
+        if isinstance(value, (str, bytes)) and len(value) > limit:
+            # avoid building a full copy just to cut it
+            return f'{value[:limit]!s}... ({len(value)} total)'
+        text = str(value)
+        if len(text) > limit:
+            return f'{text[:limit]}... ({len(text)} total)'
+        return text
+
+    __repr__ = __str__
+
+
+def logs_only(logger: logging.Logger, level: int) -> Callable[[Callable], Callable]:
+    """
+    Marks a callback which does nothing but logging
+    to `logger` with the given `level`.
+
+    :class:`~happyly.listening.Executor` doesn't call such callbacks
+    when the level is disabled (or when the executor is quiet),
+    saving the call itself, not only message formatting.
+    Don't use it for callbacks which have any other side effects.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func._logs_only = (logger, level)  # type: ignore
+        return func
+
+    return decorator
+
+
+def _never() -> bool:
+    return False
+
+
+def callback_gate(callback: Any, quiet: bool) -> Optional[Callable[[], bool]]:
+    """
+    Returns a function which tells if the callback should be called,
+    or None if the callback should always be called.
+    """
+    marker = getattr(callback, '_logs_only', None)
+    if not isinstance(marker, tuple):
+        return None
+    if quiet:
+        return _never
+    logger, level = marker
+    return functools.partial(logger.isEnabledFor, level)
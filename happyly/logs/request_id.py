@@ -1,3 +1,4 @@
+import logging
 from logging import Logger
 
 from attr import attrs
@@ -11,20 +12,29 @@ class RequestIdLogger(BaseLogger):
     topic: str = ''
     request_id: str = ''
 
-    def _fmt(self, message):
-        return f' {self.topic:>35} | {self.request_id:>40} |> {message}'
+    def _fmt(self, message, args):
+        prefix = f' {self.topic:>35} | {self.request_id:>40} |> '
+        if args:
+            # prefix becomes a part of the format string
+            prefix = prefix.replace('%', '%%')
+        return prefix + message
 
-    def info(self, message: str):
-        self.logger.info(self._fmt(message))
+    def _log(self, level: int, message: str, args, **kwargs):
+        # the prefix is built only if the record is going to be emitted
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, self._fmt(message, args), *args, **kwargs)
 
-    def debug(self, message: str):
-        self.logger.debug(self._fmt(message))
+    def info(self, message: str, *args):
+        self._log(logging.INFO, message, args)
 
-    def warning(self, message: str):
-        self.logger.warning(self._fmt(message))
+    def debug(self, message: str, *args):
+        self._log(logging.DEBUG, message, args)
 
-    def exception(self, message: str):
-        self.logger.exception(self._fmt(message))
+    def warning(self, message: str, *args):
+        self._log(logging.WARNING, message, args)
 
-    def error(self, message: str):
-        self.logger.error(self._fmt(message))
+    def exception(self, message: str, *args):
+        self._log(logging.ERROR, message, args, exc_info=True)
+
+    def error(self, message: str, *args):
+        self._log(logging.ERROR, message, args)
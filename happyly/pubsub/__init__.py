@@ -1,2 +1,9 @@
-from .publisher import BasePublisher  # noqa: F401
+from .publisher import BasePublisher, AsyncPublisher  # noqa: F401
+from .batching import BatchingPublisher  # noqa: F401
 from .subscriber import SubscriberWithAck, BaseSubscriber  # noqa: F401
+from .in_memory import (  # noqa: F401
+    InMemoryBroker,
+    InMemoryPublisher,
+    InMemorySubscriber,
+    InMemoryMessage,
+)
@@ -0,0 +1,175 @@
+"""
+:class:`BatchingPublisher` sends messages of any publisher in batches.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from .publisher import BasePublisher
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def message_size(serialized_message: Any) -> int:
+    """
+    Size of a message in bytes, as counted by :class:`BatchingPublisher`
+    by default. Messages which are not bytes or strings are counted as empty.
+    """
+    if isinstance(serialized_message, (bytes, bytearray, str)):
+        return len(serialized_message)
+    return 0
+
+
+def _log_failure(future: Future):
+    error = future.exception()
+    if error is not None:
+        _LOGGER.error('Failed to publish a message: %r', error)
+
+
+class BatchingPublisher(BasePublisher):
+    """
+    Wraps any publisher and publishes messages in batches
+    via its :meth:`~BasePublisher.publish_many`.
+
+    Messages are buffered until `max_messages` or `max_bytes` is reached
+    or the oldest message has been waiting for `max_latency` seconds,
+    whichever comes first.
+
+    Neither :meth:`publish` nor :meth:`publish_nowait` waits for the batch,
+    so results of sequential runs of :class:`~happyly.listening.Executor`
+    are batched together.
+    `Executor` uses :meth:`publish_nowait` and calls
+    `on_published`/`on_publishing_failed` for each message
+    once its batch is sent.
+    Failures of messages sent via :meth:`publish` are only logged.
+    Use :meth:`flush` to wait until the buffered messages are sent.
+    """
+
+    def __init__(
+        self,
+        publisher: BasePublisher,
+        max_messages: int = 100,
+        max_bytes: int = 1024 * 1024,
+        max_latency: float = 0.01,
+        size: Callable[[Any], int] = message_size,
+    ):
+        """
+        :param publisher: Publisher which sends the batches
+        :param max_messages: Max number of messages in a batch
+        :param max_bytes: Max total size of messages in a batch.
+            A single message which is larger is sent as a batch on its own.
+        :param max_latency: Max time in seconds a message waits in the buffer
+        :param size: Function which returns size of a message in bytes
+        """
+        if max_messages < 1:
+            raise ValueError('max_messages should be positive.')
+        self.publisher = publisher
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self._size = size
+        self._buffer: List[Tuple[Any, Future]] = []
+        self._buffer_bytes = 0
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        # held while a batch is being sent, so that batches keep their order
+        self._flush_lock = threading.Lock()
+        self._linger_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def publish(self, serialized_message: Any):
+        """
+        Adds the message to the buffer, see :meth:`publish_nowait`.
+        """
+        self.publish_nowait(serialized_message).add_done_callback(_log_failure)
+
+    def publish_nowait(self, serialized_message: Any) -> Future:
+        """
+        Adds the message to the buffer.
+        If the buffer is full, sends it in the calling thread.
+
+        :return: Future which is resolved when the message's batch is sent
+        """
+        future: Future = Future()
+        size = self._size(serialized_message)
+        with self._lock:
+            overflow = bool(self._buffer) and self._buffer_bytes + size > self.max_bytes
+        if overflow:
+            # the message doesn't fit into the current batch
+            self.flush()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('Cannot publish via a closed BatchingPublisher.')
+            if self._linger_thread is None:
+                self._start_linger_thread()
+            if not self._buffer:
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            self._buffer.append((serialized_message, future))
+            self._buffer_bytes += size
+            count_reached = len(self._buffer) >= self.max_messages
+            full = count_reached or self._buffer_bytes >= self.max_bytes
+        if full:
+            self.flush()
+        return future
+
+    def _start_linger_thread(self):
+        self._linger_thread = threading.Thread(
+            target=self._linger, name='happyly-batching-publisher', daemon=True
+        )
+        self._linger_thread.start()
+
+    def _linger(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                delay = self._oldest + self.max_latency - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            self.flush()
+
+    def flush(self):
+        """
+        Sends all buffered messages right away
+        and blocks until they are sent.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = self._buffer
+                self._buffer = []
+                self._buffer_bytes = 0
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch: List[Tuple[Any, Future]]):
+        messages = [message for message, _ in batch]
+        try:
+            errors = self.publisher.publish_many(messages)
+        except Exception as e:
+            _LOGGER.exception('Failed to publish a batch of messages.')
+            errors = [e] * len(batch)
+        for (_, future), error in zip(batch, errors):
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def close(self):
+        """
+        Sends the buffered messages and stops the background thread.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._linger_thread
+        if thread is not None:
+            thread.join()
+        self.flush()
@@ -0,0 +1,447 @@
+"""
+In-process message broker with topics, subscriptions and ack/redelivery semantics
+similar to Google Pub/Sub, to run and load-test listeners without any network.
+"""
+
+import collections
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence
+
+from .publisher import BasePublisher
+from .subscriber import SubscriberWithAck
+
+_LOGGER = logging.getLogger(__name__)
+
+_EMPTY_ATTRIBUTES: Mapping[str, str] = {}
+
+
+class InMemoryMessage:
+    """
+    Message shaped like a Pub/Sub message:
+    has `data`, `attributes`, `message_id` and can be acked.
+
+    Each delivery of a message has its own `ack_id`,
+    so acking a delivery which has already expired has no effect.
+    """
+
+    __slots__ = (
+        'data',
+        'attributes',
+        'message_id',
+        'ack_id',
+        'delivery_attempt',
+        '_subscription',
+    )
+
+    def __init__(
+        self,
+        data: Any,
+        attributes: Mapping[str, str],
+        message_id: int,
+        subscription: '_Subscription',
+        delivery_attempt: int = 1,
+    ):
+        self.data = data
+        self.attributes = attributes
+        self.message_id = message_id
+        self.ack_id: Optional[int] = None  # set when the message is delivered
+        self.delivery_attempt = delivery_attempt
+        self._subscription = subscription
+
+    def ack(self):
+        self._subscription.ack(self.ack_id)
+
+    def nack(self):
+        """
+        Makes the message available for redelivery right away.
+        """
+        self._subscription.nack(self.ack_id)
+
+    def __repr__(self):
+        return (
+            f'InMemoryMessage(message_id={self.message_id}, data={self.data!r}, '
+            f'attributes={self.attributes!r})'
+        )
+
+
+class _Subscription:
+    def __init__(
+        self,
+        name: str,
+        ack_deadline: Optional[float],
+        max_outstanding: Optional[int],
+    ):
+        self.name = name
+        self.ack_deadline = ack_deadline
+        self.max_outstanding = max_outstanding
+        self._queue: Deque[InMemoryMessage] = collections.deque()
+        # delivered messages by their ack ids
+        self._outstanding: Dict[int, InMemoryMessage] = {}
+        self._ack_ids = itertools.count(1)
+        # the deadline is the same for all messages,
+        # so deadlines are ordered the same way as deliveries
+        self._deadlines: Deque = collections.deque()
+        self._cond = threading.Condition(threading.Lock())
+        self.delivered = 0
+        self.acked = 0
+
+    def put(self, data: Any, attributes: Mapping[str, str], message_id: int):
+        message = InMemoryMessage(data, attributes, message_id, self)
+        with self._cond:
+            self._queue.append(message)
+            self._cond.notify()
+
+    def put_many(self, items: Sequence):
+        messages = [
+            InMemoryMessage(data, attributes, message_id, self)
+            for data, attributes, message_id in items
+        ]
+        with self._cond:
+            self._queue.extend(messages)
+            self._cond.notify(len(messages))
+
+    def _requeue_expired(self, now: float):
+        deadlines = self._deadlines
+        outstanding = self._outstanding
+        while deadlines:
+            deadline, message = deadlines[0]
+            if outstanding.get(message.ack_id) is not message:
+                # acked, nacked or expired already
+                deadlines.popleft()
+            elif deadline <= now:
+                deadlines.popleft()
+                del outstanding[message.ack_id]
+                _LOGGER.debug(f'Ack deadline expired for message {message.message_id}')
+                self._redeliver(message)
+            else:
+                break
+
+    def _redeliver(self, message: InMemoryMessage):
+        self._queue.appendleft(
+            InMemoryMessage(
+                message.data,
+                message.attributes,
+                message.message_id,
+                self,
+                message.delivery_attempt + 1,
+            )
+        )
+
+    def _can_deliver(self) -> bool:
+        if not self._queue:
+            return False
+        if self.max_outstanding is None:
+            return True
+        return len(self._outstanding) < self.max_outstanding
+
+    def take(self, max_count: int, timeout: float) -> List[InMemoryMessage]:
+        with self._cond:
+            now = time.monotonic()
+            if self._deadlines:
+                self._requeue_expired(now)
+            if not self._can_deliver():
+                # wake up in time to redeliver expired messages
+                if self._deadlines:
+                    timeout = min(timeout, max(self._deadlines[0][0] - now, 0))
+                self._cond.wait(timeout)
+                if self._deadlines:
+                    self._requeue_expired(time.monotonic())
+                if not self._can_deliver():
+                    return []
+            count = max_count
+            if self.max_outstanding is not None:
+                count = min(count, self.max_outstanding - len(self._outstanding))
+            count = min(count, len(self._queue))
+            taken = [self._queue.popleft() for _ in range(count)]
+            for message in taken:
+                ack_id = message.ack_id = next(self._ack_ids)
+                self._outstanding[ack_id] = message
+            if self.ack_deadline is not None:
+                deadline = time.monotonic() + self.ack_deadline
+                self._deadlines.extend((deadline, m) for m in taken)
+            self.delivered += count
+            return taken
+
+    def ack(self, ack_id: Optional[int]):
+        with self._cond:
+            if self._outstanding.pop(ack_id, None) is None:  # type: ignore
+                # not delivered, acked or nacked already, or expired
+                return
+            self.acked += 1
+            outstanding = len(self._outstanding)
+            if not outstanding and not self._queue:
+                self._cond.notify_all()
+            elif self.max_outstanding is not None:
+                if outstanding == self.max_outstanding - 1:
+                    # a delivery thread may wait for a free slot
+                    self._cond.notify()
+
+    def nack(self, ack_id: Optional[int]):
+        with self._cond:
+            message = self._outstanding.pop(ack_id, None)  # type: ignore
+            if message is not None:
+                self._redeliver(message)
+                self._cond.notify()
+
+    def wake_up(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                wait = 0.1 if remaining is None else min(remaining, 0.1)
+                self._cond.wait(wait)
+                if self._deadlines:
+                    self._requeue_expired(time.monotonic())
+            return True
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue) + len(self._outstanding)
+
+
+class InMemoryBroker:
+    """
+    Keeps topics and subscriptions in memory of the current process.
+
+    Each message published to a topic is delivered to every subscription
+    of the topic which exists at the time of publishing.
+    A delivered message which is not acked within `ack_deadline` seconds
+    (or which is nacked) is delivered again.
+
+    Use :meth:`publisher` and :meth:`subscriber`
+    to get components for :class:`~happyly.listening.Executor`.
+    """
+
+    def __init__(self):
+        self._topics: Dict[str, List[_Subscription]] = {}
+        self._subscriptions: Dict[str, _Subscription] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_topic(self, topic: str):
+        with self._lock:
+            self._topics.setdefault(topic, [])
+
+    def create_subscription(
+        self,
+        topic: str,
+        subscription: str,
+        ack_deadline: Optional[float] = 10.0,
+        max_outstanding: Optional[int] = None,
+    ):
+        """
+        :param topic: Topic to subscribe to, created if it doesn't exist
+        :param subscription: Name of the subscription
+        :param ack_deadline: Seconds after which a delivered message
+            which is not acked is delivered again. None means never.
+        :param max_outstanding: Max number of delivered messages
+            which are not acked yet (flow control). None means no limit.
+        """
+        with self._lock:
+            if subscription in self._subscriptions:
+                raise ValueError(f'Subscription {subscription} already exists.')
+            sub = _Subscription(subscription, ack_deadline, max_outstanding)
+            self._subscriptions[subscription] = sub
+            # replaced rather than appended, publishers iterate over it without a lock
+            subscriptions = self._topics.get(topic, [])
+            self._topics[topic] = subscriptions + [sub]
+
+    def _subscriptions_of(self, topic: str) -> List[_Subscription]:
+        try:
+            return self._topics[topic]
+        except KeyError:
+            raise ValueError(f'Topic {topic} does not exist.') from None
+
+    def _subscription(self, subscription: str) -> _Subscription:
+        try:
+            return self._subscriptions[subscription]
+        except KeyError:
+            raise ValueError(f'Subscription {subscription} does not exist.') from None
+
+    def publish(
+        self, topic: str, data: Any, attributes: Optional[Mapping[str, str]] = None
+    ) -> int:
+        """
+        :return: Id of the published message
+        """
+        message_id = next(self._ids)
+        attributes = _EMPTY_ATTRIBUTES if attributes is None else attributes
+        for sub in self._subscriptions_of(topic):
+            sub.put(data, attributes, message_id)
+        return message_id
+
+    def publish_many(
+        self, topic: str, data: Sequence[Any], attributes: Optional[Mapping] = None
+    ) -> List[int]:
+        attributes = _EMPTY_ATTRIBUTES if attributes is None else attributes
+        items = [(d, attributes, next(self._ids)) for d in data]
+        for sub in self._subscriptions_of(topic):
+            sub.put_many(items)
+        return [message_id for _, _, message_id in items]
+
+    def wait_until_idle(
+        self, subscription: str, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Blocks until every message of the subscription is delivered and acked.
+
+        :return: False if timeout expired earlier
+        """
+        return self._subscription(subscription).wait_until_idle(timeout)
+
+    def backlog(self, subscription: str) -> int:
+        """
+        Number of messages of the subscription which are not acked yet.
+        """
+        return self._subscription(subscription).backlog
+
+    def publisher(self, topic: str) -> 'InMemoryPublisher':
+        return InMemoryPublisher(self, topic)
+
+    def subscriber(
+        self, subscription: str, workers: int = 1, batch_size: int = 100
+    ) -> 'InMemorySubscriber':
+        return InMemorySubscriber(self, subscription, workers, batch_size)
+
+
+class InMemoryPublisher(BasePublisher):
+    """
+    Publishes messages to a topic of :class:`InMemoryBroker`.
+    """
+
+    def __init__(self, broker: InMemoryBroker, topic: str):
+        self.broker = broker
+        self.topic = topic
+        broker.create_topic(topic)
+
+    def publish(self, serialized_message: Any):
+        self.broker.publish(self.topic, serialized_message)
+
+    def publish_many(
+        self, serialized_messages: Sequence[Any]
+    ) -> List[Optional[Exception]]:
+        self.broker.publish_many(self.topic, serialized_messages)
+        return [None] * len(serialized_messages)
+
+
+class StreamingDelivery:
+    """
+    Handle of a running :meth:`InMemorySubscriber.subscribe`.
+    """
+
+    def __init__(self, subscription: _Subscription):
+        self._subscription = subscription
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running = 0
+        self._lock = threading.Lock()
+        self.future: Future = Future()
+        """
+        Resolved when delivery is cancelled and all delivery threads are stopped.
+        """
+
+    @property
+    def cancelled(self) -> bool:
+        return self._stopped.is_set()
+
+    def cancel(self):
+        """
+        Stops delivering messages.
+        Messages which are being processed by the callback are finished.
+        """
+        self._stopped.set()
+        self._subscription.wake_up()
+
+    def result(self, timeout: Optional[float] = None):
+        """
+        Blocks until delivery is cancelled and all delivery threads are stopped.
+        """
+        return self.future.result(timeout)
+
+    def _start(self):
+        self._running = len(self._threads)
+        for thread in self._threads:
+            thread.start()
+
+    def _thread_stopped(self):
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            self.future.set_result(None)
+
+
+class InMemorySubscriber(SubscriberWithAck):
+    """
+    Delivers messages of a subscription of :class:`InMemoryBroker`
+    to the callback from `workers` threads.
+    Each thread takes up to `batch_size` messages at once
+    and runs the callback for them one by one.
+    """
+
+    _POLL_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        subscription: str,
+        workers: int = 1,
+        batch_size: int = 100,
+    ):
+        if workers < 1:
+            raise ValueError('InMemorySubscriber requires at least one worker.')
+        self.broker = broker
+        self.subscription = subscription
+        self.workers = workers
+        self.batch_size = batch_size
+
+    @property
+    def max_in_flight(self) -> Optional[int]:
+        return self.broker._subscription(self.subscription).max_outstanding
+
+    def subscribe(self, callback: Callable[[Any], Any]) -> StreamingDelivery:
+        subscription = self.broker._subscription(self.subscription)
+        delivery = StreamingDelivery(subscription)
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._deliver,
+                args=(subscription, delivery, callback),
+                name=f'{self.subscription}-delivery-{i}',
+                daemon=True,
+            )
+            delivery._threads.append(thread)
+        delivery._start()
+        return delivery
+
+    def _deliver(
+        self,
+        subscription: _Subscription,
+        delivery: StreamingDelivery,
+        callback: Callable[[Any], Any],
+    ):
+        try:
+            while not delivery.cancelled:
+                messages = subscription.take(self.batch_size, self._POLL_INTERVAL)
+                for message in messages:
+                    try:
+                        callback(message)
+                    except Exception:
+                        # the message will be redelivered after its ack deadline
+                        _LOGGER.exception(
+                            f'Callback failed for message {message.message_id}'
+                        )
+        finally:
+            delivery._thread_stopped()
+
+    def ack(self, message: InMemoryMessage):
+        message.ack()
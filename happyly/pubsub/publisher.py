@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
 
 
 class BasePublisher(ABC):
@@ -7,6 +8,62 @@ class BasePublisher(ABC):
     def publish(self, serialized_message: Any):
         raise NotImplementedError("No default implementation in base publisher class")
 
+    def publish_many(
+        self, serialized_messages: Sequence[Any]
+    ) -> List[Optional[Exception]]:
+        """
+        Publishes several messages at once.
+
+        Default implementation calls :meth:`publish` for each message.
+        Override it if the underlying technology allows
+        to publish a batch cheaper than each message on its own.
+
+        :param serialized_messages: Messages to publish
+        :return: A list of the same length as `serialized_messages`.
+            None for messages published successfully,
+            an exception object for messages which failed.
+        """
+        errors: List[Optional[Exception]] = []
+        for message in serialized_messages:
+            try:
+                self.publish(message)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    def publish_nowait(self, serialized_message: Any) -> Future:
+        """
+        Starts publishing of the message and returns without waiting for it,
+        if the underlying technology allows so.
+
+        Default implementation publishes the message right away
+        and returns a future which is already done.
+        Override it (along with :meth:`publish`)
+        if the publisher buffers or sends messages in the background;
+        :class:`~happyly.listening.Executor` then reports
+        each message as published once its future is done.
+
+        :param serialized_message: Message to publish
+        :return: Future which is resolved with None when the message is published
+            or with an exception if publishing failed
+        """
+        future: Future = Future()
+        try:
+            self.publish(serialized_message)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+        return future
+
+    def flush(self):
+        """
+        Blocks until all the messages started with :meth:`publish_nowait`
+        are published. No-op by default.
+        """
+
     @classmethod
     def from_function(cls, func: Callable[[Any], None]):
         def publish(self, serialized_message: Any):
@@ -16,3 +73,24 @@ class BasePublisher(ABC):
             '__GeneratedPublisher', (BasePublisher,), {'publish': publish}
         )
         return constructed_type()
+
+
+class AsyncPublisher(ABC):
+    """
+    Publisher which is able to publish without blocking,
+    to be used with :class:`~happyly.listening.AsyncExecutor`.
+    """
+
+    @abstractmethod
+    async def publish(self, serialized_message: Any):
+        raise NotImplementedError("No default implementation in base publisher class")
+
+    @classmethod
+    def from_function(cls, func: Callable[[Any], Awaitable[None]]):
+        async def publish(self, serialized_message: Any):
+            await func(serialized_message)
+
+        constructed_type = type(
+            '__GeneratedAsyncPublisher', (AsyncPublisher,), {'publish': publish}
+        )
+        return constructed_type()
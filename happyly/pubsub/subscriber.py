@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 
 
 class BaseSubscriber(ABC):
@@ -7,6 +7,16 @@ class BaseSubscriber(ABC):
     def subscribe(self, callback: Callable[[Any], Any]):
         raise NotImplementedError
 
+    @property
+    def max_in_flight(self) -> Optional[int]:
+        """
+        Max number of messages the subscriber hands over to the callback
+        without waiting for the previous ones to finish (e.g. due to flow control),
+        or None if it's unknown.
+        Executors use it as default for their `max_in_flight`.
+        """
+        return None
+
 
 class SubscriberWithAck(BaseSubscriber, ABC):
     @abstractmethod
@@ -1 +1,2 @@
 from .schema import Schema  # noqa: F401
+from .compiled import CompiledSchema, compile_schema  # noqa: F401
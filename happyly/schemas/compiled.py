@@ -0,0 +1,278 @@
+"""
+Schemas compiled into specialised loaders.
+
+:func:`compile_schema` analyses a schema once:
+which fields it has, which of them are required,
+how to check and convert a value of each simple field type.
+Loading data which passes these checks doesn't involve
+marshmallow's unmarshalling machinery at all.
+
+Whenever data doesn't pass (or a check can't tell for sure),
+the whole message is loaded by marshmallow itself,
+so accept/reject behaviour and error messages are exactly the same.
+Fields of types which can't be compiled (nested schemas, dates, etc.)
+are deserialized by marshmallow field by field,
+and schemas with custom processors or options which affect loading
+are not compiled at all.
+"""
+
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+import marshmallow
+from marshmallow import fields, missing
+from marshmallow.schema import UnmarshalResult
+
+from .schema import Schema
+
+_FAIL = object()
+"""
+Returned by compiled checks when marshmallow has to decide.
+"""
+
+_Convert = Callable[[Any], Any]
+
+
+def _convert_str(value):
+    return value if type(value) is str else _FAIL
+
+
+def _convert_int(value):
+    return value if type(value) is int else _FAIL
+
+
+def _convert_float(value):
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        try:
+            return float(value)
+        except OverflowError:
+            return _FAIL
+    return _FAIL
+
+
+def _convert_raw(value):
+    return value
+
+
+def _bool_converter(field: fields.Boolean) -> _Convert:
+    truthy, falsy = field.truthy, field.falsy
+    if not truthy:
+        return bool
+
+    def convert(value):
+        if value is True or value is False:
+            if value in truthy:
+                return True
+            if value in falsy:
+                return False
+        return _FAIL
+
+    return convert
+
+
+def _list_converter(field: fields.List) -> _Convert:
+    convert_item = _item_converter(field.container)
+
+    def convert(value):
+        if type(value) is not list and type(value) is not tuple:
+            return _FAIL
+        result = []
+        for each in value:
+            item = convert_item(each)
+            if item is _FAIL:
+                return _FAIL
+            result.append(item)
+        return result
+
+    return convert
+
+
+_SIMPLE_CONVERTERS: Dict[type, _Convert] = {
+    fields.String: _convert_str,
+    fields.Integer: _convert_int,
+    fields.Float: _convert_float,
+    fields.Raw: _convert_raw,
+}
+
+
+def _simple_converter(field: marshmallow.fields.Field) -> Optional[_Convert]:
+    # converter which mirrors field._deserialize for values it accepts,
+    # None if the field type is not supported
+    if field.validators:
+        return None
+    field_type = type(field)
+    if field_type in _SIMPLE_CONVERTERS:
+        return _SIMPLE_CONVERTERS[field_type]
+    if field_type is fields.Boolean:
+        return _bool_converter(field)
+    if field_type is fields.List:
+        return _list_converter(field)
+    return None
+
+
+def _item_converter(field: marshmallow.fields.Field) -> _Convert:
+    # the same as field.deserialize for an item of a list
+    convert = _simple_converter(field)
+    if convert is None:
+
+        def deserialize(value):
+            try:
+                return field.deserialize(value)
+            except marshmallow.ValidationError:
+                return _FAIL
+
+        return deserialize
+
+    allow_none = field.allow_none is True
+
+    def convert_item(value):
+        if value is None:
+            return None if allow_none else _FAIL
+        return convert(value)
+
+    return convert_item
+
+
+class _Step:
+    """
+    Loading of a single field.
+    """
+
+    __slots__ = ('name', 'key', 'field', 'required', 'allow_none', 'convert')
+
+    def __init__(self, name: str, field: marshmallow.fields.Field):
+        self.name = name
+        self.key = field.attribute or name
+        self.field = field
+        self.required = field.required
+        self.allow_none = field.allow_none is True
+        self.convert = _simple_converter(field)
+
+    def default(self):
+        value = self.field.missing
+        return value() if callable(value) else value
+
+
+def _uses_only_known_processors(schema: marshmallow.Schema) -> bool:
+    for (tag, pass_many), names in schema.__processors__.items():
+        for name in names:
+            if tag != marshmallow.decorators.VALIDATES_SCHEMA or pass_many:
+                return False
+            if getattr(type(schema), name, None) is not Schema.check_unknown_fields:
+                return False
+    return True
+
+
+def _compilable(schema: marshmallow.Schema) -> bool:
+    if schema.many or schema.partial or schema.dict_class is not dict:
+        return False
+    if not _uses_only_known_processors(schema):
+        return False
+    for field in schema.fields.values():
+        if field.load_from or (field.attribute and '.' in field.attribute):
+            return False
+    return True
+
+
+class CompiledSchema:
+    """
+    Loader/validator specialised for a single schema instance,
+    which behaves exactly like its :meth:`~marshmallow.Schema.load`
+    and :meth:`~marshmallow.Schema.validate`.
+
+    Use :func:`compile_schema` to get one.
+    """
+
+    def __init__(self, schema: marshmallow.Schema):
+        self.schema = schema
+        self._fields = schema.fields
+        self._field_names = frozenset(schema.fields)
+        self.compiled = _compilable(schema)
+        """
+        False if every message is loaded by marshmallow
+        since the schema has features which can't be compiled.
+        """
+        self._check_unknown = bool(
+            schema.__processors__.get((marshmallow.decorators.VALIDATES_SCHEMA, False))
+        )
+        self._steps: List[_Step] = [
+            _Step(name, field)
+            for name, field in schema.fields.items()
+            if not field.dump_only
+        ]
+
+    @property
+    def stale(self) -> bool:
+        """
+        Whether fields of the schema were replaced after compilation.
+        """
+        return self.schema.fields is not self._fields
+
+    def _load(self, data: Any) -> Any:
+        # returns _FAIL unless data is certainly valid
+        if not isinstance(data, dict):
+            return _FAIL
+        if self._check_unknown and not self._field_names.issuperset(data):
+            return _FAIL
+        result = {}
+        for step in self._steps:
+            value = data.get(step.name, missing)
+            if value is missing:
+                value = step.default()
+                if value is missing:
+                    if step.required:
+                        return _FAIL
+                    continue
+            convert = step.convert
+            if convert is None:
+                try:
+                    value = step.field.deserialize(value, step.name, data)
+                except marshmallow.ValidationError:
+                    return _FAIL
+                if value is missing:
+                    continue
+            elif value is None:
+                if not step.allow_none:
+                    return _FAIL
+            else:
+                value = convert(value)
+                if value is _FAIL:
+                    return _FAIL
+            result[step.key] = value
+        return result
+
+    def load(self, data: Any) -> UnmarshalResult:
+        """
+        The same as :meth:`marshmallow.Schema.load` with default arguments.
+        """
+        if self.compiled:
+            result = self._load(data)
+            if result is not _FAIL:
+                return UnmarshalResult(result, {})
+        return self.schema.load(data)
+
+    def validate(self, data: Any) -> Dict[str, Any]:
+        """
+        The same as :meth:`marshmallow.Schema.validate` with default arguments.
+        """
+        if self.compiled and self._load(data) is not _FAIL:
+            return {}
+        return self.schema.validate(data)
+
+
+_compiled: 'weakref.WeakKeyDictionary[marshmallow.Schema, CompiledSchema]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def compile_schema(schema: marshmallow.Schema) -> CompiledSchema:
+    """
+    Compiles the schema on the first call,
+    the following calls return the same :class:`CompiledSchema`.
+    """
+    compiled = _compiled.get(schema)
+    if compiled is None or compiled.stale:
+        compiled = _compiled[schema] = CompiledSchema(schema)
+    return compiled
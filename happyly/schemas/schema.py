@@ -11,13 +11,20 @@ class Schema(marshmallow.Schema):
 
     Instantiation with no arguments is a good strict default,
     but you can pass any arguments valid for :class:`marshmallow.Schema`
+
+    See :func:`happyly.schemas.compile_schema` for faster loading and validation.
     """
 
     def __init__(self, *args, **kwargs):
         super().__init__(strict=True, *args, **kwargs)
+        self._field_names = frozenset(self.fields)
+        self._field_names_of = self.fields
 
     @marshmallow.validates_schema(pass_original=True)
     def check_unknown_fields(self, data, original_data):
-        unknown = set(original_data) - set(self.fields)
+        if self._field_names_of is not self.fields:
+            self._field_names = frozenset(self.fields)
+            self._field_names_of = self.fields
+        unknown = set(original_data) - self._field_names
         if unknown:
             raise marshmallow.ValidationError('Unknown field', unknown)
@@ -1,3 +1,5 @@
-from .deserializer import Deserializer  # noqa: F401
-from .serializer import Serializer  # noqa: F401
+from .deserializer import Deserializer, AsyncDeserializer  # noqa: F401
+from .serializer import Serializer, AsyncSerializer  # noqa: F401
 from .dummy import DUMMY_DESERIALIZER, DUMMY_SERDE, DummyValidator  # noqa: F401
+from .validation import ValidationPolicy  # noqa: F401
+from .cached import CachingDeserializer  # noqa: F401
@@ -0,0 +1,160 @@
+"""
+Cache of deserialized messages for redelivered and duplicated payloads.
+"""
+
+import hashlib
+from typing import Any, Callable, Mapping, Optional
+
+from happyly.utils.lru import LRUCache, CacheCounters, MISSING
+from .deserializer import Deserializer
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f'{type(self).__name__} is immutable.')
+
+
+class FrozenDict(dict):
+    """
+    Dict which can't be modified.
+    It's still a dict, so it can be serialized by JSON encoders
+    and passed wherever a dict is expected.
+    Copies made by :mod:`copy` are regular (mutable) dicts.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+    __ior__ = _immutable
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FrozenList(list):
+    """
+    List which can't be modified, see :class:`FrozenDict`.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively converts dicts and lists into :class:`FrozenDict` and
+    :class:`FrozenList`. Other values are returned as is.
+    """
+    if isinstance(value, dict) and type(value) is not FrozenDict:
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list) and type(value) is not FrozenList:
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """
+    Mutable deep copy of a value made by :func:`freeze`.
+    """
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+def payload_key(message: Any) -> Optional[bytes]:
+    """
+    Default cache key: 128-bit BLAKE2b digest of `message.data`
+    (or of the message itself if it's `bytes` or `str`).
+    None if the message has no such payload, then it isn't cached.
+    """
+    data = getattr(message, 'data', message)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    elif not isinstance(data, (bytes, bytearray, memoryview)):
+        return None
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class CachingDeserializer(Deserializer):
+    """
+    Deserializer which remembers results of another deserializer
+    by a hash of the raw payload,
+    so that messages redelivered by Pub/Sub (or the same broadcast message
+    received by several subscriptions) are parsed only once.
+
+    Results are frozen (see :class:`FrozenDict`)
+    so that a handler can't corrupt the cached value.
+    Failures are not cached.
+
+    Other attributes (e.g. `request_id_field`)
+    are taken from the wrapped deserializer.
+
+    Use it only with deserializers whose result depends on the payload only,
+    like :class:`~happyly.google_pubsub.JSONDeserializerWithRequestIdRequired`
+    or :class:`~happyly.serialization.json.BinaryJSONDeserialierForSchema`.
+    """
+
+    def __init__(
+        self,
+        deserializer: Deserializer,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+        key: Callable[[Any], Optional[bytes]] = payload_key,
+    ):
+        """
+        :param deserializer: Deserializer which does the actual job
+        :param max_size: Max number of cached results,
+            the least recently used ones are evicted first
+        :param ttl: Seconds after which a cached result expires,
+            None means results don't expire
+        :param key: Function which returns a cache key for a message,
+            or None if the message shouldn't be cached
+        """
+        self.deserializer = deserializer
+        self._key = key
+        self._cache = LRUCache(max_size, ttl)
+
+    def __getattr__(self, name: str) -> Any:
+        # called only for attributes not found on the cache itself
+        if name == 'deserializer':
+            raise AttributeError(name)
+        return getattr(self.deserializer, name)
+
+    def deserialize(self, message: Any) -> Mapping[str, Any]:
+        key = self._key(message)
+        if key is None:
+            return self.deserializer.deserialize(message)
+        value = self._cache.get(key)
+        if value is MISSING:
+            value = freeze(self.deserializer.deserialize(message))
+            self._cache.put(key, value)
+        return value
+
+    def build_error_result(self, message: Any, error: Exception) -> Mapping[str, Any]:
+        return self.deserializer.build_error_result(message, error)
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def counters(self) -> CacheCounters:
+        return self._cache.counters
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Mapping, Any, Callable
+from typing import Mapping, Any, Callable, List, Sequence, Union, Awaitable
 
 import marshmallow
 from attr import attrs
@@ -12,6 +12,29 @@ class Deserializer(ABC):
     def deserialize(self, message: Any) -> Mapping[str, Any]:
         raise _not_impl
 
+    def deserialize_many(
+        self, messages: Sequence[Any]
+    ) -> List[Union[Mapping[str, Any], Exception]]:
+        """
+        Deserializes several messages at once.
+
+        Default implementation calls :meth:`deserialize` for each message.
+        Override it if deserialization of a batch
+        can be done cheaper than deserialization of each message on its own.
+
+        :param messages: Messages as they have been received
+        :return: A list of the same length as `messages`.
+            Message attributes for messages deserialized successfully,
+            an exception object for messages which failed.
+        """
+        results: List[Union[Mapping[str, Any], Exception]] = []
+        for message in messages:
+            try:
+                results.append(self.deserialize(message))
+            except Exception as e:
+                results.append(e)
+        return results
+
     def build_error_result(self, message: Any, error: Exception) -> Mapping[str, Any]:
         raise error from error
 
@@ -26,6 +49,34 @@ class Deserializer(ABC):
         return constructed_type()
 
 
+class AsyncDeserializer(ABC):
+    """
+    Deserializer which is able to perform I/O without blocking,
+    to be used with :class:`~happyly.listening.AsyncExecutor`.
+    """
+
+    @abstractmethod
+    async def deserialize(self, message: Any) -> Mapping[str, Any]:
+        raise _not_impl
+
+    async def build_error_result(
+        self, message: Any, error: Exception
+    ) -> Mapping[str, Any]:
+        raise error from error
+
+    @classmethod
+    def from_function(cls, func: Callable[[Any], Awaitable[Mapping[str, Any]]]):
+        async def deserialize(self, message: Any) -> Mapping[str, Any]:
+            return await func(message)
+
+        constructed_type = type(
+            '__GeneratedAsyncDeserializer',
+            (AsyncDeserializer,),
+            {'deserialize': deserialize},
+        )
+        return constructed_type()
+
+
 @attrs(auto_attribs=True, frozen=True)
 class DeserializerWithSchema(Deserializer, ABC):
 
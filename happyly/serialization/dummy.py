@@ -2,10 +2,12 @@ import warnings
 from typing import Any, Mapping
 
 import marshmallow
-from attr import attrs
+from attr import attrs, Factory
 
+from happyly.schemas.compiled import compile_schema
 from happyly.serialization import Serializer
 from .deserializer import Deserializer
+from .validation import ValidationPolicy
 
 
 class DummySerde(Deserializer, Serializer):
@@ -42,6 +44,15 @@ Serializer/deserializer which transforms message attributes to themselves
 """
 
 
+def validate_for_schema(schema: marshmallow.Schema, message: Mapping[str, Any]):
+    """
+    Raises :exc:`marshmallow.ValidationError` if the message doesn't match the schema.
+    """
+    errors = compile_schema(schema).validate(message)
+    if errors != {}:
+        raise marshmallow.ValidationError(str(errors))
+
+
 @attrs(auto_attribs=True, frozen=True)
 class DummyValidator(Deserializer, Serializer):
     """
@@ -53,11 +64,14 @@ class DummyValidator(Deserializer, Serializer):
     """
     Schema which will be used to validate the provided message
     """
+    validation: ValidationPolicy = Factory(ValidationPolicy)
+    """
+    Which messages are validated, each one by default.
+    See :attr:`ValidationPolicy.counters` for how many were validated and failed.
+    """
 
     def _validate(self, message):
-        errors = self.schema.validate(message)
-        if errors != {}:
-            raise marshmallow.ValidationError(str(errors))
+        self.validation.check(validate_for_schema, self.schema, message)
 
     def deserialize(self, message: Mapping[str, Any]) -> Mapping[str, Any]:
         self._validate(message)
@@ -1,16 +1,22 @@
 from typing import Mapping, Any
 
-from attr import attrs
+from attr import attrs, Factory
 
 from happyly.serialization.serializer import SerializerWithSchema
-from happyly.serialization import DummyValidator
+from happyly.serialization.dummy import validate_for_schema
+from happyly.serialization.validation import ValidationPolicy
 
 
 @attrs(auto_attribs=True)
 class JsonifyForSchema(SerializerWithSchema):
+    validation: ValidationPolicy = Factory(ValidationPolicy)
+    """
+    Which results are validated before jsonifying, each one by default
+    """
+
     def serialize(self, message_attributes: Mapping[str, Any]) -> Any:
-        DummyValidator(schema=self.schema).serialize(message_attributes)
         # raises error is msg doesn't match schema
+        self.validation.check(validate_for_schema, self.schema, message_attributes)
 
         import flask
 
@@ -1,50 +1,115 @@
 import json
-from typing import Any, Mapping
+from typing import Any, Mapping, Optional, Union
 
+import marshmallow
 from attr import attrs
 
 from happyly import Serializer, Deserializer
 from .deserializer import DeserializerWithSchema
 from .serializer import SerializerWithSchema
+from .json_backends import JSONBackend, default_backend
+from happyly.schemas.compiled import compile_schema
+
+
+def _schema_loads(
+    schema: marshmallow.Schema, data: Union[str, bytes], backend: JSONBackend
+) -> Mapping[str, Any]:
+    # the same as schema.loads, unless the schema has its own json module
+    if schema.opts.json_module is json:
+        deserialized, _ = compile_schema(schema).load(backend.loads(data))
+    else:
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        deserialized, _ = schema.loads(data)
+    return deserialized
+
+
+def _schema_dumps(
+    schema: marshmallow.Schema,
+    message_attributes: Mapping[str, Any],
+    backend: JSONBackend,
+) -> str:
+    if schema.opts.json_module is json:
+        data, _ = schema.dump(message_attributes)
+        return backend.dumps(data)
+    data, _ = schema.dumps(message_attributes)
+    return data
+
+
+def _schema_dumps_bytes(
+    schema: marshmallow.Schema,
+    message_attributes: Mapping[str, Any],
+    backend: JSONBackend,
+) -> bytes:
+    if schema.opts.json_module is json:
+        data, _ = schema.dump(message_attributes)
+        return backend.dumps_bytes(data)
+    data, _ = schema.dumps(message_attributes)
+    return data.encode('utf-8')
 
 
 class JSONSchemalessSerde(Serializer, Deserializer):
     """
     Simple JSON serializer/deserializer
     which doesn't validate for any schema
+
+    :param json_backend: JSON encoder/decoder, see
+        :mod:`happyly.serialization.json_backends`.
+        The default one is used if not specified.
     """
 
+    def __init__(self, json_backend: Optional[JSONBackend] = None):
+        self.json_backend = json_backend
+
     def serialize(self, message_attributes: Mapping[str, Any]) -> str:
-        return json.dumps(message_attributes)
+        return (self.json_backend or default_backend()).dumps(message_attributes)
 
-    def deserialize(self, message: str) -> Mapping[str, Any]:
-        return json.loads(message)
+    def deserialize(self, message: Union[str, bytes]) -> Mapping[str, Any]:
+        return (self.json_backend or default_backend()).loads(message)
+
+
+class BinaryJSONSchemalessSerde(JSONSchemalessSerde):
+    """
+    The same as :class:`JSONSchemalessSerde`,
+    but serializes into JSON encoded with utf-8.
+    """
+
+    def serialize(self, message_attributes: Mapping[str, Any]) -> bytes:
+        return (self.json_backend or default_backend()).dumps_bytes(message_attributes)
 
 
 @attrs(auto_attribs=True)
 class JSONSerializerForSchema(SerializerWithSchema):
+    json_backend: Optional[JSONBackend] = None
+
     def serialize(self, message_attributes: Mapping[str, Any]) -> Any:
-        data, _ = self.schema.dumps(message_attributes)
-        return data
+        backend = self.json_backend or default_backend()
+        return _schema_dumps(self.schema, message_attributes, backend)
 
 
 @attrs(auto_attribs=True)
 class JSONDeserializerForSchema(DeserializerWithSchema):
+    json_backend: Optional[JSONBackend] = None
+
     def deserialize(self, message: Any) -> Mapping[str, Any]:
-        deserialized, _ = self.schema.loads(message)
-        return deserialized
+        backend = self.json_backend or default_backend()
+        return _schema_loads(self.schema, message, backend)
 
 
 @attrs(auto_attribs=True)
 class BinaryJSONSerializerForSchema(SerializerWithSchema):
+    json_backend: Optional[JSONBackend] = None
+
     def serialize(self, message_attributes: Mapping[str, Any]) -> Any:
-        data, _ = self.schema.dumps(message_attributes)
-        return data.encode('utf-8')
+        backend = self.json_backend or default_backend()
+        return _schema_dumps_bytes(self.schema, message_attributes, backend)
 
 
 @attrs(auto_attribs=True)
 class BinaryJSONDeserialierForSchema(DeserializerWithSchema):
+    json_backend: Optional[JSONBackend] = None
+
     def deserialize(self, message: Any) -> Mapping[str, Any]:
-        data = message.data.decode('utf-8')
-        deserialized, _ = self.schema.loads(data)
-        return deserialized
+        # `message.data` is parsed as is, without decoding it into `str`
+        backend = self.json_backend or default_backend()
+        return _schema_loads(self.schema, message.data, backend)
@@ -0,0 +1,129 @@
+"""
+JSON encoders/decoders used by :mod:`happyly.serialization.json`
+and :mod:`happyly.google_pubsub` serializers.
+
+`orjson <https://github.com/ijl/orjson>`_ is used if it's installed
+(``pip install happyly[orjson]``), stdlib :mod:`json` otherwise.
+Both backends decode the same data and encode plain JSON types
+(dicts, lists, strings, finite numbers, booleans, None) the same way,
+though not necessarily into the same text (e.g. orjson omits whitespace).
+See :class:`OrjsonBackend` for the exceptions.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Union
+
+
+class JSONBackend(ABC):
+    """
+    Encodes and decodes JSON both as `str` and as utf-8 `bytes`,
+    so that binary messages don't need an intermediate `str` copy.
+    """
+
+    name: str
+
+    @abstractmethod
+    def loads(self, data: Union[str, bytes]) -> Any:
+        pass
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> str:
+        pass
+
+    @abstractmethod
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """
+        The same as :meth:`dumps` encoded with utf-8.
+        """
+        pass
+
+
+class StdlibJSONBackend(JSONBackend):
+    name = 'json'
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Backend which uses orjson.
+
+    Whatever orjson refuses to handle
+    (e.g. integers beyond 64 bits, non-string keys, NaN in input)
+    is passed to stdlib :mod:`json`, so results are the same as with
+    :class:`StdlibJSONBackend`.
+    Datetimes and dataclasses are passed to stdlib as well,
+    which raises :exc:`TypeError` for them.
+
+    Differences from :class:`StdlibJSONBackend` which remain:
+
+    - non-finite floats are encoded as ``null``
+      (stdlib writes ``NaN``/``Infinity``, which is not valid JSON)
+    - :class:`~uuid.UUID` is encoded as a string
+      and :class:`~enum.Enum` as its value
+      (stdlib raises :exc:`TypeError` unless it's a `str`/`int` enum)
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        try:
+            import orjson
+        except ImportError as e:
+            raise ImportError('Please install orjson to use this feature.') from e
+        self._orjson = orjson
+        self._options = (
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        try:
+            return self._orjson.dumps(obj, option=self._options).decode('utf-8')
+        except self._orjson.JSONEncodeError:
+            return json.dumps(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        try:
+            return self._orjson.dumps(obj, option=self._options)
+        except self._orjson.JSONEncodeError:
+            return json.dumps(obj).encode('utf-8')
+
+
+def _detect() -> JSONBackend:
+    try:
+        return OrjsonBackend()
+    except ImportError:
+        return StdlibJSONBackend()
+
+
+_default: JSONBackend = _detect()
+
+
+def default_backend() -> JSONBackend:
+    """
+    Backend used by serializers which weren't given one explicitly.
+    """
+    return _default
+
+
+def set_default_backend(backend: Optional[JSONBackend]):
+    """
+    :param backend: Backend to use by default,
+        None means the fastest one installed
+    """
+    global _default
+    _default = backend if backend is not None else _detect()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Mapping, Any, Callable
+from typing import Mapping, Any, Callable, List, Sequence, Union, Awaitable
 
 import marshmallow
 from attr import attrs
@@ -18,6 +18,29 @@ class Serializer(ABC):
     def serialize(self, message_attributes: Mapping[str, Any]) -> Any:
         raise _no_default
 
+    def serialize_many(
+        self, messages_attributes: Sequence[Mapping[str, Any]]
+    ) -> List[Union[Any, Exception]]:
+        """
+        Serializes several messages at once.
+
+        Default implementation calls :meth:`serialize` for each message.
+        Override it if serialization of a batch
+        can be done cheaper than serialization of each message on its own.
+
+        :param messages_attributes: Attributes of messages to serialize
+        :return: A list of the same length as `messages_attributes`.
+            Serialized message for messages serialized successfully,
+            an exception object for messages which failed.
+        """
+        results: List[Union[Any, Exception]] = []
+        for attributes in messages_attributes:
+            try:
+                results.append(self.serialize(attributes))
+            except Exception as e:
+                results.append(e)
+        return results
+
     @classmethod
     def from_function(cls, func: Callable[[Mapping[str, Any]], Any]):
         def serialize(self, message: Any) -> Mapping[str, Any]:
@@ -29,6 +52,27 @@ class Serializer(ABC):
         return constructed_type()
 
 
+class AsyncSerializer(ABC):
+    """
+    Serializer which is able to perform I/O without blocking,
+    to be used with :class:`~happyly.listening.AsyncExecutor`.
+    """
+
+    @abstractmethod
+    async def serialize(self, message_attributes: Mapping[str, Any]) -> Any:
+        raise _no_default
+
+    @classmethod
+    def from_function(cls, func: Callable[[Mapping[str, Any]], Awaitable[Any]]):
+        async def serialize(self, message: Any) -> Any:
+            return await func(message)
+
+        constructed_type = type(
+            '__GeneratedAsyncSerializer', (AsyncSerializer,), {'serialize': serialize}
+        )
+        return constructed_type()
+
+
 @attrs(auto_attribs=True, frozen=True)
 class SerializerWithSchema(Serializer, ABC):
 
@@ -0,0 +1,115 @@
+"""
+Policies which decide how many messages are validated against their schema,
+see `validation` argument of :class:`~happyly.serialization.DummyValidator`.
+"""
+
+import random
+import threading
+from typing import Callable, Optional
+
+from attr import attrs
+
+
+@attrs(auto_attribs=True, frozen=True)
+class ValidationCounters:
+    seen: int
+    """
+    Messages passed to the serde
+    """
+    sampled: int
+    """
+    Messages which were actually validated
+    """
+    failed: int
+    """
+    Validated messages which didn't match the schema
+    """
+
+
+class ValidationPolicy:
+    """
+    Validates each message by default,
+    use :meth:`never`, :meth:`every` or :meth:`fraction` for trusted sources
+    where validating each message is not worth its cost.
+
+    A policy counts messages it has seen, so each serde needs its own instance.
+    """
+
+    def __init__(self, every: int = 1, fraction: Optional[float] = None):
+        """
+        :param every: Validate one message out of `every`
+            (the first one, then every `every`-th one).
+            0 means no message is validated.
+        :param fraction: Validate a random share of messages instead,
+            from 0.0 (none) to 1.0 (all)
+        """
+        if every < 0:
+            raise ValueError('every must not be negative.')
+        if fraction is not None and not 0.0 <= fraction <= 1.0:
+            raise ValueError('fraction must be between 0.0 and 1.0.')
+        self._every = every
+        self._fraction = fraction
+        self._lock = threading.Lock()
+        self._seen = 0
+        self._sampled = 0
+        self._failed = 0
+
+    @classmethod
+    def always(cls) -> 'ValidationPolicy':
+        return cls(every=1)
+
+    @classmethod
+    def never(cls) -> 'ValidationPolicy':
+        return cls(every=0)
+
+    @classmethod
+    def sampled(cls, every: int) -> 'ValidationPolicy':
+        """
+        Validates one message out of `every`.
+        """
+        return cls(every=every)
+
+    @classmethod
+    def percentage(cls, percent: float) -> 'ValidationPolicy':
+        """
+        Validates `percent` % of messages chosen at random.
+        """
+        return cls(fraction=percent / 100)
+
+    def _should_validate(self) -> bool:
+        with self._lock:
+            seen = self._seen
+            self._seen += 1
+        if self._fraction is not None:
+            return random.random() < self._fraction
+        return self._every != 0 and seen % self._every == 0
+
+    def check(self, validate: Callable[..., None], *args):
+        """
+        Calls `validate` with `args` if the current message
+        is chosen for validation.
+
+        :param validate: Function which raises an exception
+            if the message doesn't match its schema
+        """
+        if not self._should_validate():
+            return
+        failed = True
+        try:
+            validate(*args)
+            failed = False
+        finally:
+            with self._lock:
+                self._sampled += 1
+                if failed:
+                    self._failed += 1
+
+    @property
+    def counters(self) -> ValidationCounters:
+        with self._lock:
+            return ValidationCounters(self._seen, self._sampled, self._failed)
+
+    def __repr__(self):
+        if self._fraction is not None:
+            return f'{type(self).__name__}(fraction={self._fraction})'
+        return f'{type(self).__name__}(every={self._every})'
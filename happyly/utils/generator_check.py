@@ -1,8 +1,25 @@
 import inspect
 
 
-def is_generator(handler):
+def _handling_function(handler):
+    wrapped = getattr(handler, '__wrapped__', None)
+    if wrapped is not None and hasattr(handler, 'handle'):
+        # handler which wraps another one (e.g. MemoizedHandler)
+        # gives back results the same way as the wrapped one
+        return _handling_function(wrapped)
     if hasattr(handler, 'handle'):  # class-based handler
-        return inspect.isgeneratorfunction(handler.handle)
+        return handler.handle
     else:  # func-based handler
-        return inspect.isgeneratorfunction(handler)
+        return handler
+
+
+def is_generator(handler):
+    return inspect.isgeneratorfunction(_handling_function(handler))
+
+
+def is_async_generator(handler):
+    return inspect.isasyncgenfunction(_handling_function(handler))
+
+
+def is_coroutine(handler):
+    return inspect.iscoroutinefunction(_handling_function(handler))
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from attr import attrs
+
+MISSING = object()
+"""
+Returned by :meth:`LRUCache.get` when there's no (fresh) value for the key.
+"""
+
+
+@attrs(auto_attribs=True, frozen=True)
+class CacheCounters:
+    hits: int
+    misses: int
+    evictions: int
+    """
+    Entries dropped because of cache size or expiration
+    """
+    size: int
+
+
+class LRUCache:
+    """
+    Thread-safe mapping of limited size
+    which drops the least recently used entries first
+    and, optionally, entries older than `ttl` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        if max_size < 1:
+            raise ValueError('max_size must be positive.')
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        :return: Cached value, :data:`MISSING` if there's none
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._evictions += 1
+            self._misses += 1
+            return MISSING
+
+    def put(self, key: Hashable, value: Any):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def counters(self) -> CacheCounters:
+        with self._lock:
+            return CacheCounters(
+                self._hits, self._misses, self._evictions, len(self._entries)
+            )
@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, Mapping
+from unittest.mock import call, patch
+
+import pytest
+
+from happyly import Handler, StopPipeline
+from happyly.exceptions import FetchedNoResult
+from happyly.listening import AsyncExecutor, AsyncLateAckExecutor
+from happyly.pubsub import AsyncPublisher, SubscriberWithAck
+from happyly.serialization import AsyncDeserializer
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class AsyncDeser(AsyncDeserializer):
+    async def deserialize(self, message: Any) -> Mapping[str, Any]:
+        await asyncio.sleep(0)
+        return {'spam': message}
+
+
+class AsyncHandler(Handler):
+    async def handle(self, message):
+        await asyncio.sleep(0)
+        if message['spam'] == 'bad':
+            raise KeyError('bad')
+        return {'result': message['spam']}
+
+    async def on_handling_failed(self, message, error):
+        return {'error': repr(error)}
+
+
+def test_async_handler_and_publisher():
+    published = []
+
+    class Publisher(AsyncPublisher):
+        async def publish(self, serialized_message: Any):
+            await asyncio.sleep(0)
+            published.append(serialized_message)
+
+    executor = AsyncExecutor(
+        handler=AsyncHandler(), deserializer=AsyncDeser(), publisher=Publisher()
+    )
+    with patch.object(executor, 'on_finished') as on_finished:
+        _run(executor.run_batch(['a', 'bad', 'b']))
+    assert sorted(map(str, published)) == sorted(
+        map(str, [{'result': 'a'}, {'result': 'b'}, {'error': "KeyError('bad')"}])
+    )
+    assert on_finished.call_count == 3
+
+
+def test_async_generator_handler():
+    async def handler(message):
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield {'i': i}
+
+    executor = AsyncExecutor(handler=handler)
+    with patch.object(executor, 'on_handled') as on_handled:
+        results = _run(executor.run_for_result({}))
+    assert results == [{'i': 0}, {'i': 1}, {'i': 2}]
+    assert on_handled.call_count == 3
+
+
+def test_async_stop_pipeline():
+    async def handler(message):
+        return {'a': 1}
+
+    class StoppingExecutor(AsyncExecutor):
+        def on_deserialized(self, original_message, deserialized_message):
+            raise StopPipeline('reason')
+
+    executor = StoppingExecutor(handler=handler)
+    with patch.object(executor, 'on_stopped') as on_stopped:
+        with pytest.raises(FetchedNoResult):
+            _run(executor.run_for_result({}))
+    on_stopped.assert_called_once_with(original_message={}, reason='reason')
+
+
+def test_async_late_ack():
+    class Subscriber(SubscriberWithAck):
+        def subscribe(self, callback):
+            pass
+
+        def ack(self, message):
+            pass
+
+    subscriber = Subscriber()
+    executor = AsyncLateAckExecutor(
+        subscriber=subscriber, handler=AsyncHandler(), deserializer=AsyncDeser()
+    )
+    with patch.object(subscriber, 'ack') as ack:
+        _run(executor.run_batch(['a', 'b']))
+    assert ack.call_args_list == [call('a'), call('b')]
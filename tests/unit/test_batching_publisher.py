@@ -0,0 +1,98 @@
+from typing import Any, List, Optional, Sequence
+from unittest.mock import patch
+
+import pytest
+
+from happyly.listening import Executor
+from happyly.pubsub import BasePublisher, BatchingPublisher
+
+
+class RecordingPublisher(BasePublisher):
+    def __init__(self, fail_on: Any = None):
+        self.batches: List[List[Any]] = []
+        self.fail_on = fail_on
+
+    def publish(self, serialized_message: Any):
+        raise NotImplementedError
+
+    def publish_many(
+        self, serialized_messages: Sequence[Any]
+    ) -> List[Optional[Exception]]:
+        self.batches.append(list(serialized_messages))
+        return [KeyError(m) if m == self.fail_on else None for m in serialized_messages]
+
+
+def test_flushes_by_count():
+    inner = RecordingPublisher()
+    publisher = BatchingPublisher(inner, max_messages=3, max_latency=60)
+    futures = [publisher.publish_nowait(i) for i in range(7)]
+    assert inner.batches == [[0, 1, 2], [3, 4, 5]]
+    assert not futures[6].done()
+    publisher.close()
+    assert inner.batches[-1] == [6]
+    assert all(f.result() is None for f in futures)
+
+
+def test_flushes_by_bytes_and_latency():
+    inner = RecordingPublisher()
+    publisher = BatchingPublisher(inner, max_bytes=10, max_latency=0.01)
+    publisher.publish_nowait(b'123456')
+    publisher.publish_nowait(b'123456')
+    assert inner.batches == [[b'123456']]
+    # the second message is sent by the linger thread
+    publisher.publish_nowait(b'1').result()
+    assert inner.batches == [[b'123456'], [b'123456', b'1']]
+    publisher.close()
+    with pytest.raises(RuntimeError):
+        publisher.publish(b'1')
+
+
+def test_publish_does_not_wait_for_batch(caplog):
+    inner = RecordingPublisher(fail_on=1)
+    publisher = BatchingPublisher(inner, max_latency=60)
+    publisher.publish(0)
+    publisher.publish(1)
+    assert inner.batches == []
+    publisher.flush()
+    assert inner.batches == [[0, 1]]
+    assert 'Failed to publish a message' in caplog.text
+    publisher.close()
+
+
+def test_sequential_runs_are_batched_together():
+    inner = RecordingPublisher()
+    publisher = BatchingPublisher(inner, max_messages=10, max_latency=60)
+    executor = Executor(handler=lambda m: {'i': m['i']}, publisher=publisher)
+    for i in range(10):
+        executor.run({'i': i})
+    assert inner.batches == [[{'i': i} for i in range(10)]]
+    executor.shutdown()
+
+
+def test_failed_messages():
+    publisher = BatchingPublisher(RecordingPublisher(fail_on=1), max_messages=2)
+    ok, failed = publisher.publish_nowait(0), publisher.publish_nowait(1)
+    assert ok.result() is None
+    assert isinstance(failed.exception(), KeyError)
+    publisher.close()
+
+
+def test_executor_reports_each_batched_message():
+    def handler(message):
+        for i in range(10):
+            yield {'i': i}
+
+    inner = RecordingPublisher(fail_on={'i': 9})
+    executor = Executor(
+        handler=handler,
+        publisher=BatchingPublisher(inner, max_messages=4, max_latency=0.01),
+    )
+    with patch.object(executor, 'on_published') as on_published:
+        with patch.object(executor, 'on_publishing_failed') as on_failed:
+            with patch.object(executor, 'on_finished') as on_finished:
+                executor.run({})
+    assert [len(batch) for batch in inner.batches] == [4, 4, 2]
+    assert on_published.call_count == 9
+    assert on_failed.call_count == 1
+    assert isinstance(on_finished.call_args[1]['error'], KeyError)
+    executor.shutdown()
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from happyly import bench
+from happyly.listening import LateAckListener
+
+
+def make_listener(handler, subscriber):
+    return LateAckListener(
+        subscriber=subscriber,
+        handler=handler,
+        deserializer=lambda m: json.loads(m.data),
+        publisher=lambda m: None,
+    )
+
+
+def test_run_load_with_factory():
+    executor = bench.build_executor(
+        make_listener, bench.synthetic_handler(bench.latency_distribution('fixed:0'))
+    )
+    messages = list(bench.synthetic_messages(50, size=10))
+    report = bench.run_load(executor, messages, concurrency=4)
+    executor.shutdown()
+    assert report['messages'] == 50
+    assert all(message.acked for message in messages)
+    assert 0 < report['latency_p50'] <= report['latency_p99'] <= report['latency_max']
+
+
+def test_cli(tmpdir, capsys):
+    recorded = tmpdir.join('messages.jsonl')
+    recorded.write('{"data": {"request_id": "1"}}\n{"request_id": "2"}\n')
+    args = ['-n', '5', '-c', '2', '--recorded', str(recorded), '--json']
+    assert bench.main(args + ['tests.unit.test_bench:make_listener']) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report['messages'] == 5
+    assert report['throughput'] > 0
+
+
+@pytest.mark.parametrize('spec', ['fixed', 'uniform:1', 'gamma:1', 'exp:x'])
+def test_invalid_latency(spec):
+    with pytest.raises(Exception):
+        bench.latency_distribution(spec)
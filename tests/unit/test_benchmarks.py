@@ -0,0 +1,17 @@
+import json
+
+from benchmarks.__main__ import compare
+from benchmarks.cases import CASES
+
+
+def test_cases_run():
+    for name, setup in CASES.items():
+        setup()()
+
+
+def test_compare(capsys):
+    baseline = {'results': {'a': {'best_us': 10.0}, 'b': {'best_us': 10.0}}}
+    current = {'results': {'a': {'best_us': 10.5}, 'b': {'best_us': 12.0}}}
+    assert compare(baseline, current, threshold=10) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
+    assert compare(baseline, json.loads(json.dumps(baseline)), threshold=10) == 0
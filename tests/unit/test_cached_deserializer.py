@@ -0,0 +1,87 @@
+import copy
+import json
+import pickle
+from types import SimpleNamespace
+
+import marshmallow
+import pytest
+
+from happyly import Deserializer, Schema
+from happyly.serialization import CachingDeserializer
+from happyly.serialization.json import BinaryJSONDeserialierForSchema
+
+
+class ValueSchema(Schema):
+    value = marshmallow.fields.Int(required=True)
+    tags = marshmallow.fields.List(marshmallow.fields.Str())
+
+
+class CountingDeserializer(BinaryJSONDeserialierForSchema):
+    calls = 0
+
+    def deserialize(self, message):
+        CountingDeserializer.calls += 1
+        return super().deserialize(message)
+
+
+def _message(payload):
+    return SimpleNamespace(data=json.dumps(payload).encode('utf-8'))
+
+
+@pytest.fixture
+def cached():
+    CountingDeserializer.calls = 0
+    return CachingDeserializer(CountingDeserializer(schema=ValueSchema()), max_size=2)
+
+
+def test_redelivered_message_is_parsed_once(cached):
+    first = cached.deserialize(_message({'value': 1, 'tags': ['a']}))
+    second = cached.deserialize(_message({'value': 1, 'tags': ['a']}))
+    assert first == second == {'value': 1, 'tags': ['a']}
+    assert CountingDeserializer.calls == 1
+    counters = cached.counters
+    assert (counters.hits, counters.misses, counters.size) == (1, 1, 1)
+    assert cached.schema is cached.deserializer.schema
+
+
+def test_results_are_immutable(cached):
+    result = cached.deserialize(_message({'value': 1, 'tags': ['a']}))
+    with pytest.raises(TypeError):
+        result['value'] = 2
+    with pytest.raises(TypeError):
+        result['tags'].append('b')
+    assert json.loads(json.dumps(result)) == {'value': 1, 'tags': ['a']}
+    assert pickle.loads(pickle.dumps(result)) == result
+
+    mutable = copy.deepcopy(result)
+    mutable['tags'].append('b')
+    assert cached.deserialize(_message({'value': 1, 'tags': ['a']}))['tags'] == ['a']
+
+
+def test_lru_eviction_and_failures(cached):
+    for value in (1, 2, 1, 3):
+        cached.deserialize(_message({'value': value}))
+    # 2 is the least recently used one
+    cached.deserialize(_message({'value': 1}))
+    cached.deserialize(_message({'value': 2}))
+    assert CountingDeserializer.calls == 4
+    assert cached.counters.evictions == 2
+
+    for _ in range(2):
+        with pytest.raises(marshmallow.ValidationError):
+            cached.deserialize(_message({'value': 'spam'}))
+    assert CountingDeserializer.calls == 6
+
+
+def test_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('happyly.utils.lru.time.monotonic', lambda: now[0])
+    inner = Deserializer.from_function(lambda message: {'data': message.decode()})
+    cached = CachingDeserializer(inner, ttl=10)
+    assert cached.deserialize(b'spam') == {'data': 'spam'}
+    now[0] += 5
+    cached.deserialize(b'spam')
+    now[0] += 10
+    cached.deserialize(b'spam')
+    counters = cached.counters
+    assert (counters.hits, counters.misses, counters.evictions) == (1, 2, 1)
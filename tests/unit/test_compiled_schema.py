@@ -0,0 +1,110 @@
+import marshmallow
+import pytest
+from marshmallow import fields
+
+from happyly import Schema
+from happyly.schemas import compile_schema
+
+
+class Inner(marshmallow.Schema):
+    x = fields.Int(required=True)
+
+
+class Mixed(Schema):
+    name = fields.Str(required=True)
+    count = fields.Int()
+    ratio = fields.Float(allow_none=True)
+    flag = fields.Bool()
+    tags = fields.List(fields.Str())
+    scores = fields.List(fields.Int(allow_none=True))
+    raw = fields.Raw()
+    level = fields.Int(missing=1)
+    short = fields.Str(validate=marshmallow.validate.Length(max=3))
+    when = fields.DateTime()
+    inner = fields.Nested(Inner)
+    renamed = fields.Str(attribute='other_name')
+
+
+class Loose(marshmallow.Schema):
+    name = fields.Str(required=True)
+    count = fields.Int()
+
+
+MESSAGES = [
+    {'name': 'a'},
+    {'name': 'a', 'count': 1, 'ratio': 0.5, 'flag': True, 'tags': ['x', 'y']},
+    {'name': 'a', 'ratio': None, 'scores': [1, None], 'raw': {'any': [1]}},
+    {'name': 'a', 'count': 2, 'ratio': 3, 'flag': False, 'level': 5},
+    {'name': 'a', 'short': 'abc', 'when': '2019-01-01T00:00:00', 'inner': {'x': 1}},
+    {'name': 'a', 'renamed': 'r'},
+    # the following are either invalid or converted by marshmallow
+    {},
+    {'name': None},
+    {'name': 1},
+    {'name': 'a', 'count': '1'},
+    {'name': 'a', 'count': 1.5},
+    {'name': 'a', 'count': True},
+    {'name': 'a', 'ratio': '0.5'},
+    {'name': 'a', 'ratio': 10**400},
+    {'name': 'a', 'flag': 'true'},
+    {'name': 'a', 'flag': 2},
+    {'name': 'a', 'tags': 'x'},
+    {'name': 'a', 'tags': ['x', 1]},
+    {'name': 'a', 'scores': [None, 'a']},
+    {'name': 'a', 'short': 'abcd'},
+    {'name': 'a', 'when': 'yesterday'},
+    {'name': 'a', 'inner': {}},
+    {'name': 'a', 'unknown': 1},
+    {'name': b'bytes'},
+    ['not', 'a', 'dict'],
+    None,
+]
+
+
+def _outcome(func, message):
+    try:
+        return 'ok', func(message)
+    except marshmallow.ValidationError as e:
+        return 'error', e.messages
+    except Exception as e:
+        # e.g. unknown fields check of happyly.Schema doesn't expect None
+        return 'exception', type(e)
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+@pytest.mark.parametrize('schema_cls', [Mixed, Loose])
+def test_same_as_marshmallow(schema_cls, message):
+    schema = schema_cls()
+    compiled = compile_schema(schema)
+    assert compiled.compiled
+    assert _outcome(compiled.load, message) == _outcome(schema.load, message)
+    assert _outcome(compiled.validate, message) == _outcome(schema.validate, message)
+
+
+def test_not_compiled_with_processors():
+    class WithPostLoad(Schema):
+        name = fields.Str()
+
+        @marshmallow.post_load
+        def upper(self, data):
+            return {'name': data['name'].upper()}
+
+    compiled = compile_schema(WithPostLoad())
+    assert not compiled.compiled
+    assert compiled.load({'name': 'a'}).data == {'name': 'A'}
+
+
+def test_compiled_once():
+    schema = Mixed()
+    assert compile_schema(schema) is compile_schema(schema)
+    assert compile_schema(schema) is not compile_schema(Mixed())
+
+
+def test_valid_messages_skip_marshmallow(monkeypatch):
+    schema = Mixed()
+    compiled = compile_schema(schema)
+    monkeypatch.setattr(schema, 'load', None)
+    monkeypatch.setattr(schema, 'validate', None)
+    for message in MESSAGES[:6]:
+        assert compiled.validate(message) == {}
+        compiled.load(message)
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from happyly import Deserializer
+from happyly.caching import InMemoryProcessedIds, RedisProcessedIds
+from happyly.listening import (
+    AsyncEarlyAckExecutor,
+    AsyncLateAckExecutor,
+    EarlyAckListener,
+    LateAckListener,
+)
+from happyly.pubsub import SubscriberWithAck
+
+
+class FakeSubscriber(SubscriberWithAck):
+    def __init__(self):
+        self.acked = []
+
+    def subscribe(self, callback):
+        pass
+
+    def ack(self, message):
+        self.acked.append(message)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, ex)
+
+
+def _listener(listener_cls, handler, processed_ids):
+    return listener_cls(
+        subscriber=FakeSubscriber(),
+        handler=handler,
+        deserializer=Deserializer.from_function(lambda m: m),
+        processed_ids=processed_ids,
+    )
+
+
+@pytest.mark.parametrize('listener_cls', [EarlyAckListener, LateAckListener])
+def test_redelivered_message_is_acked_and_skipped(listener_cls):
+    handled = []
+    listener = _listener(listener_cls, handled.append, InMemoryProcessedIds())
+    message = {'request_id': '42'}
+    for _ in range(3):
+        listener.run(message)
+    listener.run({'request_id': '43'})
+    assert handled == [message, {'request_id': '43'}]
+    assert len(listener.subscriber.acked) == 4
+
+
+@pytest.mark.parametrize('listener_cls', [AsyncEarlyAckExecutor, AsyncLateAckExecutor])
+def test_async_redelivered_message_is_acked_and_skipped(listener_cls):
+    handled = []
+    listener = _listener(listener_cls, handled.append, InMemoryProcessedIds())
+    message = {'request_id': '42'}
+    loop = asyncio.new_event_loop()
+    try:
+        for _ in range(3):
+            loop.run_until_complete(listener.run(message))
+    finally:
+        loop.close()
+    assert handled == [message]
+    assert len(listener.subscriber.acked) == 3
+
+
+def test_failed_message_is_processed_again():
+    calls = []
+
+    def handler(message):
+        calls.append(message)
+        if len(calls) == 1:
+            raise ValueError
+
+    listener = _listener(LateAckListener, handler, InMemoryProcessedIds())
+    for _ in range(3):
+        listener.run({'request_id': '42'})
+    assert len(calls) == 2
+
+
+def test_batch_and_redis_store():
+    redis = FakeRedis()
+    store = RedisProcessedIds(client=redis, ttl=60)
+    handled = []
+    listener = _listener(LateAckListener, handled.append, store)
+    listener.run_batch([{'request_id': '1'}, {'request_id': '2'}, {'spam': 'eggs'}])
+    listener.run_batch([{'request_id': '1'}, {'request_id': '3'}, {'spam': 'eggs'}])
+    assert [m.get('request_id') for m in handled] == ['1', '2', None, '3', None]
+    assert redis.data == {f'happyly:processed:{i}': (1, 60) for i in ('1', '2', '3')}
+    assert len(listener.subscriber.acked) == 6
+
+
+def test_in_memory_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('happyly.utils.lru.time.monotonic', lambda: now[0])
+    store = InMemoryProcessedIds(ttl=10)
+    store.add('42')
+    assert store.contains('42')
+    now[0] += 11
+    assert not store.contains('42')
@@ -1,11 +1,18 @@
+import gc
+import logging
+import threading
+import time
+from concurrent.futures import Future
 from typing import Any, Mapping
-from unittest.mock import patch
+from unittest.mock import Mock, call, patch
 
 import pytest
 
 from happyly.exceptions import FetchedNoResult
 from happyly import Deserializer, Serializer, StopPipeline
-from happyly.listening import Executor
+from happyly.listening import Executor, LateAckListener, MessageContext
+from happyly.listening.stats import PipelineStats
+from happyly.pubsub import BasePublisher, BaseSubscriber
 from happyly.serialization import DUMMY_SERDE
 from tests.unit.test_handler import TestHandler
 
@@ -666,3 +673,501 @@ def test_stop_on_deserialized(
     with pytest.raises(FetchedNoResult):
         executor.run_for_result("original message")
     assert_callbacks()
+
+
+def test_publishing_generator_results():
+    published = []
+
+    def handler(message):
+        for i in range(5):
+            yield {'i': i}
+
+    executor = Executor(handler=handler, publisher=lambda m: published.append(m))
+    with patch.object(executor, 'on_published') as on_published:
+        executor.run({})
+        executor.run({})
+    assert sorted(m['i'] for m in published) == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    assert on_published.call_count == 10
+    # workers are started once and reused by the following runs
+    assert len(executor._publisher_pool._threads) == 1
+    executor.shutdown()
+
+
+def test_publishing_failure():
+    error = KeyError('123')
+
+    def publish(message):
+        raise error
+
+    executor = Executor(
+        handler=lambda m: {'spam': 'eggs'}, publisher=publish, publisher_workers=2
+    )
+    with patch.object(executor, 'on_publishing_failed') as on_publishing_failed:
+        with patch.object(executor, 'on_finished') as on_finished:
+            executor.run({})
+    on_publishing_failed.assert_called_once_with(
+        original_message={},
+        deserialized_message={},
+        result={'spam': 'eggs'},
+        serialized_message={'spam': 'eggs'},
+        error=error,
+    )
+    on_finished.assert_called_once_with(original_message={}, error=error)
+    executor.shutdown()
+
+
+def test_run_batch():
+    error = KeyError('123')
+
+    class TestDeser(Deserializer):
+        def deserialize(self, message: Any) -> Mapping[str, Any]:
+            if message == 'broken':
+                raise error
+            return {'spam': message}
+
+    published = []
+
+    class TestPublisher(BasePublisher):
+        def publish(self, serialized_message: Any):
+            raise NotImplementedError
+
+        def publish_many(self, serialized_messages):
+            published.append(list(serialized_messages))
+            return [None] * len(serialized_messages)
+
+    class StoppingExecutor(Executor):
+        def on_handled(self, original_message, deserialized_message, result):
+            if original_message == 'stop':
+                raise StopPipeline('stopped')
+
+    executor = StoppingExecutor(
+        handler=lambda m: {'result': m['spam']},
+        deserializer=TestDeser(),
+        publisher=TestPublisher(),
+    )
+    with patch.object(executor, 'on_published') as on_published, patch.object(
+        executor, 'on_finished'
+    ) as on_finished, patch.object(executor, 'on_stopped') as on_stopped:
+        executor.run_batch(['a', 'broken', 'stop', 'b'])
+
+    # a single publishing call for the whole batch
+    assert published == [[{'result': 'a'}, {'result': 'b'}]]
+    assert on_published.call_count == 2
+    on_stopped.assert_called_once_with(original_message='stop', reason='stopped')
+    assert on_finished.call_args_list == [
+        call(original_message='a', error=None),
+        call(original_message='broken', error=error),
+        call(original_message='b', error=None),
+    ]
+
+
+def test_run_batch_calls_the_same_callbacks_as_run():
+    class FailingSerializer(Serializer):
+        def serialize(self, message_attributes):
+            if message_attributes['spam'] == 'unserializable':
+                raise ValueError('cannot serialize')
+            return message_attributes
+
+    class FailingPublisher(BasePublisher):
+        def publish(self, serialized_message):
+            if serialized_message['spam'] == 'unpublishable':
+                raise KeyError('cannot publish')
+
+    class RecordingExecutor(Executor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.calls = []
+
+        def __getattribute__(self, name):
+            attr = super().__getattribute__(name)
+            if name.startswith('on_') and callable(attr):
+                message = super().__getattribute__('context').message
+
+                def record(*args, **kwargs):
+                    self.calls.append((message, name))
+                    return attr(*args, **kwargs)
+
+                return record
+            return attr
+
+    messages = ['ok', 'unserializable', 'unpublishable']
+
+    def executor():
+        return RecordingExecutor(
+            handler=lambda m: {'spam': m['spam']},
+            deserializer=lambda m: {'spam': m},
+            serializer=FailingSerializer(),
+            publisher=FailingPublisher(),
+        )
+
+    single = executor()
+    for message in messages:
+        single.run(message)
+    single.shutdown()
+    batched = executor()
+    batched.run_batch(messages)
+    assert sorted(batched.calls) == sorted(single.calls)
+
+
+def test_concurrent_runs_are_isolated():
+    published = []
+
+    class RecordingExecutor(Executor):
+        def on_published(
+            self, original_message, deserialized_message, result, serialized_message
+        ):
+            published.append((original_message['n'], result['n']))
+
+    def handler(message):
+        time.sleep(0.001)
+        for _ in range(3):
+            yield {'n': message['n']}
+
+    executor = RecordingExecutor(
+        handler=handler,
+        publisher=lambda m: None,
+        workers=8,
+        max_in_flight=16,
+        publisher_workers=4,
+    )
+    futures = [executor.submit({'n': n}) for n in range(100)]
+    for future in futures:
+        future.result()
+    executor.shutdown()
+    assert len(published) == 300
+    assert all(original == result for original, result in published)
+
+
+def test_max_in_flight():
+    release = threading.Event()
+    executor = Executor(handler=lambda m: release.wait(), workers=1, max_in_flight=2)
+    executor.submit({})
+    executor.submit({})
+    blocked = threading.Thread(target=executor.submit, args=({},))
+    blocked.start()
+    blocked.join(timeout=0.1)
+    assert blocked.is_alive()  # third message waits for a free slot
+    release.set()
+    blocked.join(timeout=5)
+    assert not blocked.is_alive()
+    executor.shutdown()
+
+
+def test_pipeline_plan_is_reused():
+    executor = Executor(handler=lambda m: {'a': 1})
+    with patch('happyly.utils.generator_check.is_generator') as is_generator:
+        executor.run({})
+        executor.run({})
+        is_generator.assert_not_called()
+
+    def generator_handler(message):
+        yield {'a': 1}
+        yield {'a': 2}
+
+    # replacing a component updates the plan
+    executor.handler = generator_handler
+    assert list(executor.run_for_result({})) == [{'a': 1}, {'a': 2}]
+
+
+def test_disabled_base_callbacks_are_skipped(caplog):
+    class CustomExecutor(Executor):
+        def on_handled(self, original_message, deserialized_message, result):
+            handled.append(result)
+
+    handled = []
+    executor = CustomExecutor(handler=lambda m: {'a': 1})
+    with caplog.at_level(logging.WARNING, logger='happyly'):
+        executor.run({})
+    assert handled == [{'a': 1}]
+    assert caplog.records == []
+    with caplog.at_level(logging.INFO, logger='happyly'):
+        executor.run({})
+    assert 'Pipeline execution finished.' in caplog.messages
+
+
+def test_quiet_executor_skips_logging_callbacks(caplog):
+    executor = Executor(
+        handler=lambda m: {'a': 1}, publisher=lambda m: None, quiet=True
+    )
+    with caplog.at_level(logging.DEBUG, logger='happyly'):
+        executor.run({})
+        executor.run_batch([{}, {}])
+    assert caplog.records == []
+
+
+def test_quiet_can_be_changed_later(caplog):
+    executor = Executor(handler=lambda m: {'a': 1}, publisher=lambda m: None)
+    with caplog.at_level(logging.INFO, logger='happyly'):
+        executor.run({})
+        assert caplog.records
+        caplog.clear()
+        executor.quiet = True
+        executor.run({})
+        executor.run_batch([{}])
+        assert caplog.records == []
+        executor.quiet = False
+        executor.run_batch([{}])
+        assert 'Pipeline execution finished.' in caplog.messages
+
+
+def test_logged_payload_is_truncated(caplog):
+    executor = Executor(handler=lambda m: m, log_payload_limit=10)
+    with caplog.at_level(logging.INFO, logger='happyly'):
+        executor.run('x' * 100)
+    assert 'Received message: xxxxxxxxxx... (100 total)' in caplog.messages
+
+
+def test_stage_stats():
+    def handler(message):
+        if message.get('fail'):
+            raise KeyError('fail')
+        return {'a': 1}
+
+    published = []
+    executor = Executor(
+        handler=handler, publisher=lambda m: published.append(m), collect_stats=True
+    )
+    executor.run({})
+    executor.run({'fail': True})
+
+    snapshot = executor.stats.snapshot()
+    assert snapshot['deserialize'].count == 2
+    assert snapshot['handle'].count == 2
+    assert snapshot['handle'].failures == 1
+    assert snapshot['serialize'].count == 1
+    assert snapshot['publish'].count == 1
+    assert snapshot['pipeline'].count == 2
+    assert snapshot['pipeline'].failures == 1
+    assert sum(snapshot['pipeline'].buckets) == 2
+    assert 0 < snapshot['pipeline'].percentile(50) <= snapshot['pipeline'].max
+    assert Executor().stats is None
+
+
+def test_batch_stage_stats():
+    executor = Executor(
+        handler=lambda m: {'a': 1}, publisher=lambda m: None, collect_stats=True
+    )
+    executor.run_batch([{}, {}, {}])
+    snapshot = executor.stats.snapshot()
+    for stage in ('deserialize', 'handle', 'serialize', 'publish', 'pipeline'):
+        assert snapshot[stage].count == 3
+        assert snapshot[stage].failures == 0
+
+
+def test_stats_of_exited_threads_are_kept():
+    stats = PipelineStats()
+    threads = [
+        threading.Thread(target=stats.record, args=('handle', 0.001)) for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+        thread.join()
+    stats.record('handle', 0.002, ok=False)
+    gc.collect()
+    # only the counters of the current thread are left
+    assert len(stats._threads_cells) == 1
+    snapshot = stats.snapshot('handle')['handle']
+    assert snapshot.count == 6
+    assert snapshot.failures == 1
+    assert snapshot.max == 0.002
+
+
+def test_generator_results_are_backpressured():
+    produced = []
+    published = []
+    ahead = []
+
+    def handler(message):
+        for i in range(20):
+            produced.append(i)
+            ahead.append(len(produced) - len(published))
+            yield {'i': i}
+
+    def publish(message):
+        time.sleep(0.001)
+        published.append(message)
+
+    executor = Executor(handler=handler, publisher=publish, max_pending_results=3)
+    with patch.object(executor, 'on_serialized') as on_serialized:
+        executor.run({})
+    assert [m['i'] for m in published] == list(range(20))
+    assert on_serialized.call_count == 20
+    # the handler isn't resumed while 3 results are waiting for the publisher
+    assert max(ahead) <= 4
+    executor.shutdown()
+
+
+class BackgroundPublisher(BasePublisher):
+    def __init__(self, events):
+        self.events = events
+
+    def publish(self, serialized_message):
+        self.events.append(('publish', serialized_message['i']))
+
+    def publish_nowait(self, serialized_message):
+        future = Future()
+
+        def confirm():
+            time.sleep(0.01)
+            self.events.append(('published', serialized_message['i']))
+            future.set_result(None)
+
+        threading.Thread(target=confirm).start()
+        return future
+
+
+def _late_ack_listener(events, handler):
+    subscriber = Mock()
+    subscriber.ack.side_effect = lambda m: events.append(('acked', m))
+    return LateAckListener(
+        subscriber=subscriber,
+        handler=handler,
+        deserializer=lambda m: m,
+        publisher=BackgroundPublisher(events),
+    )
+
+
+def test_late_ack_waits_for_published_results():
+    events = []
+
+    def handler(message):
+        for i in range(3):
+            yield {'i': i}
+
+    executor = _late_ack_listener(events, handler)
+    executor.run({})
+    assert len(events) == 4
+    assert events[-1] == ('acked', {})
+    executor.shutdown()
+
+
+class FireAndForgetExecutor(Executor):
+    wait_for_publishing = False
+
+
+def test_single_result_is_published_in_background():
+    events = []
+    executor = _late_ack_listener(events, lambda m: {'i': 0})
+    executor.run({})
+    # publish_nowait is used, but the result is confirmed before the ack
+    assert events == [('published', 0), ('acked', {})]
+    executor.shutdown()
+
+    events.clear()
+    executor = FireAndForgetExecutor(
+        handler=lambda m: {'i': 0}, publisher=BackgroundPublisher(events)
+    )
+    executor.run({})
+    # the run doesn't block until the publisher confirms the result
+    assert events == []
+    executor.shutdown()
+    time.sleep(0.05)
+    assert events == [('published', 0)]
+
+
+def test_streamed_results_are_waited_for():
+    error = KeyError('oops')
+
+    def handler(message):
+        for i in range(3):
+            yield {'i': i}
+
+    def publish(message):
+        time.sleep(0.01)
+        if message['i'] == 2:
+            raise error
+
+    executor = Executor(handler=handler, publisher=publish)
+    with patch.object(executor, 'on_finished') as on_finished:
+        executor.run({})
+    on_finished.assert_called_once_with(original_message={}, error=error)
+
+    class StoppingExecutor(Executor):
+        def on_published(
+            self, original_message, deserialized_message, result, serialized_message
+        ):
+            if result['i'] == 2:
+                raise StopPipeline('enough')
+
+    executor = StoppingExecutor(handler=handler, publisher=lambda m: None)
+    with patch.object(executor, 'on_stopped') as on_stopped:
+        with patch.object(executor, 'on_finished') as on_finished:
+            executor.run({})
+    on_stopped.assert_called_once_with(original_message={}, reason='enough')
+    on_finished.assert_not_called()
+    executor.shutdown()
+
+
+def test_fire_and_forget_reports_known_failures():
+    error = KeyError('oops')
+
+    def handler(message):
+        yield {'i': 0}
+        # the first result is published by now
+        time.sleep(0.05)
+        yield {'i': 1}
+
+    def publish(message):
+        if message['i'] == 0:
+            raise error
+        time.sleep(0.05)
+
+    executor = FireAndForgetExecutor(handler=handler, publisher=publish)
+    with patch.object(executor, 'on_finished') as on_finished:
+        executor.run({})
+    on_finished.assert_called_once_with(original_message={}, error=error)
+    executor.shutdown()
+
+
+def test_max_in_flight_defaults_to_subscriber_limit():
+    class LimitedSubscriber(BaseSubscriber):
+        max_in_flight = 8
+
+        def subscribe(self, callback):
+            pass
+
+    executor = Executor(subscriber=LimitedSubscriber(), workers=2)
+    assert executor._run_pool.max_in_flight == 8
+    executor = Executor(subscriber=LimitedSubscriber(), workers=2, max_in_flight=3)
+    assert executor._run_pool.max_in_flight == 3
+
+
+def test_message_context():
+    seen = []
+
+    class ContextExecutor(Executor):
+        def on_published(
+            self, original_message, deserialized_message, result, serialized_message
+        ):
+            seen.append(('published', self.context.message))
+
+        def on_finished(self, original_message, error):
+            context = self.context
+            seen.append(('finished', context.message, context.serialized))
+
+    def generator_handler(message):
+        for i in range(2):
+            yield {'i': i}
+
+    for handler, last in ((lambda m: {'i': 0}, 0), (generator_handler, 1)):
+        seen.clear()
+        executor = ContextExecutor(handler=handler, publisher=lambda m: None)
+        executor.run({'n': 1})
+        executor.shutdown()
+        assert executor.context is None
+        # results are published in publisher threads as well
+        assert seen[:-1] == [('published', {'n': 1})] * (last + 1)
+        assert seen[-1] == ('finished', {'n': 1}, {'i': last})
+
+    class StoppingExecutor(Executor):
+        def on_stopped(self, original_message, reason=''):
+            seen.append(self.context)
+
+    def stop(message):
+        raise StopPipeline('enough')
+
+    executor = StoppingExecutor(handler=stop)
+    executor.run_batch([{}])
+    executor.run({})
+    assert [c.stop_reason for c in seen[-2:]] == ['enough', 'enough']
+    assert all(isinstance(c, MessageContext) and c.done for c in seen[-2:])
@@ -0,0 +1,187 @@
+import gc
+import json
+import logging
+import weakref
+from types import SimpleNamespace
+
+import marshmallow
+import pytest
+
+from happyly import StopPipeline
+from happyly.caching import InMemoryProcessedIds
+from happyly.caching.mixins import CacheByRequestIdMixin
+from happyly.google_pubsub.deserializers import JSONDeserializerWithRequestIdRequired
+from happyly.google_pubsub.high_level.base import GooglePubSubExecutorWithRequestId
+from happyly.listening.listener import EarlyAckExecutor, LateAckExecutor
+from happyly.pubsub import SubscriberWithAck
+
+
+class Schema(marshmallow.Schema):
+    request_id = marshmallow.fields.Str(required=True)
+    value = marshmallow.fields.Int()
+
+
+class CountingDeserializer(JSONDeserializerWithRequestIdRequired):
+    calls = 0
+
+    def deserialize(self, message):
+        CountingDeserializer.calls += 1
+        return super().deserialize(message)
+
+
+class FakeSubscriber(SubscriberWithAck):
+    def subscribe(self, callback):
+        pass
+
+    def ack(self, message):
+        pass
+
+
+class LateAck(LateAckExecutor, GooglePubSubExecutorWithRequestId):
+    pass
+
+
+class EarlyAck(EarlyAckExecutor, GooglePubSubExecutorWithRequestId):
+    pass
+
+
+class FakeCacher:
+    def __init__(self):
+        self.added = []
+        self.removed = []
+
+    def add(self, data, key):
+        self.added.append(key)
+
+    def remove(self, key):
+        self.removed.append(key)
+
+
+class Cached(CacheByRequestIdMixin, LateAck):
+    def __init__(self, cacher, *args, **kwargs):
+        CacheByRequestIdMixin.__init__(self, cacher)
+        LateAck.__init__(self, *args, **kwargs)
+
+
+class Message(SimpleNamespace):
+    pass
+
+
+def message(request_id='42'):
+    data = json.dumps({'request_id': request_id, 'value': 1})
+    return Message(data=data.encode('utf-8'), attributes={})
+
+
+@pytest.mark.parametrize('executor_cls', [LateAck, EarlyAck])
+def test_deserializes_once(executor_cls):
+    CountingDeserializer.calls = 0
+    executor = executor_cls(
+        subscriber=FakeSubscriber(),
+        handler=lambda m: m,
+        deserializer=CountingDeserializer(schema=Schema()),
+        from_topic='topic',
+    )
+    executor.run(message())
+    executor.run(message('43'))
+    assert CountingDeserializer.calls == 2
+
+
+def _assert_released(run, msg=None):
+    # parsed attributes don't outlive the message's pipeline
+    msg = msg or message()
+    ref = weakref.ref(msg)
+    # captured log records would keep the message alive
+    logging.disable(logging.CRITICAL)
+    try:
+        run(msg)
+    finally:
+        logging.disable(logging.NOTSET)
+    del msg
+    gc.collect()
+    assert ref() is None
+
+
+class Stopping(EarlyAck):
+    def on_deserialized(self, original_message, deserialized_message):
+        raise StopPipeline('spam')
+
+
+def _executor(executor_cls=LateAck, **kwargs):
+    return executor_cls(
+        subscriber=FakeSubscriber(),
+        handler=lambda m: m,
+        deserializer=CountingDeserializer(schema=Schema()),
+        from_topic='topic',
+        **kwargs,
+    )
+
+
+def test_parsed_message_released_when_stopped():
+    executor = _executor(Stopping)
+    _assert_released(executor.run)
+
+    executor = _executor(processed_ids=InMemoryProcessedIds())
+    executor.run(message())
+    _assert_released(executor.run)
+
+
+def test_parsed_message_released_when_failed():
+    executor = _executor()
+    _assert_released(executor.run, Message(data=b'not json', attributes={}))
+
+
+@pytest.mark.parametrize('executor_cls', [LateAck, EarlyAck])
+def test_batch_deserializes_once_and_releases(executor_cls):
+    CountingDeserializer.calls = 0
+    executor = _executor(executor_cls)
+    executor.run_batch([message('1'), message('2')])
+    assert CountingDeserializer.calls == 2
+    _assert_released(lambda m: executor.run_batch([m]))
+
+
+def test_request_id_logged(caplog):
+    executor = LateAck(
+        subscriber=FakeSubscriber(),
+        handler=lambda m: m,
+        deserializer=JSONDeserializerWithRequestIdRequired(schema=Schema()),
+        from_topic='topic',
+    )
+    with caplog.at_level('INFO', logger='happyly'):
+        executor.run(message('abc'))
+    acked = [r.getMessage() for r in caplog.records if 'acknowledged' in r.message]
+    assert acked and 'abc' in acked[0]
+
+
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')
+def test_cache_mixin_reuses_parsed_message():
+    CountingDeserializer.calls = 0
+    cacher = FakeCacher()
+    executor = Cached(
+        cacher,
+        subscriber=FakeSubscriber(),
+        handler=lambda m: m,
+        deserializer=CountingDeserializer(schema=Schema()),
+        from_topic='topic',
+    )
+    executor.run(message())
+    assert CountingDeserializer.calls == 1
+    assert cacher.added == ['42']
+
+
+def test_context_keeps_request_id_and_ack_state():
+    contexts = []
+
+    class Recording(LateAck):
+        def on_finished(self, original_message, error):
+            super().on_finished(original_message, error)
+            contexts.append(self.context)
+
+    executor = Recording(
+        subscriber=FakeSubscriber(),
+        handler=lambda m: m,
+        deserializer=JSONDeserializerWithRequestIdRequired(schema=Schema()),
+        from_topic='topic',
+    )
+    executor.run(message('abc'))
+    assert contexts[0].request_id == 'abc'
+    assert contexts[0].acked
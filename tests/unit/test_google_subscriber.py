@@ -0,0 +1,70 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from happyly.google_pubsub.subscribers import GooglePubSubSubscriber
+
+
+@pytest.fixture
+def pubsub_v1():
+    pubsub_v1 = MagicMock()
+    modules = {
+        'google': MagicMock(),
+        'google.cloud': MagicMock(pubsub_v1=pubsub_v1),
+        'google.cloud.pubsub_v1': pubsub_v1,
+        'google.cloud.pubsub_v1.subscriber': pubsub_v1.subscriber,
+        'google.cloud.pubsub_v1.subscriber.scheduler': pubsub_v1.subscriber.scheduler,
+    }
+    with patch.dict(sys.modules, modules):
+        yield pubsub_v1
+
+
+def _subscribe_kwargs(pubsub_v1, subscriber):
+    callback = MagicMock()
+    subscriber.subscribe(callback)
+    client = pubsub_v1.SubscriberClient.return_value
+    args, kwargs = client.subscribe.call_args
+    assert args == (client.subscription_path.return_value, callback)
+    return kwargs
+
+
+def test_library_defaults(pubsub_v1):
+    subscriber = GooglePubSubSubscriber('project', 'sub')
+    pubsub_v1.SubscriberClient.return_value.subscription_path.assert_called_once_with(
+        'project', 'sub'
+    )
+    assert _subscribe_kwargs(pubsub_v1, subscriber) == {}
+    assert subscriber.max_in_flight is None
+
+
+def test_flow_control_and_workers(pubsub_v1):
+    subscriber = GooglePubSubSubscriber(
+        'project', 'sub', max_messages=10, max_bytes=1024, max_workers=4
+    )
+    kwargs = _subscribe_kwargs(pubsub_v1, subscriber)
+    pubsub_v1.types.FlowControl.assert_called_once_with(max_messages=10, max_bytes=1024)
+    assert kwargs['flow_control'] is pubsub_v1.types.FlowControl.return_value
+
+    thread_scheduler = pubsub_v1.subscriber.scheduler.ThreadScheduler
+    assert kwargs['scheduler'] is thread_scheduler.return_value
+    executor = thread_scheduler.call_args[1]['executor']
+    assert isinstance(executor, ThreadPoolExecutor)
+    assert executor._max_workers == 4
+    assert subscriber.max_in_flight == 10
+
+
+def test_scheduler_factory(pubsub_v1):
+    factory = MagicMock()
+    subscriber = GooglePubSubSubscriber(
+        'project', 'sub', max_bytes=1024, max_workers=4, scheduler_factory=factory
+    )
+    kwargs = _subscribe_kwargs(pubsub_v1, subscriber)
+    pubsub_v1.types.FlowControl.assert_called_once_with(max_bytes=1024)
+    # the factory takes precedence over max_workers
+    assert kwargs['scheduler'] is factory.return_value
+    pubsub_v1.subscriber.scheduler.ThreadScheduler.assert_not_called()
+    # each subscription gets its own scheduler
+    subscriber.subscribe(MagicMock())
+    assert factory.call_count == 2
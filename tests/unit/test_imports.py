@@ -26,9 +26,23 @@ def test_imports():
         LateAckListener,
         EarlyAckListener,
         ListenerWithAck,
+        AsyncExecutor,
+        AsyncExecutorWithAck,
+        AsyncEarlyAckExecutor,
+        AsyncLateAckExecutor,
+    )
+    from happyly.pubsub import (
+        BasePublisher,
+        BaseSubscriber,
+        SubscriberWithAck,
+        AsyncPublisher,
+    )
+    from happyly.serialization import (
+        Deserializer,
+        Serializer,
+        AsyncDeserializer,
+        AsyncSerializer,
     )
-    from happyly.pubsub import BasePublisher, BaseSubscriber, SubscriberWithAck
-    from happyly.serialization import Deserializer, Serializer
 
     from happyly.google_pubsub import (
         GoogleLateAckReceiver,
@@ -0,0 +1,102 @@
+import json
+import time
+
+from happyly.listening import LateAckListener
+from happyly.pubsub import InMemoryBroker
+
+
+def test_publish_and_ack():
+    broker = InMemoryBroker()
+    broker.create_subscription('topic', 'sub')
+    broker.create_subscription('topic', 'other')
+    received = []
+
+    def callback(message):
+        received.append(message.data)
+        message.ack()
+
+    delivery = broker.subscriber('sub', workers=2).subscribe(callback)
+    publisher = broker.publisher('topic')
+    for i in range(100):
+        publisher.publish(i)
+    publisher.publish_many([100, 101])
+    assert broker.wait_until_idle('sub', timeout=5)
+    delivery.cancel()
+    delivery.result(timeout=5)
+    assert sorted(received) == list(range(102))
+    # every subscription gets its own copy
+    assert broker.backlog('other') == 102
+
+
+def test_redelivery():
+    broker = InMemoryBroker()
+    broker.create_subscription('topic', 'sub', ack_deadline=0.05)
+    attempts = []
+
+    def callback(message):
+        attempts.append(message.delivery_attempt)
+        if message.delivery_attempt == 2:
+            message.nack()
+        elif message.delivery_attempt == 3:
+            message.ack()
+
+    delivery = broker.subscriber('sub').subscribe(callback)
+    broker.publish('topic', b'data', {'key': 'value'})
+    assert broker.wait_until_idle('sub', timeout=5)
+    delivery.cancel()
+    # not acked - expired, nacked - redelivered right away, acked
+    assert attempts == [1, 2, 3]
+
+
+def test_stale_ack_is_ignored():
+    broker = InMemoryBroker()
+    broker.create_subscription('topic', 'sub', ack_deadline=0.05)
+    subscription = broker._subscription('sub')
+    broker.publish('topic', b'data')
+    [first] = subscription.take(1, timeout=1)
+    time.sleep(0.1)
+    [second] = subscription.take(1, timeout=1)
+    assert second.message_id == first.message_id
+    assert second.ack_id != first.ack_id
+    # the first delivery has expired, so its ack doesn't count
+    first.ack()
+    assert broker.backlog('sub') == 1
+    assert subscription.acked == 0
+    second.ack()
+    assert broker.backlog('sub') == 0
+    assert subscription.acked == 1
+
+
+def test_flow_control():
+    broker = InMemoryBroker()
+    broker.create_subscription('topic', 'sub', max_outstanding=2)
+    held = []
+    delivery = broker.subscriber('sub').subscribe(held.append)
+    broker.publish_many('topic', [1, 2, 3])
+    time.sleep(0.1)
+    assert [m.data for m in held] == [1, 2]
+    held[0].ack()
+    time.sleep(0.1)
+    assert [m.data for m in held] == [1, 2, 3]
+    delivery.cancel()
+    assert broker.subscriber('sub').max_in_flight == 2
+
+
+def test_executor_with_ack():
+    broker = InMemoryBroker()
+    broker.create_subscription('requests', 'requests-sub')
+    broker.create_subscription('replies', 'replies-sub')
+    subscriber = broker.subscriber('requests-sub')
+    executor = LateAckListener(
+        subscriber=subscriber,
+        deserializer=lambda m: json.loads(m.data),
+        handler=lambda m: {'doubled': m['value'] * 2},
+        serializer=lambda r: json.dumps(r).encode(),
+        publisher=broker.publisher('replies'),
+        quiet=True,
+    )
+    delivery = executor.start_listening()
+    broker.publish_many('requests', [json.dumps({'value': i}) for i in range(50)])
+    assert broker.wait_until_idle('requests-sub', timeout=5)
+    delivery.cancel()
+    assert broker.backlog('replies-sub') == 50
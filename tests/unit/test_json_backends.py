@@ -0,0 +1,119 @@
+import datetime
+import json
+import math
+import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import marshmallow
+import pytest
+
+from happyly.google_pubsub.deserializers import JSONDeserializerWithRequestIdRequired
+from happyly.serialization import json_backends
+from happyly.serialization.json import (
+    BinaryJSONDeserialierForSchema,
+    BinaryJSONSchemalessSerde,
+    BinaryJSONSerializerForSchema,
+    JSONSchemalessSerde,
+    JSONSerializerForSchema,
+)
+from happyly.serialization.json_backends import OrjsonBackend, StdlibJSONBackend
+
+
+def _backends():
+    backends = [StdlibJSONBackend()]
+    try:
+        backends.append(OrjsonBackend())
+    except ImportError:
+        pass
+    return backends
+
+
+class Schema(marshmallow.Schema):
+    request_id = marshmallow.fields.Str(required=True)
+    text = marshmallow.fields.Str()
+
+
+DATA = {'request_id': '42', 'text': 'привет', 'values': [1, 2.5, None, True]}
+
+
+@pytest.mark.parametrize('backend', _backends(), ids=lambda b: b.name)
+def test_backend_round_trip(backend):
+    assert backend.loads(backend.dumps(DATA)) == DATA
+    assert backend.loads(backend.dumps_bytes(DATA)) == DATA
+    assert json.loads(backend.dumps_bytes(DATA).decode('utf-8')) == DATA
+    # whatever stdlib handles is handled the same way
+    assert backend.loads(backend.dumps({1: 2**70})) == {'1': 2**70}
+    assert math.isnan(backend.loads('[NaN]')[0])
+    with pytest.raises(ValueError):
+        backend.loads(b'{broken')
+
+
+@dataclass
+class Point:
+    x: int
+
+
+@pytest.mark.parametrize('backend', _backends(), ids=lambda b: b.name)
+@pytest.mark.parametrize('value', [datetime.datetime(2020, 1, 1), Point(1)])
+def test_unsupported_types_are_rejected(backend, value):
+    with pytest.raises(TypeError):
+        backend.dumps({'value': value})
+    with pytest.raises(TypeError):
+        backend.dumps_bytes({'value': value})
+
+
+def test_orjson_differences():
+    pytest.importorskip('orjson')
+    backend = OrjsonBackend()
+    assert backend.loads(backend.dumps([math.nan, math.inf])) == [None, None]
+    value = uuid.UUID(int=1)
+    assert backend.loads(backend.dumps_bytes([value])) == [str(value)]
+    with pytest.raises(TypeError):
+        StdlibJSONBackend().dumps([value])
+
+
+@pytest.mark.parametrize('backend', _backends(), ids=lambda b: b.name)
+def test_serializers(backend):
+    message = SimpleNamespace(
+        data=BinaryJSONSerializerForSchema(Schema(), json_backend=backend).serialize(
+            DATA
+        )
+    )
+    assert isinstance(message.data, bytes)
+    expected = {'request_id': '42', 'text': 'привет'}
+    deserializer = BinaryJSONDeserialierForSchema(Schema(), json_backend=backend)
+    assert deserializer.deserialize(message) == expected
+    deserializer = JSONDeserializerWithRequestIdRequired(Schema(), json_backend=backend)
+    assert deserializer.deserialize(message) == expected
+    serialized = JSONSerializerForSchema(Schema(), json_backend=backend).serialize(DATA)
+    assert json.loads(serialized) == expected
+
+    serde = BinaryJSONSchemalessSerde(json_backend=backend)
+    assert serde.deserialize(serde.serialize(DATA)) == DATA
+    assert JSONSchemalessSerde(backend).serialize(DATA) == backend.dumps(DATA)
+
+
+def test_schema_json_module_is_respected():
+    class Upper:
+        @staticmethod
+        def dumps(obj):
+            return json.dumps(obj).upper()
+
+    class UpperSchema(Schema):
+        class Meta:
+            json_module = Upper
+
+    assert JSONSerializerForSchema(UpperSchema()).serialize({'text': 'a'}) == (
+        '{"TEXT": "A"}'
+    )
+
+
+def test_default_backend():
+    try:
+        json_backends.set_default_backend(StdlibJSONBackend())
+        assert json_backends.default_backend().name == 'json'
+        assert JSONSchemalessSerde().serialize({'a': 1}) == '{"a": 1}'
+    finally:
+        json_backends.set_default_backend(None)
+    assert isinstance(json_backends.default_backend(), json_backends.JSONBackend)
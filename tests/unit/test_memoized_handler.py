@@ -0,0 +1,122 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from happyly import Handler
+from happyly.handling import MemoizedHandler
+from happyly.listening import Executor
+
+
+def test_hits_go_through_callbacks_and_publishing():
+    calls = []
+
+    def enrich(message):
+        calls.append(message)
+        return {'user': message['user_id'], 'name': 'spam'}
+
+    published = []
+    handler = MemoizedHandler(enrich, key=['user_id'])
+    executor = Executor(handler=handler, publisher=lambda m: published.append(m))
+    with patch.object(executor, 'on_handled') as on_handled:
+        for request_id in range(3):
+            executor.run({'user_id': 1, 'request_id': request_id})
+        executor.run({'user_id': 2})
+    executor.shutdown()
+    assert len(calls) == 2
+    assert on_handled.call_count == 4
+    assert len(published) == 4
+    counters = handler.counters
+    assert (counters.hits, counters.misses) == (2, 2)
+    with pytest.raises(TypeError):
+        published[0]['name'] = 'eggs'
+
+
+def test_generator_handler():
+    calls = []
+
+    def handler(message):
+        calls.append(message)
+        for i in range(3):
+            yield {'i': i}
+
+    published = []
+    executor = Executor(
+        handler=MemoizedHandler(handler), publisher=lambda m: published.append(m)
+    )
+    executor.run({'spam': [1, 2]})
+    executor.run({'spam': [1, 2]})
+    executor.shutdown()
+    assert len(calls) == 1
+    assert sorted(m['i'] for m in published) == [0, 0, 1, 1, 2, 2]
+
+
+class FailingOnce(Handler):
+    def __init__(self):
+        self.calls = 0
+
+    def handle(self, message):
+        self.calls += 1
+        if self.calls == 1:
+            raise ValueError
+        return {'ok': True}
+
+    def on_handling_failed(self, message, error):
+        return {'ok': False}
+
+
+def test_failures_are_not_cached():
+    inner = FailingOnce()
+    handler = MemoizedHandler(inner)
+    assert handler({'a': 1}) == {'ok': False}
+    assert handler({'a': 1}) == {'ok': True}
+    assert handler({'a': 1}) == {'ok': True}
+    assert inner.calls == 2
+
+
+def test_single_flight():
+    calls = []
+    started = threading.Event()
+
+    def slow(message):
+        calls.append(message)
+        started.set()
+        time.sleep(0.1)
+        return {'value': message['value'] * 2}
+
+    handler = MemoizedHandler(slow, key=lambda message: message['value'])
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(handler({'value': 21})))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 5
+
+
+def test_ttl_and_keys(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('happyly.utils.lru.time.monotonic', lambda: now[0])
+    calls = []
+
+    def handler(message):
+        calls.append(message)
+        return message
+
+    memoized = MemoizedHandler(handler, ttl=10)
+    memoized({'flag': True})
+    memoized({'flag': 1})
+    memoized({'flag': True})
+    assert len(calls) == 2
+    now[0] += 11
+    memoized({'flag': True})
+    assert len(calls) == 3
+    # messages which can't be hashed aren't memoized
+    memoized({'spam': {1, 2}})
+    memoized({'spam': {1, 2}})
+    assert len(calls) == 5
@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from happyly import Handler
+from happyly.listening import Executor
+from happyly.listening.process_handling import ProcessHandling
+
+
+def pid_handler(message):
+    return {'pid': os.getpid()}
+
+
+def pid_generator_handler(message):
+    for i in range(message['n']):
+        yield {'i': i, 'pid': os.getpid()}
+
+
+def failing_generator_handler(message):
+    yield {'i': 0}
+    raise KeyError('oops')
+
+
+def marker_generator_handler(message):
+    # looks like the end-of-stream marker of earlier versions
+    yield '__happyly_handling_done__'
+    yield {'i': 1}
+
+
+def endless_generator_handler(message):
+    i = 0
+    while True:
+        yield {'i': i}
+        i += 1
+
+
+class FailingHandler(Handler):
+    def handle(self, message):
+        raise KeyError('oops')
+
+    def on_handling_failed(self, message, error):
+        raise error
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+def test_function_handler(pool):
+    executor = Executor(handler=pid_handler, handling_pool=pool)
+    result = executor.run_for_result({})
+    assert result['pid'] != os.getpid()
+    executor.shutdown()
+
+
+def test_generator_handler(pool):
+    executor = Executor(handler=pid_generator_handler, handling_pool=pool)
+    with patch.object(executor, 'on_handled') as on_handled:
+        results = list(executor.run_for_result({'n': 3}))
+    assert [r['i'] for r in results] == [0, 1, 2]
+    assert all(r['pid'] != os.getpid() for r in results)
+    assert on_handled.call_count == 3
+    executor.shutdown()
+
+
+@pytest.mark.parametrize(
+    'handler, handled_count',
+    [(FailingHandler(), 0), (failing_generator_handler, 1)],
+)
+def test_handling_failure(pool, handler, handled_count):
+    executor = Executor(handler=handler, handling_pool=pool)
+    with patch.object(executor, 'on_handling_failed') as on_handling_failed:
+        with patch.object(executor, 'on_handled') as on_handled:
+            executor.run({})
+    error = on_handling_failed.call_args[1]['error']
+    assert isinstance(error, KeyError)
+    assert on_handled.call_count == handled_count
+    executor.shutdown()
+
+
+def test_results_which_look_like_markers(pool):
+    handling = ProcessHandling(pool)
+    results = list(handling.stream(marker_generator_handler, {}))
+    assert results == ['__happyly_handling_done__', {'i': 1}]
+    handling.shutdown()
+
+
+def test_abandoned_stream_stops_handler():
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        handling = ProcessHandling(pool, max_pending_results=2)
+        stream = handling.stream(endless_generator_handler, {})
+        assert next(stream) == {'i': 0}
+        stream.close()
+        # the only worker process is free again
+        assert pool.submit(pid_handler, {}).result(timeout=5)['pid'] != os.getpid()
+        handling.shutdown()
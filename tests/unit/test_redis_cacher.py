@@ -0,0 +1,100 @@
+import pytest
+
+from happyly.google_pubsub.redis_cacher import RedisCacher
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the hash commands of redis-py client.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.round_trips = 0
+
+    def hset(self, name, key, value):
+        self.round_trips += 1
+        self.hashes.setdefault(name, {})[key] = value
+
+    def hdel(self, name, *keys):
+        self.round_trips += 1
+        for key in keys:
+            self.hashes.get(name, {}).pop(key, None)
+
+    def hget(self, name, key):
+        self.round_trips += 1
+        return self.hashes.get(name, {}).get(key)
+
+    def hgetall(self, name):
+        self.round_trips += 1
+        return dict(self.hashes.get(name, {}))
+
+    def hscan_iter(self, name, count=None):
+        items = list(self.hashes.get(name, {}).items())
+        for i in range(0, len(items), count):
+            self.round_trips += 1
+            yield from items[i : i + count]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def hset(self, *args):
+        self.commands.append(('hset', args))
+
+    def hdel(self, *args):
+        self.commands.append(('hdel', args))
+
+    def execute(self):
+        round_trips = self.client.round_trips
+        for name, args in self.commands:
+            getattr(self.client, name)(*args)
+        self.client.round_trips = round_trips + 1
+
+
+@pytest.fixture
+def cacher():
+    with pytest.warns(DeprecationWarning):
+        return RedisCacher(prefix='cache', client=FakeRedis())
+
+
+def test_add_get_remove(cacher):
+    cacher.add('spam', key='1')
+    assert cacher.get('1') == 'spam'
+    cacher.remove('1')
+    assert cacher.get('1') is None
+
+
+def test_bulk_operations_are_single_round_trips(cacher):
+    client = cacher.client
+    cacher.add_many({str(i): f'data{i}' for i in range(10)})
+    assert client.round_trips == 1
+    assert sorted(cacher.get_all()) == sorted(f'data{i}' for i in range(10))
+    assert client.round_trips == 2
+    assert len(list(cacher.iter_all(count=4))) == 10
+    cacher.remove_many(str(i) for i in range(5))
+    assert client.round_trips == 6
+    assert dict(cacher.iter_all()) == {str(i): f'data{i}' for i in range(5, 10)}
+
+
+def test_pipelined(cacher):
+    client = cacher.client
+    with cacher.pipelined():
+        cacher.add('spam', key='1')
+        with cacher.pipelined():
+            cacher.add('eggs', key='2')
+        cacher.remove('1')
+        assert client.hashes == {}
+    assert client.hashes == {'cache': {'2': 'eggs'}}
+    assert client.round_trips == 1
+
+    with pytest.raises(ValueError):
+        with cacher.pipelined():
+            cacher.add('ham', key='3')
+            raise ValueError
+    assert cacher.get('3') is None
@@ -0,0 +1,48 @@
+import marshmallow
+import pytest
+
+from happyly import Schema
+from happyly.serialization import DummyValidator, ValidationPolicy
+
+
+class ValueSchema(Schema):
+    value = marshmallow.fields.Int(required=True)
+
+
+def test_validates_each_message_by_default():
+    validator = DummyValidator(schema=ValueSchema())
+    assert validator.deserialize({'value': 1}) == {'value': 1}
+    with pytest.raises(marshmallow.ValidationError):
+        validator.serialize({'value': 'spam'})
+    counters = validator.validation.counters
+    assert (counters.seen, counters.sampled, counters.failed) == (2, 2, 1)
+
+
+def test_sampled():
+    validator = DummyValidator(
+        schema=ValueSchema(), validation=ValidationPolicy.sampled(every=3)
+    )
+    failures = 0
+    for _ in range(9):
+        try:
+            validator.deserialize({'value': 'spam'})
+        except marshmallow.ValidationError:
+            failures += 1
+    assert failures == 3
+    assert validator.validation.counters.sampled == 3
+    assert validator.validation.counters.failed == 3
+
+
+def test_never_and_percentage():
+    never = DummyValidator(schema=ValueSchema(), validation=ValidationPolicy.never())
+    assert never.deserialize({'value': 'spam'}) == {'value': 'spam'}
+    assert never.validation.counters.sampled == 0
+
+    policy = ValidationPolicy.percentage(50)
+    for _ in range(1000):
+        policy.check(lambda: None)
+    assert 300 < policy.counters.sampled < 700
+    assert ValidationPolicy.percentage(0).counters.sampled == 0
+
+    with pytest.raises(ValueError):
+        ValidationPolicy(fraction=1.5)
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from happyly import Cacher
+from happyly.caching import WriteBehindCacher
+
+
+class RecordingCacher(Cacher):
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    def add(self, data, key):
+        self.calls.append(('add', key))
+        self.data[key] = data
+
+    def remove(self, key):
+        self.calls.append(('remove', key))
+        self.data.pop(key, None)
+
+    def get(self, key):
+        return self.data.get(key)
+
+
+def test_added_and_removed_keys_are_coalesced():
+    inner = RecordingCacher()
+    cacher = WriteBehindCacher(inner, max_latency=60)
+    cacher.add('spam', key='1')
+    cacher.add('eggs', key='2')
+    cacher.remove('1')
+    cacher.remove('3')
+    assert cacher.get('1') is None
+    assert cacher.get('2') == 'eggs'
+    assert inner.calls == []
+    cacher.close()
+    assert sorted(inner.calls) == [('add', '2'), ('remove', '3')]
+    assert inner.data == {'2': 'eggs'}
+    with pytest.raises(RuntimeError):
+        cacher.add('ham', key='4')
+
+
+def test_background_flush():
+    inner = RecordingCacher()
+    cacher = WriteBehindCacher(inner, max_latency=0.01)
+    cacher.add('spam', key='1')
+    deadline = time.monotonic() + 5
+    while not inner.data and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert inner.data == {'1': 'spam'}
+    cacher.remove('1')
+    cacher.close()
+    assert inner.data == {}
+
+
+def test_bounded_pending_changes():
+    inner = RecordingCacher()
+    cacher = WriteBehindCacher(inner, max_latency=60, max_pending=3)
+    cacher.add_many({str(i): i for i in range(3)})
+    # the limit is reached, so the changes are written by the caller
+    assert len(inner.data) == 3
+    cacher.close()